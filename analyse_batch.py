@@ -1,35 +1,94 @@
+"""
+analyse_batch.py – Auswertung von Batch-Ergebnissen über viele Läufe
+===================================================================
+Liest Ergebnis-Stores (``--store`` der Runner, GUI: results/store) und einzelne Ergebnisdateien
+(CSV/JSONL aller Runner, auch die deutschen GUI-Spalten) in ein einheitliches Schema. Geladen
+werden nur die Spalten, die die Auswertung braucht (Solver-Statistiken bleiben auf der Platte).
+
+Usage:
+  python analyse_batch.py results.csv
+  python analyse_batch.py results/store --by backend local_move --cutoff 60
+  python analyse_batch.py results/store results_dimacs.csv --run-id 20250101-120000
+
+Optionen:
+  --run-id ID [ID ...] : nur diese Läufe auswerten (default: alle)
+  --by COL [COL ...]   : Gruppierung für Vergleiche (default: backend)
+  --cutoff SEK         : Zeitlimit für PAR-2 (default: größtes time_limit, sonst längste Laufzeit)
+"""
+import argparse
 import pandas as pd
-import sys
+from core.results_io import load_results
+
+COLUMNS = ['run_id', 'source', 'instance', 'n', 'm', 'ratio', 'seed', 'backend', 'local_move',
+           'population', 'p_local', 'time_limit', 'solved', 'best_valence', 'steps', 'runtime_sec']
+QUANTILES = (0.5, 0.9, 0.99)
+
+def par2(df, cutoff):
+    """Mittlere PAR-2-Laufzeit: ungelöste Läufe und Läufe über ``cutoff`` zählen ``2 * cutoff``."""
+    ok = df['solved'].fillna(False) & (df['runtime_sec'] <= cutoff)
+    return df['runtime_sec'].where(ok, 2 * cutoff).mean()
+
+def summary(df):
+    return df.groupby('run_id', dropna=False).agg(
+        instanzen=('solved', 'size'), geloest=('solved', 'mean'), valenz=('best_valence', 'mean'),
+        laufzeit_mittel=('runtime_sec', 'mean'), laufzeit_max=('runtime_sec', 'max'),
+        schritte_mittel=('steps', 'mean'))
+
+def success_by_ratio(df, by):
+    ratio = df['ratio'].round(2).rename('ratio')
+    table = df.groupby([*(df[c] for c in by), ratio], dropna=False)['solved'].mean()
+    return table.unstack(list(range(len(by)))) if by else table.to_frame('geloest')
+
+def runtime_quantiles(df, by):
+    keys = [df[c] for c in by] or [df['run_id']]
+    return df.groupby(keys, dropna=False)['runtime_sec'].quantile(QUANTILES).unstack()
 
-# Usage: python analyse_batch.py results.csv
-# (oder passe den Dateinamen unten an)
+def par2_by(df, by, cutoff):
+    keys = [df[c] for c in by] or [df['run_id']]
+    return df.groupby(keys, dropna=False).apply(lambda g: par2(g, cutoff), include_groups=False)
 
-def analyse(csv_path):
-    df = pd.read_csv(csv_path)
+def analyse(*paths, by=('backend',), cutoff=None, run_ids=None):
+    df = load_results(paths, COLUMNS)
+    if run_ids:
+        df = df[df['run_id'].isin(run_ids)]
+    by = [c for c in by if df[c].notna().any()]
+    if cutoff is None:
+        cutoff = df['time_limit'].max() if df['time_limit'].notna().any() else df['runtime_sec'].max()
+    pd.set_option('display.width', 160)
+    pd.set_option('display.max_columns', None)
     print("\n===== Batch-Auswertung =====\n")
-    print(f"Anzahl Instanzen: {len(df)}")
-    if 'solved' in df.columns:
-        solved = df['solved'].sum()
-        print(f"Erfolgreich gelöst: {solved}/{len(df)} ({100*solved/len(df):.1f}%)")
-    if 'best_valence' in df.columns:
-        print(f"Durchschnittliche Valenz: {df['best_valence'].mean():.4f}")
-        print(f"Min/Max Valenz: {df['best_valence'].min():.4f} / {df['best_valence'].max():.4f}")
-    if 'runtime_sec' in df.columns:
-        print(f"Durchschnittliche Laufzeit: {df['runtime_sec'].mean()*1000:.3f} ms")
-        print(f"Min/Max Laufzeit: {df['runtime_sec'].min()*1000:.3f} / {df['runtime_sec'].max()*1000:.3f} ms")
-    if 'steps' in df.columns:
-        print(f"Durchschnittliche Iterationen: {df['steps'].mean():.0f}")
-        print(f"Min/Max Iterationen: {df['steps'].min()} / {df['steps'].max()}")
+    print(f"Anzahl Instanzen: {len(df)} aus {df['run_id'].nunique()} Läufen")
+    if not len(df):
+        return
+    solved = int(df['solved'].fillna(False).sum())
+    print(f"Erfolgreich gelöst: {solved}/{len(df)} ({100*solved/len(df):.1f}%)")
+    print(f"Durchschnittliche Valenz: {df['best_valence'].mean():.4f}")
+    print(f"Min/Max Valenz: {df['best_valence'].min():.4f} / {df['best_valence'].max():.4f}")
+    print(f"Durchschnittliche Laufzeit: {df['runtime_sec'].mean()*1000:.3f} ms")
+    print(f"Min/Max Laufzeit: {df['runtime_sec'].min()*1000:.3f} / {df['runtime_sec'].max()*1000:.3f} ms")
+    print(f"PAR-2 (Cutoff {cutoff:.3f}s): {par2(df, cutoff):.3f}s")
+    print("\nPro Lauf:")
+    print(summary(df))
+    if df['ratio'].notna().any():
+        print("\nErfolgsquote nach Klausel/Variablen-Verhältnis:")
+        print(success_by_ratio(df, by))
+    print(f"\nLaufzeit-Quantile [s] nach {', '.join(by) or 'run_id'}:")
+    print(runtime_quantiles(df, by))
+    print(f"\nPAR-2 [s] nach {', '.join(by) or 'run_id'}:")
+    print(par2_by(df, by, cutoff))
+    # Nur Kennspalten zeigen, die in den ausgewerteten Läufen belegt sind
+    ident = [c for c in ('run_id', 'instance', 'n', 'm', 'seed') if df[c].notna().any()]
     print("\nTop 5 schnellste Lösungen:")
-    if 'runtime_sec' in df.columns:
-        print(df.sort_values('runtime_sec').head(5)[['n','m','seed','runtime_sec','solved']])
+    print(df[df['solved'].fillna(False)].nsmallest(5, 'runtime_sec')[ident + ['runtime_sec', 'solved']])
     print("\nTop 5 höchste Valenz:")
-    if 'best_valence' in df.columns:
-        print(df.sort_values('best_valence', ascending=False).head(5)[['n','m','seed','best_valence','solved']])
+    print(df.nlargest(5, 'best_valence')[ident + ['best_valence', 'solved']])
     print("\n===== Ende Auswertung =====\n")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python analyse_batch.py <results.csv>")
-        sys.exit(1)
-    analyse(sys.argv[1])
+    p = argparse.ArgumentParser(description="Batch-Ergebnisse auswerten")
+    p.add_argument('paths', nargs='+', help='Ergebnis-Stores, Lauf-Ordner oder Ergebnisdateien')
+    p.add_argument('--run-id', nargs='+', default=None, help='nur diese Läufe')
+    p.add_argument('--by', nargs='*', default=['backend'], help='Gruppierungsspalten')
+    p.add_argument('--cutoff', type=float, default=None, help='Zeitlimit für PAR-2 in Sekunden')
+    args = p.parse_args()
+    analyse(*args.paths, by=args.by, cutoff=args.cutoff, run_ids=args.run_id)
@@ -0,0 +1,49 @@
+"""
+bench_batch_valence.py – Batch-Valenz vs. Schleife über die skalare Funktion
+============================================================================
+Vergleicht ``valence_resonance`` in einer Python-Schleife mit
+``valence_resonance_batch`` (dicht und bit-gepackt) für verschieden viele Kandidaten.
+
+Usage:
+  python -m benchmarks.bench_batch_valence --n 250 --candidates 16 128 512
+"""
+import argparse
+from time import perf_counter
+import numpy as np
+from core.generators import random_ksat
+from core.valence_resonance import valence_resonance, valence_resonance_batch
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        out = fn()
+        times.append(perf_counter() - t0)
+    return min(times), out
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark: Batch-Valenz vs. skalare Schleife")
+    p.add_argument('--n', type=int, default=250, help='Variablenzahl')
+    p.add_argument('--ratio', type=float, default=4.26, help='Klausel/Variablen-Verhältnis')
+    p.add_argument('--candidates', nargs='+', type=int, default=[16, 128, 512], help='Anzahl Belegungen')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--seed', type=int, default=1)
+    args = p.parse_args()
+
+    cnf = random_ksat(args.n, int(args.ratio * args.n), seed=args.seed)
+    clauses = cnf.to_clauses()
+    rng = np.random.default_rng(args.seed)
+    print(f"n={cnf.n_vars} m={cnf.n_clauses}")
+    print(f"{'W':>6} {'loop ms':>10} {'dense ms':>10} {'packed ms':>10} {'speedup':>8}")
+    for w in args.candidates:
+        assign = rng.random((w, cnf.n_vars)) < 0.5
+        rows = assign.tolist()
+        t_loop, ref = best_of(lambda: [valence_resonance(clauses, a) for a in rows], args.repeat)
+        t_dense, dense = best_of(lambda: valence_resonance_batch(cnf, assign, packed=False), args.repeat)
+        t_packed, packed = best_of(lambda: valence_resonance_batch(cnf, assign, packed=True), args.repeat)
+        assert np.allclose(dense, ref) and np.allclose(packed, ref)
+        speedup = t_loop / min(t_dense, t_packed)
+        print(f"{w:>6} {t_loop * 1e3:>10.2f} {t_dense * 1e3:>10.2f} {t_packed * 1e3:>10.2f} {speedup:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+bench_packed_memory.py – Speicher- und Kopierkosten der Belegungsdarstellungen
+==============================================================================
+Vergleicht für eine generierte Instanz mit (default) 10^6 Variablen die Belegung als
+``list[bool]``, als NumPy-``bool``-Array und als bitgepackte ``PackedAssignment``:
+Bytes pro Belegung, Kosten eines Best-Snapshots und Einzelzugriffe (Lesen + Flip).
+Anschließend misst er den Zustand des Python-Solvers (Sichten auf die CSR-Arrays und
+Zähler, ohne die CNF selbst) mit memoryviews und mit ``list_mirrors`` und läuft einige
+Schritte auf der Instanz.
+
+Usage:
+  python -m benchmarks.bench_packed_memory --n 1000000 --steps 20
+  python -m benchmarks.bench_packed_memory --n 200000 --list-mirrors
+"""
+import argparse
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+import numpy as np
+from core.packed_assignment import PackedAssignment
+from core.valenz_solver import ValenzDriftSolver
+from core.valence_resonance import valence_resonance
+from core.drift_semantic import semantic_drift
+from core.generators import random_ksat
+
+def allocated(make):
+    """Bytes allocated by ``make()`` (tracemalloc) and the created object."""
+    tracemalloc.start()
+    obj = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, obj
+
+def best_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        fn()
+        times.append(perf_counter() - t0)
+    return min(times)
+
+def flip_loop(assign, idxs):
+    if isinstance(assign, PackedAssignment):
+        # wie in der Solver-Schleife: flip() statt Lesen + Setzen
+        for v in idxs:
+            assign.flip(v)
+        return
+    for v in idxs:
+        assign[v] = not assign[v]
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark: Speicherbedarf gepackter Belegungen")
+    p.add_argument('--n', type=int, default=1_000_000, help='Variablenzahl')
+    p.add_argument('--ratio', type=float, default=4.26, help='Klausel/Variablen-Verhältnis')
+    p.add_argument('--flips', type=int, default=100_000, help='Einzelzugriffe für die Zugriffsmessung')
+    p.add_argument('--steps', type=int, default=20, help='Solver-Schritte auf der Instanz (0 = aus)')
+    p.add_argument('--list-mirrors', action='store_true',
+                   help='Solver-Zustand auch mit Listen-Spiegeln messen (~8x Speicher der CSR)')
+    p.add_argument('--seed', type=int, default=1)
+    args = p.parse_args()
+
+    t0 = perf_counter()
+    cnf = random_ksat(args.n, int(args.ratio * args.n), seed=args.seed)
+    print(f"n={cnf.n_vars} m={cnf.n_clauses} generiert+kompiliert in {perf_counter() - t0:.1f}s "
+          f"(CSR: {cnf.nbytes / 2**20:.1f} MiB)")
+
+    rnd = random.Random(args.seed)
+    bits = [rnd.random() < 0.5 for _ in range(args.n)]
+    idxs = [rnd.randrange(args.n) for _ in range(args.flips)]
+    reps = {
+        'list[bool]': lambda: list(bits),
+        'np.bool_': lambda: np.array(bits, dtype=bool),
+        'packed': lambda: PackedAssignment.from_bools(bits),
+    }
+    print(f"{'repr':>12} {'bytes':>12} {'snapshot us':>12} {'flip ns':>9}")
+    for name, make in reps.items():
+        size, assign = allocated(make)
+        if name == 'list[bool]':
+            size = sys.getsizeof(assign)  # bool-Objekte sind Singletons, nur die Zeiger zählen
+        if name == 'packed':
+            snap = assign.copy()
+            t_snap = best_time(lambda: snap.copy_from(assign))
+        else:
+            t_snap = best_time(assign.copy)
+        t_flip = best_time(lambda: flip_loop(assign, idxs), repeat=3)
+        print(f"{name:>12} {size:>12,} {t_snap * 1e6:>12.1f} {t_flip / args.flips * 1e9:>9.0f}")
+
+    def make_solver(list_mirrors):
+        solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=args.steps,
+                                   seed=args.seed + 1, list_mirrors=list_mirrors)
+        solver._init_state()
+        return solver
+
+    for list_mirrors in (False, True) if args.list_mirrors else (False,):
+        size, solver = allocated(lambda: make_solver(list_mirrors))
+        print(f"Solver-Zustand ({'Listen' if list_mirrors else 'memoryviews'}): {size / 2**20:.1f} MiB "
+              f"zusätzlich zur CSR")
+        del solver
+
+    if args.steps:
+        solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift,
+                                   max_iter=args.steps, seed=args.seed + 1)
+        t0 = perf_counter()
+        _, best_val, steps, _ = solver.solve()
+        dt = perf_counter() - t0
+        print(f"Solver: {steps} Schritte in {dt:.1f}s ({steps / dt:.1f} steps/s), best_valence={best_val:.4f}, "
+              f"Belegung + Best-Snapshot: {2 * PackedAssignment(args.n).nbytes:,} B "
+              f"statt {2 * 8 * args.n:,} B als Liste")
+
+if __name__ == "__main__":
+    main()
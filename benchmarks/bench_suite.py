@@ -0,0 +1,203 @@
+"""
+bench_suite.py – Reproduzierbare Benchmark-Suite für den ValenzDriftSolver
+==========================================================================
+Erzeugt deterministische Instanzen mit ``random_ksat`` über ein n/Verhältnis-Raster
+(optional zusätzlich alle DIMACS-Dateien lokaler UF-Ordner) und misst je Instanzgruppe
+und Solver-Backend: Schritte/s, Flips/s, Time-to-Solution (Median, PAR-2), Erfolgsquote
+und Speicher-Peak. Ergebnis ist eine JSON-Datei, die sich mit ``--compare`` gegen einen
+früheren Lauf (z.B. eines anderen Commits) vergleichen lässt.
+
+Usage:
+  python -m benchmarks.bench_suite --n 50 100 250 --ratios 4.26 --instances 5 --runs 3 --out bench.json
+  python -m benchmarks.bench_suite --uf-dir data/ai/hoos/Shortcuts/UF250.1065.100 --backends numba --out uf.json
+  python -m benchmarks.bench_suite --compare alt.json neu.json
+
+Optionen:
+  --n N [N ...]           : Variablenzahlen des Rasters (leer = kein generiertes Raster)
+  --ratios R [R ...]      : Klausel/Variablen-Verhältnisse (default: 4.26)
+  --instances K           : Instanzen pro Rasterpunkt (default: 5)
+  --uf-dir DIR [DIR ...]  : zusätzliche Ordner mit DIMACS-Dateien, je Ordner eine Gruppe
+  --max-files K           : höchstens K Dateien pro Ordner (default: alle)
+  --runs R                : Läufe (Seeds) pro Instanz und Backend (default: 3)
+  --backends B [B ...]    : Solver-Kerne (default: python numba)
+  --local-move NAME       : lokaler Zug (random, walksat, probsat, probsat-exp)
+  --p-local P             : Wahrscheinlichkeit lokaler Schritte (default: 0.5)
+  --max-iter K            : Iterationsbudget pro Lauf (default: 100000)
+  --mem-steps K           : Schritte des separaten Speicher-Laufs unter tracemalloc (default: 1000)
+  --seed S                : Basis-Seed für Instanzen und Läufe (default: 0)
+  --out PATH              : JSON-Ausgabe (default: nur Tabelle)
+  --compare ALT NEU       : zwei JSON-Ergebnisse vergleichen statt zu messen
+
+PAR-2: ungelöste Läufe zählen mit dem doppelten verbrauchten Budget (Zeit bzw. Schritte).
+Der Median der TTS ist ``null``, wenn weniger als die Hälfte der Läufe gelöst wurde.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+import numpy as np
+from core.cnf_utils import list_dimacs, load_dimacs
+from core.generators import random_ksat
+from core.heuristics import LOCAL_MOVES
+from core.population import make_solver
+from core.valenz_solver import BACKENDS
+
+def derive_seed(*parts) -> int:
+    """Deterministic 31-bit seed from the identifying parts of a run."""
+    return int(np.random.SeedSequence([int(p) for p in parts]).generate_state(1)[0] >> 1)
+
+def grid_groups(ns, ratios, instances, seed):
+    """``(group, [(name, cnf)])`` per grid point; instances depend only on (seed, n, ratio, index)."""
+    for n in ns:
+        for ratio in ratios:
+            m = int(round(ratio * n))
+            cnfs = []
+            for i in range(instances):
+                inst_seed = derive_seed(seed, n, round(ratio * 1000), i)
+                cnfs.append((f"n{n}_r{ratio}_{i}", random_ksat(n, m, seed=inst_seed)))
+            yield f"random n={n} r={ratio}", cnfs
+
+def folder_groups(dirs, max_files):
+    for d in dirs:
+        files = list_dimacs(d)[:max_files]
+        yield f"dir {Path(d).name}", [(p.name, load_dimacs(p)) for p in files]
+
+def run_once(cnf, backend, max_iter, seed, local_move, p_local):
+    solver = make_solver(cnf, max_iter=max_iter, seed=seed, backend=backend,
+                         p_local=p_local, local_move=local_move)
+    t0 = perf_counter()
+    _, best_val, steps, _ = solver.solve()
+    runtime = perf_counter() - t0
+    return {"solved": best_val == 1.0, "best_valence": best_val, "steps": steps,
+            "flips": solver.n_flips, "runtime_sec": runtime}
+
+def peak_memory(cnf, backend, steps, seed, local_move, p_local):
+    """tracemalloc peak of solver construction plus ``steps`` steps (separate, slower run)."""
+    tracemalloc.start()
+    try:
+        make_solver(cnf, max_iter=steps, seed=seed, backend=backend,
+                    p_local=p_local, local_move=local_move).solve()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def summarise(runs, max_iter):
+    runtime = np.array([r["runtime_sec"] for r in runs])
+    steps = np.array([r["steps"] for r in runs], dtype=np.float64)
+    flips = np.array([r["flips"] for r in runs], dtype=np.float64)
+    solved = np.array([r["solved"] for r in runs])
+    n_solved = int(solved.sum())
+    half = n_solved * 2 > len(runs)
+    # Ungelöste Läufe als unendlich sortieren: der Median ist nur bei mehr als 50 % Erfolg endlich
+    # (bei genau 50 % mittelt er über ein inf); sonst None, damit das JSON strikt gültig bleibt
+    tts_sec = np.where(solved, runtime, np.inf)
+    tts_steps = np.where(solved, steps, np.inf)
+    return {
+        "runs": len(runs),
+        "solved": n_solved,
+        "success_rate": n_solved / len(runs),
+        "steps_per_sec": float(steps.sum() / runtime.sum()),
+        "flips_per_sec": float(flips.sum() / runtime.sum()),
+        "tts_median_sec": float(np.median(tts_sec)) if half else None,
+        "tts_median_steps": float(np.median(tts_steps)) if half else None,
+        "par2_sec": float(np.where(solved, runtime, 2 * runtime).mean()),
+        "par2_steps": float(np.where(solved, steps, 2 * max_iter).mean()),
+        "mean_best_valence": float(np.mean([r["best_valence"] for r in runs])),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    env = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()}
+    try:
+        import numba
+        env["numba"] = numba.__version__
+    except ImportError:
+        env["numba"] = None
+    return env
+
+def print_table(results):
+    print(f"{'group':<24} {'backend':>7} {'solved':>7} {'steps/s':>10} {'flips/s':>10} "
+          f"{'TTS med s':>10} {'PAR-2 s':>9} {'peak MiB':>9}")
+    for r in results:
+        tts = f"{r['tts_median_sec']:.3f}" if r['tts_median_sec'] is not None else "-"
+        print(f"{r['group']:<24} {r['backend']:>7} {r['solved']:>3}/{r['runs']:<3} {r['steps_per_sec']:>10.0f} "
+              f"{r['flips_per_sec']:>10.0f} {tts:>10} {r['par2_sec']:>9.3f} {r['peak_mem_bytes'] / 2**20:>9.2f}")
+
+def compare(old_path, new_path):
+    old, new = (json.loads(Path(p).read_text()) for p in (old_path, new_path))
+    key = lambda r: (r["group"], r["backend"], r["local_move"])
+    before = {key(r): r for r in old["results"]}
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    common = [(before[key(r)], r) for r in new["results"] if key(r) in before]
+    if not common:
+        print("Keine gemeinsamen Gruppen (group, backend, local_move) in beiden Dateien")
+        return
+    print(f"{'group':<24} {'backend':>7} {'steps/s':>9} {'PAR-2 s':>9} {'solved':>9}")
+    for o, r in common:
+        ratio = r["steps_per_sec"] / o["steps_per_sec"] if o["steps_per_sec"] else float("nan")
+        par2 = r["par2_sec"] / o["par2_sec"] if o["par2_sec"] else float("nan")
+        print(f"{r['group']:<24} {r['backend']:>7} {ratio:>8.2f}x {par2:>8.2f}x {o['solved']:>4}->{r['solved']:<4}")
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark-Suite: Durchsatz, TTS und Speicher je Backend")
+    p.add_argument('--n', nargs='*', type=int, default=[50, 100, 250], help='Variablenzahlen des Rasters')
+    p.add_argument('--ratios', nargs='+', type=float, default=[4.26], help='Klausel/Variablen-Verhältnisse')
+    p.add_argument('--instances', type=int, default=5, help='Instanzen pro Rasterpunkt')
+    p.add_argument('--uf-dir', nargs='*', default=[], help='Ordner mit DIMACS-Dateien')
+    p.add_argument('--max-files', type=int, default=None, help='höchstens K Dateien pro Ordner')
+    p.add_argument('--runs', type=int, default=3, help='Läufe pro Instanz und Backend')
+    p.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS), help='Solver-Kerne')
+    p.add_argument('--local-move', choices=tuple(LOCAL_MOVES), default='random', help='lokaler Zug')
+    p.add_argument('--p-local', type=float, default=0.5, help='Wahrscheinlichkeit lokaler Schritte')
+    p.add_argument('--max-iter', type=int, default=100_000, help='Iterationsbudget pro Lauf')
+    p.add_argument('--mem-steps', type=int, default=1000, help='Schritte des Speicher-Laufs')
+    p.add_argument('--seed', type=int, default=0, help='Basis-Seed')
+    p.add_argument('--out', type=str, default=None, help='JSON-Ausgabe')
+    p.add_argument('--compare', nargs=2, metavar=('ALT', 'NEU'), help='zwei JSON-Ergebnisse vergleichen')
+    args = p.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    groups = list(grid_groups(args.n, args.ratios, args.instances, args.seed))
+    groups += list(folder_groups(args.uf_dir, args.max_files))
+    opts = dict(local_move=args.local_move, p_local=args.p_local)
+    if 'numba' in args.backends and groups and groups[0][1]:
+        # JIT-Kompilierung vor der Messung, damit sie nicht in die erste Gruppe fällt
+        run_once(groups[0][1][0][1], 'numba', 10, 0, **opts)
+
+    results, raw = [], []
+    for group, cnfs in groups:
+        for backend in args.backends:
+            runs = []
+            for name, cnf in cnfs:
+                for run in range(args.runs):
+                    seed = derive_seed(args.seed, run, *name.encode())
+                    row = dict(run_once(cnf, backend, args.max_iter, seed, **opts),
+                               group=group, instance=name, backend=backend, seed=seed)
+                    runs.append(row)
+            raw += runs
+            peak = max(peak_memory(cnf, backend, args.mem_steps, args.seed, **opts) for _, cnf in cnfs)
+            results.append(dict(group=group, backend=backend, local_move=args.local_move,
+                                instances=len(cnfs), peak_mem_bytes=peak, **summarise(runs, args.max_iter)))
+
+    print_table(results)
+    if args.out:
+        meta = {"commit": git_commit(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "environment": environment(), "args": {k: v for k, v in vars(args).items() if k != 'compare'}}
+        Path(args.out).write_text(json.dumps({"meta": meta, "results": results, "runs": raw}, indent=2, allow_nan=False))
+        print(f"Ergebnisse gespeichert in {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+bench_unsat_sampling.py – Mikro-Benchmark für die unsat-Buchhaltung
+====================================================================
+Zeigt, dass die Kosten eines lokalen Schritts mit dem indizierten SparseSet
+unabhängig von |unsat| bleiben, während ``random.choice(list(unsat))`` linear wächst.
+
+Usage:
+  python -m benchmarks.bench_unsat_sampling --sizes 1000 10000 100000 --steps 20000
+"""
+import argparse
+import random
+from time import perf_counter
+from core.sparse_set import SparseSet
+from core.valenz_solver import ValenzDriftSolver
+from core.valence_resonance import valence_resonance
+from core.drift_semantic import semantic_drift
+from core.generators import random_ksat
+
+def time_sampling(unsat_size, draws):
+    members = range(unsat_size)
+    as_set, sparse = set(members), SparseSet(unsat_size, members)
+    t0 = perf_counter()
+    for _ in range(draws):
+        random.choice(list(as_set))
+    t_list = perf_counter() - t0
+    t0 = perf_counter()
+    for _ in range(draws):
+        sparse.sample()
+    t_sparse = perf_counter() - t0
+    return t_list / draws, t_sparse / draws
+
+def time_local_steps(n, ratio, steps, seed):
+    cnf = random_ksat(n, int(ratio * n), seed=seed)
+    # Eigener Seed für den Solver, sonst fällt die Startbelegung mit der versteckten Lösung zusammen
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, p_local=1.0, seed=seed + 1)
+    assignment, unsat = solver._init_state()
+    lit_var, ptr = solver._lit_var, solver._clause_ptr
+    n_unsat = len(unsat)
+    # Lokaler Schritt wie im Solver: Klausel ziehen, Literal flippen, Zähler nachführen
+    t0 = perf_counter()
+    for _ in range(steps):
+        ci = unsat.sample()
+        var = random.choice(lit_var[ptr[ci]:ptr[ci + 1]])
+        assignment[var] = not assignment[var]
+        solver._propagate(var, assignment, unsat)
+    return n_unsat, len(unsat), (perf_counter() - t0) / steps
+
+def main():
+    p = argparse.ArgumentParser(description="Mikro-Benchmark: Schrittkosten vs. |unsat|")
+    p.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000], help='Variablenzahlen')
+    p.add_argument('--ratio', type=float, default=4.26, help='Klausel/Variablen-Verhältnis')
+    p.add_argument('--steps', type=int, default=20000, help='Lokale Schritte pro Größe')
+    p.add_argument('--seed', type=int, default=1)
+    args = p.parse_args()
+
+    print(f"{'|unsat|':>10} {'list(set) µs':>14} {'SparseSet µs':>14}")
+    for n in args.sizes:
+        size = int(args.ratio * n) // 8
+        t_list, t_sparse = time_sampling(size, max(10, 2_000_000 // max(size, 1)))
+        print(f"{size:>10} {t_list * 1e6:>14.2f} {t_sparse * 1e6:>14.3f}")
+
+    print(f"\n{'n':>10} {'|unsat| start':>14} {'|unsat| end':>12} {'µs/step':>10}")
+    for n in args.sizes:
+        n_start, n_end, per_step = time_local_steps(n, args.ratio, args.steps, args.seed)
+        print(f"{n:>10} {n_start:>14} {n_end:>12} {per_step * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
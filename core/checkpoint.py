@@ -0,0 +1,99 @@
+# Checkpoints langer solve()-Läufe: kompakter Binärzustand zum Fortsetzen und für Warmstarts
+import json
+import os
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from core.cnf_utils import CompiledCNF
+from core.packed_assignment import PackedAssignment
+
+FORMAT_VERSION = 1
+
+def cnf_fingerprint(cnf: CompiledCNF) -> int:
+    """CRC32 of the literal array; ties a checkpoint to its formula."""
+    return zlib.crc32(np.ascontiguousarray(cnf.lits).tobytes())
+
+class SolverCheckpoint:
+    """Resumable state of a :class:`ValenzDriftSolver` run.
+
+    Holds the working and best assignment (packed words), the unsat clauses
+    in the order of the solver's sparse set, best valence, step and flip
+    counts and the full state of the solver's :class:`SolverRNG`, so a
+    resumed run continues exactly where the saved one stopped.  Stored as
+    one ``.npz`` file (about ``n_vars / 4`` bytes plus the unsat list);
+    :meth:`save` writes a temporary file and renames it, so a run killed
+    while saving keeps the previous checkpoint.
+    """
+
+    def __init__(self, n_vars: int, fingerprint: int, step: int, best_valence: float, n_flips: int,
+                 assignment: np.ndarray, best: np.ndarray, unsat: np.ndarray, rng_state):
+        self.n_vars = n_vars
+        self.fingerprint = fingerprint
+        self.step = step
+        self.best_valence = best_valence
+        self.n_flips = n_flips
+        self.assignment = assignment
+        self.best = best
+        self.unsat = unsat
+        self.rng_state = rng_state
+
+    def save(self, path) -> None:
+        path = Path(path)
+        (version, mt, gauss), np_state = self.rng_state
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, version=FORMAT_VERSION,
+                     header=np.array([self.n_vars, self.fingerprint, self.step, self.n_flips], dtype=np.int64),
+                     best_valence=self.best_valence, assignment=self.assignment, best=self.best,
+                     unsat=np.asarray(self.unsat, dtype=np.int32),
+                     rng_mt=np.array(mt, dtype=np.uint32),
+                     rng_gauss=np.nan if gauss is None else gauss,
+                     rng_meta=json.dumps({"version": version, "numpy": np_state}))
+        os.replace(tmp, path)
+
+def load_checkpoint(path) -> SolverCheckpoint:
+    with np.load(path) as npz:
+        if int(npz["version"]) != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint version {int(npz['version'])}")
+        n_vars, fingerprint, step, n_flips = (int(x) for x in npz["header"])
+        meta = json.loads(str(npz["rng_meta"]))
+        gauss = float(npz["rng_gauss"])
+        rng_state = ((meta["version"], tuple(npz["rng_mt"].tolist()), None if np.isnan(gauss) else gauss),
+                     meta["numpy"])
+        return SolverCheckpoint(n_vars, fingerprint, step, float(npz["best_valence"]), n_flips,
+                                npz["assignment"], npz["best"], npz["unsat"], rng_state)
+
+def load_assignment(path, n_vars: int) -> PackedAssignment:
+    """Warm-start assignment from a checkpoint (its best assignment) or a model file.
+
+    A model file is SAT-competition solver output (``c`` comments, an ``s``
+    status line, literals on ``v`` lines) or bare lines of signed DIMACS
+    literals; reading stops at the terminating ``0``.  Unlisted variables
+    start false.
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        ckpt = load_checkpoint(path)
+        if ckpt.n_vars != n_vars:
+            raise ValueError(f"{path}: checkpoint has {ckpt.n_vars} variables, formula has {n_vars}")
+        return PackedAssignment(n_vars, ckpt.best.copy())
+    lits = []
+    for line in path.read_text().splitlines():
+        tokens = line.split()
+        if not tokens or tokens[0] in ("c", "s"):
+            continue
+        if tokens[0] == "v":
+            tokens = tokens[1:]
+        line_lits = [int(t) for t in tokens]
+        if 0 in line_lits:
+            lits.extend(line_lits[:line_lits.index(0)])
+            break
+        lits.extend(line_lits)
+    lits = np.array(lits, dtype=np.int64)
+    if len(lits) and np.abs(lits).max() > n_vars:
+        raise ValueError(f"{path}: literal {np.abs(lits).max()} exceeds {n_vars} variables")
+    values = np.zeros(n_vars, dtype=bool)
+    values[lits[lits > 0] - 1] = True
+    return PackedAssignment.from_bools(values)
@@ -1,27 +1,269 @@
 # Hilfsfunktionen zum Parsen und Erzeugen von CNF/SAT-Instanzen
+import gzip
+import lzma
+import os
+import re
+import warnings
+import zipfile
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Literal = Tuple[int, bool]  # (var_idx, polarity)
+Clause = Sequence[Literal]
+CNF = List[Clause]
+
+def _csr(keys: np.ndarray, values: np.ndarray, n_keys: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Group values by key into CSR form (ptr of length n_keys + 1, values sorted by key)."""
+    order = np.argsort(keys, kind="stable")
+    ptr = np.zeros(n_keys + 1, dtype=np.int32)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=ptr[1:])
+    return ptr, values[order].astype(np.int32, copy=False)
+
+def _drop_duplicate_literals(lits: np.ndarray, clause_ptr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Remove repeated literals inside a clause (they would corrupt the true-literal counts)."""
+    n_clauses = len(clause_ptr) - 1
+    if len(lits) == 0:
+        return lits, clause_ptr
+    lens = np.diff(clause_ptr)
+    clause_of_lit = np.repeat(np.arange(n_clauses, dtype=np.int32), lens)
+    keep = np.ones(len(lits), dtype=bool)
+    max_len = int(lens.max())
+    if max_len <= 8:
+        # Kurze Klauseln (k-SAT): jedes Literal mit seinen Nachfolgern vergleichen
+        for d in range(1, max_len):
+            dup = (lits[d:] == lits[:-d]) & (clause_of_lit[d:] == clause_of_lit[:-d])
+            keep[d:] &= ~dup
+    else:
+        order = np.lexsort((lits, clause_of_lit))
+        s_lits, s_cls = lits[order], clause_of_lit[order]
+        dup = np.zeros(len(lits), dtype=bool)
+        dup[1:] = (s_lits[1:] == s_lits[:-1]) & (s_cls[1:] == s_cls[:-1])
+        keep[order[dup]] = False
+    if keep.all():
+        return lits, clause_ptr
+    new_ptr = np.zeros_like(clause_ptr)
+    np.cumsum(np.bincount(clause_of_lit[keep], minlength=n_clauses), out=new_ptr[1:])
+    return lits[keep], new_ptr
+
+class CompiledCNF:
+    """Compact array form of a CNF formula.
+
+    ``lits`` holds all literals as signed DIMACS integers (``var_idx + 1``,
+    negative = negated) back to back, clause ``ci`` spans
+    ``lits[clause_ptr[ci]:clause_ptr[ci + 1]]``.  Occurrence lists are stored
+    CSR-style and split by polarity: ``pos_occ[pos_ptr[v]:pos_ptr[v + 1]]`` are
+    the clauses containing ``v`` positively, ``neg_*`` likewise for ``¬v``.
+
+    Iterating or indexing yields clauses as ``(var_idx, polarity)`` tuples, so
+    opaque valence/drift functions written against the list form keep working.
+    """
+
+    def __init__(self, n_vars: int, lits, clause_ptr):
+        lits = np.ascontiguousarray(lits, dtype=np.int32)
+        clause_ptr = np.ascontiguousarray(clause_ptr, dtype=np.int32)
+        lits, clause_ptr = _drop_duplicate_literals(lits, clause_ptr)
+        self.lits = lits
+        self.clause_ptr = clause_ptr
+        self.n_clauses = len(clause_ptr) - 1
+        self.lit_var = np.abs(lits) - 1
+        self.lit_pos = lits > 0
+        max_var = int(self.lit_var.max()) + 1 if len(lits) else 0
+        self.n_vars = max(int(n_vars or 0), max_var)
+        clause_of_lit = np.repeat(np.arange(self.n_clauses, dtype=np.int32), np.diff(clause_ptr))
+        pos = self.lit_pos
+        self.pos_ptr, self.pos_occ = _csr(self.lit_var[pos], clause_of_lit[pos], self.n_vars)
+        self.neg_ptr, self.neg_occ = _csr(self.lit_var[~pos], clause_of_lit[~pos], self.n_vars)
+
+    ARRAYS = ("lits", "clause_ptr", "pos_ptr", "pos_occ", "neg_ptr", "neg_occ")
+
+    @classmethod
+    def from_arrays(cls, n_vars: int, arrays) -> "CompiledCNF":
+        """Rebuild from already compiled arrays (see ``ARRAYS``) without re-sorting."""
+        self = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(self, name, np.ascontiguousarray(arrays[name], dtype=np.int32))
+        self.n_vars = int(n_vars)
+        self.n_clauses = len(self.clause_ptr) - 1
+        self.lit_var = np.abs(self.lits) - 1
+        self.lit_pos = self.lits > 0
+        return self
+
+    @classmethod
+    def from_clauses(cls, cnf: CNF, n_vars: int = None) -> "CompiledCNF":
+        """Compile the list-of-tuples form; empty clauses are skipped like the DIMACS readers do."""
+        cnf = [cl for cl in cnf if len(cl)]
+        lens = np.fromiter((len(cl) for cl in cnf), dtype=np.int32, count=len(cnf))
+        clause_ptr = np.zeros(len(cnf) + 1, dtype=np.int32)
+        np.cumsum(lens, out=clause_ptr[1:])
+        lits = np.fromiter(((v + 1) if pol else -(v + 1) for cl in cnf for v, pol in cl),
+                           dtype=np.int32, count=int(clause_ptr[-1]))
+        return cls(n_vars, lits, clause_ptr)
+
+    def __len__(self) -> int:
+        return self.n_clauses
+
+    def __getitem__(self, ci: int) -> List[Literal]:
+        lo, hi = self.clause_ptr[ci], self.clause_ptr[ci + 1]
+        return [(v, p) for v, p in zip(self.lit_var[lo:hi].tolist(), self.lit_pos[lo:hi].tolist())]
+
+    def __iter__(self):
+        return iter(self.to_clauses())
+
+    def to_clauses(self) -> CNF:
+        """Materialise the legacy list-of-tuples form."""
+        pairs = list(zip(self.lit_var.tolist(), self.lit_pos.tolist()))
+        ptr = self.clause_ptr.tolist()
+        return [pairs[ptr[ci]:ptr[ci + 1]] for ci in range(self.n_clauses)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.lits, self.clause_ptr, self.lit_var, self.lit_pos,
+                                      self.pos_ptr, self.pos_occ, self.neg_ptr, self.neg_occ))
+
+    def counters(self, assignment) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Per-clause true-literal counts and sums, per-variable break and make scores.
+
+        ``true_sum[ci]`` is the sum of the variable indices of the true literals
+        of clause ``ci``; for critical clauses (exactly one true literal) it is
+        the index of the variable that would break the clause when flipped.
+        """
+        assign = np.asarray(assignment, dtype=bool)
+        if self.n_clauses == 0:
+            return (np.zeros(0, np.int32), np.zeros(0, np.int64),
+                    np.zeros(self.n_vars, np.int32), np.zeros(self.n_vars, np.int32))
+        lit_true = assign[self.lit_var] == self.lit_pos
+        starts = self.clause_ptr[:-1]
+        true_count = np.add.reduceat(lit_true.astype(np.int32), starts)
+        true_sum = np.add.reduceat(np.where(lit_true, self.lit_var, 0).astype(np.int64), starts)
+        brk = np.bincount(true_sum[true_count == 1], minlength=self.n_vars).astype(np.int32)
+        unsat_lit = np.repeat(true_count == 0, np.diff(self.clause_ptr))
+        make = np.bincount(self.lit_var[unsat_lit], minlength=self.n_vars).astype(np.int32)
+        return true_count, true_sum, brk, make
+
+def compile_cnf(cnf, n_vars: int = None) -> CompiledCNF:
+    """Return ``cnf`` as :class:`CompiledCNF` (compiled instances are passed through)."""
+    if isinstance(cnf, CompiledCNF):
+        return cnf
+    return CompiledCNF.from_clauses(cnf, n_vars)
+
+# --- DIMACS-Einlesen -------------------------------------------------------
+
+DIMACS_SUFFIXES = (".cnf", ".cnf.gz", ".cnf.xz")
+CACHE_VERSION = 1
+_NON_CLAUSE_LINE = re.compile(rb"^[cp%][^\n]*", re.MULTILINE)
+_HEADER = re.compile(rb"^p\s+cnf\s+(\d+)\s+(\d+)", re.MULTILINE)
+
+def _decompress(data: bytes, name: str) -> bytes:
+    if name.endswith(".gz"):
+        return gzip.decompress(data)
+    if name.endswith(".xz"):
+        return lzma.decompress(data)
+    return data
+
+def _read_bytes(path: Path) -> bytes:
+    return _decompress(path.read_bytes(), path.name)
+
+def _parse_lines(data: bytes) -> Tuple[int, np.ndarray, np.ndarray]:
+    """Tolerant line-by-line parse; lines with invalid literals are skipped."""
+    n_vars = 0
+    lits: List[int] = []
+    ptr = [0]
+    for line in data.decode(errors="replace").splitlines():
+        line = line.strip()
+        if not line or line[0] in ("c", "%"):
+            continue
+        if line.startswith("p"):
+            parts = line.split()
+            n_vars = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
+            continue
+        try:
+            ints = [int(x) for x in line.split() if x != "0"]
+        except ValueError:
+            continue  # Zeilen mit ungültigen Literalen überspringen
+        if ints:
+            lits.extend(ints)
+            ptr.append(len(lits))
+    return n_vars, np.array(lits, dtype=np.int32), np.array(ptr, dtype=np.int32)
+
+def dimacs_from_bytes(data: bytes, name: str = "") -> CompiledCNF:
+    """Parse DIMACS text in bulk: strip non-clause lines, tokenise everything at once with NumPy.
+
+    ``name`` (e.g. an uploaded file name) selects decompression for ``.gz``/``.xz``.
+    """
+    data = _decompress(data, name)
+    header = _HEADER.search(data)
+    n_vars = int(header.group(1)) if header else 0
+    body = _NON_CLAUSE_LINE.sub(b"", data)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            tokens = np.fromstring(body, dtype=np.int32, sep=" ")
+        except (ValueError, DeprecationWarning):
+            # Ungültige Token: auf den toleranten Zeilenparser zurückfallen
+            return CompiledCNF(*_parse_lines(data))
+    zeros = np.flatnonzero(tokens == 0)
+    lits = tokens[tokens != 0]
+    # Klauselgrenzen = Anzahl Literale vor jeder 0; leere Klauseln fallen weg
+    ends = zeros - np.arange(len(zeros))
+    if len(lits) and (not len(ends) or ends[-1] != len(lits)):
+        ends = np.r_[ends, len(lits)]  # letzte Klausel ohne abschließende 0
+    clause_ptr = np.r_[0, ends].astype(np.int32)
+    keep = np.r_[True, np.diff(clause_ptr) > 0]
+    return CompiledCNF(n_vars, lits, clause_ptr[keep])
+
+def cache_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".npz")
+
+def _cache_key(path: Path) -> np.ndarray:
+    st = path.stat()
+    return np.array([CACHE_VERSION, st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+def load_dimacs(path, cache: bool = True) -> CompiledCNF:
+    """Load a DIMACS file (``.cnf``, ``.cnf.gz``, ``.cnf.xz``) as :class:`CompiledCNF`.
+
+    With ``cache=True`` the compiled arrays are kept in a sidecar
+    ``<file>.npz`` keyed by file size and mtime, so later runs skip parsing.
+    An unreadable sidecar is ignored and rewritten; it is written to a
+    temporary file and renamed, so parallel loaders never see a partial one.
+    """
+    path = Path(path)
+    key = _cache_key(path)
+    sidecar = cache_path(path)
+    if cache and sidecar.exists():
+        try:
+            with np.load(sidecar) as npz:
+                if np.array_equal(npz["key"], key):
+                    return CompiledCNF.from_arrays(int(npz["n_vars"]), npz)
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            pass  # defekter Cache (z.B. abgeschnitten): neu parsen
+    cnf = dimacs_from_bytes(_read_bytes(path))
+    if cache:
+        # Eigene Temp-Datei je Prozess, dann atomar umbenennen
+        tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, key=key, n_vars=cnf.n_vars, **{name: getattr(cnf, name) for name in cnf.ARRAYS})
+            os.replace(tmp, sidecar)
+        except OSError:
+            tmp.unlink(missing_ok=True)  # z.B. schreibgeschütztes Verzeichnis
+    return cnf
 
 def parse_dimacs(path):
     """Liest eine DIMACS-CNF-Datei ein und gibt Variablen- und Klauselanzahl sowie Klauseln (als Liste von Tupeln (var_idx, polarity)) zurück."""
-    with open(path, 'r') as f:
-        clauses = []
-        n_vars = n_clauses = None
-        for line in f:
-            line = line.strip()
-            if line == '' or line.startswith('c') or line.startswith('%'):
-                continue
-            if line.startswith('p'):
-                _, _, n_vars, n_clauses = line.split()
-                n_vars, n_clauses = int(n_vars), int(n_clauses)
-            else:
-                try:
-                    ints = [int(x) for x in line.split() if x != '0']
-                    if ints:
-                        clause = []
-                        for lit in ints:
-                            var_idx = abs(lit) - 1
-                            polarity = lit > 0
-                            clause.append((var_idx, polarity))
-                        clauses.append(clause)
-                except ValueError:
-                    continue  # Zeilen mit ungültigen Literalen überspringen
-    return n_vars, n_clauses, clauses
+    cnf = load_dimacs(path)
+    return cnf.n_vars, cnf.n_clauses, cnf.to_clauses()
+
+def list_dimacs(indir) -> List[Path]:
+    """All DIMACS files (plain or compressed) in ``indir``, sorted by name."""
+    return sorted(p for p in Path(indir).iterdir() if p.name.endswith(DIMACS_SUFFIXES))
+
+def dimacs_stem(path) -> str:
+    """File name without the DIMACS suffix (``uf250-01.cnf.gz`` → ``uf250-01``)."""
+    name = Path(path).name
+    for suffix in sorted(DIMACS_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
@@ -1,6 +1,6 @@
 # Semantische Driftfunktion für das ⦲SYSTEM-Toolkit
 import random
-from typing import List, Sequence, Tuple
+from typing import Callable, Iterable, List, Sequence, Tuple
 
 Boolean = bool
 Literal = Tuple[int, bool]
@@ -8,10 +8,46 @@ Clause = Sequence[Literal]
 CNF = List[Clause]
 Assignment = List[Boolean]
 
-def semantic_drift(assignment: Assignment, cnf: CNF, val: float) -> Assignment:
-    """Flip k variables proportional to (1 - val)."""
-    k = max(1, int(len(assignment) * (1.0 - val) * 0.1))
-    idxs = random.sample(range(len(assignment)), k)
+def delta_drift(fn):
+    """Mark a drift function as delta-reporting.
+
+    Delta drifts flip ``assignment`` in place and return (or yield, flipping
+    before each yield) the distinct indices they flipped, so the solver never
+    has to copy and diff the full assignment.
+    """
+    fn.returns_delta = True
+    return fn
+
+def as_delta_drift(drift_fn: Callable) -> Callable[[Assignment, CNF, float], Iterable[int]]:
+    """Adapt a legacy drift (returns the full new assignment) to the delta contract."""
+    if getattr(drift_fn, "returns_delta", False):
+        return drift_fn
+
+    @delta_drift
+    def adapted(assignment: Assignment, cnf: CNF, val: float) -> List[int]:
+        old_assign = assignment.copy()
+        new_assign = drift_fn(assignment, cnf, val)
+        if new_assign is not assignment:
+            assignment[:] = new_assign
+        if hasattr(assignment, "diff"):
+            # Gepackte Belegung: Wörter XOR-vergleichen statt Bit für Bit
+            return assignment.diff(old_assign)
+        return [i for i, (a, b) in enumerate(zip(old_assign, assignment)) if a != b]
+    return adapted
+
+@delta_drift
+def semantic_drift(assignment: Assignment, cnf: CNF, val: float, rng=None) -> List[int]:
+    """Flip k variables proportional to (1 - val); returns the flipped indices.
+
+    ``rng`` is the solver's :class:`~core.rng.SolverRNG` (global ``random`` if omitted).
+    """
+    n = len(assignment)
+    k = max(1, int(n * (1.0 - val) * 0.1))
+    idxs = rng.sample_indices(n, k) if rng is not None else random.sample(range(n), k)
+    if k >= 64 and hasattr(assignment, "flip_many"):
+        # Gepackte Belegung: viele Flips als ein vektorisiertes XOR auf den Wörtern
+        assignment.flip_many(idxs)
+        return idxs
     for idx in idxs:
         assignment[idx] = not assignment[idx]
-    return assignment
+    return idxs
@@ -0,0 +1,83 @@
+# Vektorisierte Zufallsinstanzen: geplantes (erfüllbares) und uniformes k-SAT
+import gzip
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from core.cnf_utils import CompiledCNF
+
+# Klauseln pro Block: begrenzt den Speicher beim Streamen, bestimmt die Ziehungsreihenfolge
+CHUNK = 1 << 18
+
+def _rng(seed) -> np.random.Generator:
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+def _distinct_vars(rng: np.random.Generator, n_vars: int, m: int, k: int) -> np.ndarray:
+    """(m, k) variable indices, distinct within each row (rows with repeats are redrawn)."""
+    vars_ = rng.integers(0, n_vars, size=(m, k), dtype=np.int32)
+    while True:
+        srt = np.sort(vars_, axis=1)
+        bad = np.flatnonzero((srt[:, 1:] == srt[:, :-1]).any(axis=1))
+        if not len(bad):
+            return vars_
+        vars_[bad] = rng.integers(0, n_vars, size=(len(bad), k), dtype=np.int32)
+
+def clause_chunks(n_vars: int, m_clauses: int, k: int = 3, seed=None, planted: bool = True,
+                  chunk: int = CHUNK) -> Iterator[np.ndarray]:
+    """Yield (rows, k) blocks of signed DIMACS literals for a random k-SAT formula.
+
+    Variables are distinct within a clause, polarities uniform.  With
+    ``planted`` a hidden assignment is drawn first and every clause it
+    violates gets its first literal negated, so the formula is satisfiable.
+    The blocks depend only on ``seed`` (not on how they are consumed), hence
+    :func:`random_ksat` and :func:`write_dimacs` produce the same formula.
+    """
+    if k > n_vars:
+        raise ValueError(f"k={k} distinct variables per clause need n_vars >= k, got {n_vars}")
+    rng = _rng(seed)
+    hidden = rng.random(n_vars) < 0.5 if planted else None
+    for lo in range(0, m_clauses, chunk):
+        m = min(chunk, m_clauses - lo)
+        vars_ = _distinct_vars(rng, n_vars, m, k)
+        pos = rng.random((m, k)) < 0.5
+        if planted:
+            unsat = ~(pos == hidden[vars_]).any(axis=1)
+            pos[unsat, 0] = ~pos[unsat, 0]
+        yield np.where(pos, vars_ + 1, -(vars_ + 1))
+
+def planted_solution(n_vars: int, seed=None) -> np.ndarray:
+    """The hidden assignment of ``clause_chunks(n_vars, ..., seed=seed, planted=True)``."""
+    return _rng(seed).random(n_vars) < 0.5
+
+def random_ksat(n_vars: int, m_clauses: int = None, k: int = 3, seed=None,
+                planted: bool = True) -> CompiledCNF:
+    """Random k-SAT instance as a :class:`CompiledCNF` (default ``m = round(4.26 n)``).
+
+    ``seed`` is an int, ``None`` or a ``numpy.random.Generator``; no Python
+    clause objects are built.
+    """
+    if m_clauses is None:
+        m_clauses = int(round(4.26 * n_vars))
+    blocks = list(clause_chunks(n_vars, m_clauses, k, seed, planted))
+    lits = np.concatenate(blocks).ravel() if blocks else np.zeros(0, dtype=np.int32)
+    return CompiledCNF(n_vars, lits, np.arange(0, len(lits) + 1, k, dtype=np.int32))
+
+def write_dimacs(path, n_vars: int, m_clauses: int = None, k: int = 3, seed=None,
+                 planted: bool = True) -> Tuple[int, int]:
+    """Stream a random k-SAT instance to a DIMACS file (``.gz`` compressed), block by block.
+
+    Returns ``(n_vars, m_clauses)``; memory stays O(block size).
+    """
+    if m_clauses is None:
+        m_clauses = int(round(4.26 * n_vars))
+    path = Path(path)
+    opener = gzip.open if path.name.endswith(".gz") else open
+    kind = "planted" if planted else "uniform"
+    # Ein Formatstring pro Block statt np.savetxt (das formatiert Zeile für Zeile)
+    line = " ".join(["%d"] * k) + " 0\n"
+    with opener(path, "wb") as f:
+        f.write(f"c {kind} random {k}-SAT, seed {seed}\np cnf {n_vars} {m_clauses}\n".encode())
+        for block in clause_chunks(n_vars, m_clauses, k, seed, planted):
+            f.write((line * len(block) % tuple(block.ravel().tolist())).encode())
+    return n_vars, m_clauses
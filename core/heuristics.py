@@ -1,8 +1,72 @@
 # Verschiedene Heuristiken und Strategien für das Z-System
+import random
+from typing import Callable, Dict, Sequence
 
-def random_flip(state, n_vars):
-    """Flippt zufällig eine Variable."""
-    import numpy as np
-    idx = np.random.randint(n_vars)
-    state[idx] = 1 - state[idx]
-    return state
+from core.drift_semantic import delta_drift
+
+@delta_drift
+def random_flip(state, cnf=None, val=None, rng=random):
+    """Flippt zufällig eine Variable (Drift-kompatibel, gibt den Index zurück)."""
+    idx = int(rng.random() * len(state))
+    state[idx] = not state[idx]
+    return [idx]
+
+# Lokale Züge: wählen aus den Variablen einer unsat-Klausel die zu flippende.
+# Signatur: move(candidates, break_count, rng) -> var; break_count[v] = Anzahl Klauseln,
+# die v als einziges wahres Literal haben (vom Solver inkrementell gepflegt).
+# rng: Zufallsquelle mit random()/choices() (der Solver bindet seinen SolverRNG, sonst global).
+
+def kernel_move(code: int, *params: float):
+    """Tag a local move with its numba kernel implementation ``(code, p1, p2)``."""
+    def wrap(fn):
+        fn.kernel = (code, *params, *(0.0,) * (2 - len(params)))
+        return fn
+    return wrap
+
+@kernel_move(0)
+def random_literal(candidates: Sequence[int], break_count: Sequence[int], rng=random) -> int:
+    """Zufälliges Literal der Klausel (ungewichteter Random Walk)."""
+    return candidates[int(rng.random() * len(candidates))]
+
+WALKSAT_NOISE = 0.567
+
+@kernel_move(1, WALKSAT_NOISE)
+def walksat(candidates: Sequence[int], break_count: Sequence[int], rng=random) -> int:
+    """WalkSAT/SKC: Freebie (break 0) sofort, sonst mit Rauschen zufällig, sonst minimaler Break."""
+    scores = [break_count[u] for u in candidates]
+    best = min(scores)
+    if best > 0 and rng.random() < WALKSAT_NOISE:
+        return candidates[int(rng.random() * len(candidates))]
+    ties = [u for u, s in zip(candidates, scores) if s == best]
+    return ties[int(rng.random() * len(ties))]
+
+PROBSAT_POLY_CB, PROBSAT_EPS = 2.38, 1.0
+PROBSAT_EXP_CB = 2.5
+
+@kernel_move(2, PROBSAT_POLY_CB, PROBSAT_EPS)
+def probsat(candidates: Sequence[int], break_count: Sequence[int], rng=random) -> int:
+    """ProbSAT, polynomiell: Gewicht (eps + break)^-cb."""
+    weights = [(PROBSAT_EPS + break_count[u]) ** -PROBSAT_POLY_CB for u in candidates]
+    return rng.choices(candidates, weights)[0]
+
+@kernel_move(3, PROBSAT_EXP_CB)
+def probsat_exp(candidates: Sequence[int], break_count: Sequence[int], rng=random) -> int:
+    """ProbSAT, exponentiell: Gewicht cb^-break."""
+    weights = [PROBSAT_EXP_CB ** -break_count[u] for u in candidates]
+    return rng.choices(candidates, weights)[0]
+
+LOCAL_MOVES: Dict[str, Callable[[Sequence[int], Sequence[int]], int]] = {
+    "random": random_literal,
+    "walksat": walksat,
+    "probsat": probsat,
+    "probsat-exp": probsat_exp,
+}
+
+def resolve_local_move(move) -> Callable[[Sequence[int], Sequence[int]], int]:
+    """Local move by name (see ``LOCAL_MOVES``) or a callable used as is."""
+    if callable(move):
+        return move
+    try:
+        return LOCAL_MOVES[move]
+    except KeyError:
+        raise ValueError(f"unknown local move {move!r}, expected one of {tuple(LOCAL_MOVES)}") from None
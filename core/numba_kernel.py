@@ -0,0 +1,219 @@
+# JIT-kompilierter Lösungskern für den ValenzDriftSolver (optional, benötigt numba)
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba ist optional
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+@njit(cache=True)
+def seed_rng(seed):
+    """Seed numba's internal generator (separate from NumPy's global state)."""
+    np.random.seed(seed)
+
+@njit(cache=True)
+def random_assignment(n_vars):
+    """Random assignment as packed ``uint64`` words (layout of ``PackedAssignment``)."""
+    words = np.zeros((n_vars + 63) // 64, dtype=np.uint64)
+    for v in range(n_vars):
+        if np.random.random() < 0.5:
+            words[v >> 6] |= np.uint64(1) << np.uint64(v & 63)
+    return words
+
+@njit(cache=True)
+def get_bit(words, v):
+    return (words[v >> 6] >> np.uint64(v & 63)) & np.uint64(1) != 0
+
+@njit(cache=True)
+def init_state(lit_var, lit_pos, clause_ptr, assign, true_count, true_sum, brk, unsat_dense, unsat_pos):
+    """Fill true-literal counts/sums, break counts and the unsat sparse set; returns |unsat|."""
+    n_unsat = 0
+    brk[:] = 0
+    for ci in range(len(clause_ptr) - 1):
+        tc = 0
+        ts = 0
+        for i in range(clause_ptr[ci], clause_ptr[ci + 1]):
+            v = lit_var[i]
+            if get_bit(assign, v) == lit_pos[i]:
+                tc += 1
+                ts += v
+        true_count[ci] = tc
+        true_sum[ci] = ts
+        if tc == 1:
+            brk[ts] += 1
+        if tc == 0:
+            unsat_dense[n_unsat] = ci
+            unsat_pos[ci] = n_unsat
+            n_unsat += 1
+        else:
+            unsat_pos[ci] = -1
+    return n_unsat
+
+@njit(cache=True)
+def record_trace(t_steps, t_vals, t_meta, t_mode, t_stride, index, value, final):
+    """Kernel counterpart of ``ValenceTrace.record``/``finish`` (modes as in ``MODES``)."""
+    if t_mode < 0:
+        return
+    count = t_meta[0]
+    size = len(t_steps)
+    if final:
+        if count > 0 and t_steps[(count - 1) % size] == index:
+            return
+    elif t_mode == 1:
+        if count > 0 and t_vals[count - 1] == value:
+            return
+    elif t_mode == 2:
+        if index % t_stride != 0:
+            return
+    slot = count % size if t_mode == 3 else count
+    t_steps[slot] = index
+    t_vals[slot] = value
+    t_meta[0] = count + 1
+
+@njit(cache=True)
+def _flip(v, assign, pos_ptr, pos_occ, neg_ptr, neg_occ,
+          true_count, true_sum, brk, unsat_dense, unsat_pos, n_unsat):
+    """Flip ``v`` and update counters via its occurrence lists; returns the new |unsat|."""
+    assign[v >> 6] ^= np.uint64(1) << np.uint64(v & 63)
+    if get_bit(assign, v):
+        t_ptr, t_occ, f_ptr, f_occ = pos_ptr, pos_occ, neg_ptr, neg_occ
+    else:
+        t_ptr, t_occ, f_ptr, f_occ = neg_ptr, neg_occ, pos_ptr, pos_occ
+    for i in range(t_ptr[v], t_ptr[v + 1]):
+        ci = t_occ[i]
+        true_count[ci] += 1
+        true_sum[ci] += v
+        if true_count[ci] == 1:
+            brk[v] += 1
+            # Aus dem unsat-Set entfernen: letztes Element in die Lücke
+            n_unsat -= 1
+            slot = unsat_pos[ci]
+            last = unsat_dense[n_unsat]
+            unsat_dense[slot] = last
+            unsat_pos[last] = slot
+            unsat_pos[ci] = -1
+        elif true_count[ci] == 2:
+            brk[true_sum[ci] - v] -= 1
+    for i in range(f_ptr[v], f_ptr[v + 1]):
+        ci = f_occ[i]
+        true_count[ci] -= 1
+        true_sum[ci] -= v
+        if true_count[ci] == 0:
+            brk[v] -= 1
+            unsat_dense[n_unsat] = ci
+            unsat_pos[ci] = n_unsat
+            n_unsat += 1
+        elif true_count[ci] == 1:
+            brk[true_sum[ci]] += 1
+    return n_unsat
+
+@njit(cache=True)
+def pick_var(lit_var, lo, hi, brk, move, p1, p2):
+    """Kernel counterparts of the local moves in ``core.heuristics`` (``kernel`` codes)."""
+    width = hi - lo
+    if move == 0:
+        return lit_var[lo + np.random.randint(width)]
+    if move == 1:
+        best = brk[lit_var[lo]]
+        for i in range(lo + 1, hi):
+            best = min(best, brk[lit_var[i]])
+        if best > 0 and np.random.random() < p1:
+            return lit_var[lo + np.random.randint(width)]
+        # Gleichverteilt unter den Variablen mit minimalem Break (Reservoir-Sampling)
+        chosen = lit_var[lo]
+        seen = 0
+        for i in range(lo, hi):
+            if brk[lit_var[i]] == best:
+                seen += 1
+                if np.random.randint(seen) == 0:
+                    chosen = lit_var[i]
+        return chosen
+    total = 0.0
+    for i in range(lo, hi):
+        b = brk[lit_var[i]]
+        total += (p2 + b) ** -p1 if move == 2 else p1 ** -b
+    r = np.random.random() * total
+    for i in range(lo, hi):
+        b = brk[lit_var[i]]
+        r -= (p2 + b) ** -p1 if move == 2 else p1 ** -b
+        if r <= 0.0:
+            return lit_var[i]
+    return lit_var[hi - 1]
+
+@njit(cache=True)
+def run_steps(lit_var, clause_ptr, pos_ptr, pos_occ, neg_ptr, neg_occ,
+              assign, true_count, true_sum, brk, unsat_dense, unsat_pos, scalars,
+              best_assign, mark, p_local, move, move_p1, move_p2, step0, n_steps,
+              t_steps, t_vals, t_meta, t_mode, t_stride):
+    """Run up to ``n_steps`` local-flip / semantic-drift steps starting at ``step0``.
+
+    ``assign`` and ``best_assign`` are packed ``uint64`` words, so recording
+    an improvement copies n/64 words.
+    ``scalars`` = ``[n_unsat, best_val, n_flips, n_local, n_improvements,
+    n_clause_updates]`` (float64) carries state and counters between
+    chunks.  ``move``/``move_p1``/``move_p2`` select the local move (see
+    :func:`pick_var`).  The ``t_*`` arguments are the buffers of a
+    ``ValenceTrace`` (``t_mode`` = -1 disables recording).  Returns the
+    number of steps executed; fewer than ``n_steps`` means solved.
+    """
+    n_vars = len(mark)
+    n_clauses = len(clause_ptr) - 1
+    n_unsat = np.int64(scalars[0])
+    best_val = scalars[1]
+    n_flips = np.int64(scalars[2])
+    n_local = np.int64(scalars[3])
+    n_improvements = np.int64(scalars[4])
+    n_updates = np.int64(scalars[5])
+    for step in range(step0, step0 + n_steps):
+        if n_unsat == 0:
+            record_trace(t_steps, t_vals, t_meta, t_mode, t_stride, step + 1, 1.0, True)
+            scalars[0] = 0
+            scalars[1] = best_val
+            scalars[2] = n_flips
+            scalars[3] = n_local
+            scalars[4] = n_improvements
+            scalars[5] = n_updates
+            return step - step0
+        val = (n_clauses - n_unsat) / n_clauses
+        if val > best_val:
+            best_val = val
+            best_assign[:] = assign
+            n_improvements += 1
+        record_trace(t_steps, t_vals, t_meta, t_mode, t_stride, step + 1, best_val, False)
+
+        if np.random.random() < p_local:
+            ci = unsat_dense[np.random.randint(n_unsat)]
+            v = pick_var(lit_var, clause_ptr[ci], clause_ptr[ci + 1], brk, move, move_p1, move_p2)
+            n_unsat = _flip(v, assign, pos_ptr, pos_occ, neg_ptr, neg_occ,
+                            true_count, true_sum, brk, unsat_dense, unsat_pos, n_unsat)
+            n_flips += 1
+            n_local += 1
+            n_updates += pos_ptr[v + 1] - pos_ptr[v] + neg_ptr[v + 1] - neg_ptr[v]
+        else:
+            # semantic_drift: k verschiedene Variablen proportional zu (1 - val) flippen
+            k = max(1, int(n_vars * (1.0 - val) * 0.1))
+            stamp = step + 1
+            flipped = 0
+            while flipped < k:
+                v = np.random.randint(n_vars)
+                if mark[v] == stamp:
+                    continue
+                mark[v] = stamp
+                n_unsat = _flip(v, assign, pos_ptr, pos_occ, neg_ptr, neg_occ,
+                                true_count, true_sum, brk, unsat_dense, unsat_pos, n_unsat)
+                n_updates += pos_ptr[v + 1] - pos_ptr[v] + neg_ptr[v + 1] - neg_ptr[v]
+                flipped += 1
+            n_flips += k
+    scalars[0] = n_unsat
+    scalars[1] = best_val
+    scalars[2] = n_flips
+    scalars[3] = n_local
+    scalars[4] = n_improvements
+    scalars[5] = n_updates
+    return n_steps
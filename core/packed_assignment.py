@@ -0,0 +1,168 @@
+# Bitgepackte Belegung: eine Variable pro Bit in uint64-Wörtern
+import random
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+class PackedAssignment:
+    """Boolean assignment stored as bits of NumPy ``uint64`` words.
+
+    Variable ``v`` is bit ``v % 64`` of ``words[v // 64]`` (little-endian bit
+    order, as ``np.packbits(..., bitorder="little")``), so 10^6 variables take
+    125 KB instead of 8 MB for a list of ``bool``.  Single-bit access goes
+    through a byte view of the words, which keeps ``a[v]`` / ``a.flip(v)``
+    cheap enough for the solver's Python loop; snapshots are word copies.
+    Behaves like a mutable sequence of ``bool`` (``len``, indexing, iteration,
+    ``copy``, ``np.asarray``).
+    """
+
+    __slots__ = ("n_vars", "words", "_bytes")
+
+    def __init__(self, n_vars: int, words: np.ndarray = None):
+        self.n_vars = n_vars
+        n_words = (n_vars + 63) // 64
+        self.words = np.zeros(n_words, dtype=np.uint64) if words is None else words
+        if len(self.words) != n_words:
+            raise ValueError(f"{n_vars} variables need {n_words} words, got {len(self.words)}")
+        self._bytes = memoryview(self.words.view(np.uint8))
+
+    @classmethod
+    def from_bools(cls, values) -> "PackedAssignment":
+        bools = np.asarray(values, dtype=bool)
+        n_vars = len(bools)
+        raw = np.zeros((n_vars + 63) // 64 * 8, dtype=np.uint8)
+        packed = np.packbits(bools, bitorder="little")
+        raw[:len(packed)] = packed
+        return cls(n_vars, raw.view(np.uint64))
+
+    @classmethod
+    def random(cls, n_vars: int, rnd=random) -> "PackedAssignment":
+        """Uniform random assignment drawn from ``rnd.getrandbits``."""
+        n_words = (n_vars + 63) // 64
+        raw = rnd.getrandbits(64 * n_words).to_bytes(8 * n_words, "little") if n_words else b""
+        out = cls(n_vars, np.frombuffer(bytearray(raw), dtype=np.uint64))
+        out._clear_tail()
+        return out
+
+    def _clear_tail(self) -> None:
+        # Bits jenseits von n_vars bleiben 0, damit Wortvergleiche und diff() stimmen
+        if self.n_vars % 64:
+            self.words[-1] &= np.uint64((1 << (self.n_vars % 64)) - 1)
+
+    def __len__(self) -> int:
+        return self.n_vars
+
+    def __getitem__(self, v: int) -> bool:
+        return self._bytes[v >> 3] & (1 << (v & 7)) != 0
+
+    def __setitem__(self, v, value) -> None:
+        if isinstance(v, slice):
+            if v != slice(None):
+                raise IndexError("only full-slice assignment is supported")
+            self.words[:] = PackedAssignment.from_bools(value).words
+            return
+        if value:
+            self._bytes[v >> 3] |= 1 << (v & 7)
+        else:
+            self._bytes[v >> 3] &= ~(1 << (v & 7)) & 0xFF
+
+    def flip(self, v: int) -> bool:
+        """Toggle variable ``v``; returns its new value."""
+        i, mask = v >> 3, 1 << (v & 7)
+        b = self._bytes[i] ^ mask
+        self._bytes[i] = b
+        return b & mask != 0
+
+    def flip_many(self, idxs: Iterable[int]) -> None:
+        """Toggle the given variables with one vectorised XOR (repeated indices toggle repeatedly)."""
+        idxs = np.asarray(idxs, dtype=np.int64)
+        np.bitwise_xor.at(self.words, idxs >> 6, np.left_shift(np.uint64(1), (idxs & 63).astype(np.uint64)))
+
+    def copy(self) -> "PackedAssignment":
+        return PackedAssignment(self.n_vars, self.words.copy())
+
+    def copy_from(self, other: "PackedAssignment") -> None:
+        """Overwrite with ``other``'s bits in place (a word copy, no allocation)."""
+        np.copyto(self.words, other.words)
+
+    def diff(self, other: "PackedAssignment") -> List[int]:
+        """Indices of the variables whose values differ from ``other``."""
+        changed = np.bitwise_xor(self.words, other.words).view(np.uint8)
+        return np.flatnonzero(np.unpackbits(changed, count=self.n_vars, bitorder="little")).tolist()
+
+    def to_bools(self) -> np.ndarray:
+        return np.unpackbits(self.words.view(np.uint8), count=self.n_vars, bitorder="little").astype(bool)
+
+    def tolist(self) -> List[bool]:
+        return self.to_bools().tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        bools = self.to_bools()
+        return bools if dtype is None else bools.astype(dtype)
+
+    def __iter__(self) -> Iterator[bool]:
+        return iter(self.tolist())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedAssignment):
+            return self.n_vars == other.n_vars and bool(np.array_equal(self.words, other.words))
+        return self.tolist() == list(other)
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+
+class FlipJournal:
+    """Best-so-far assignment tracked as a journal of flips instead of copies.
+
+    The journal holds every flipped index since ``base`` (a snapshot of the
+    working assignment).  An improvement only remembers the journal position,
+    so it costs O(1) instead of an O(n) copy; the best assignment is
+    ``base`` with the first ``best_at`` journal entries replayed and is only
+    materialised on request.  Once the journal exceeds ``capacity`` entries
+    it is folded into ``best``/``base`` (amortised O(1) per flip).
+    """
+
+    __slots__ = ("base", "best", "flips", "best_at", "capacity", "n_folded")
+
+    def __init__(self, assignment: PackedAssignment, capacity: int = None):
+        self.base = assignment.copy()
+        self.best = assignment.copy()
+        self.flips: List[int] = []
+        # Position im Journal, an der die beste Belegung lag; -1: steht bereits in self.best
+        self.best_at = 0
+        self.capacity = capacity if capacity is not None else max(1024, len(assignment) // 8)
+        self.n_folded = 0
+
+    def __len__(self) -> int:
+        """Total number of flips journaled, including folded ones."""
+        return self.n_folded + len(self.flips)
+
+    def mark_best(self) -> None:
+        """The current assignment (``base`` + all journal entries) is the new best."""
+        self.best_at = len(self.flips)
+
+    def _materialise(self) -> None:
+        if self.best_at >= 0:
+            self.best.copy_from(self.base)
+            if self.best_at:
+                self.best.flip_many(self.flips[:self.best_at])
+            self.best_at = -1
+
+    def rebase(self, assignment: PackedAssignment) -> None:
+        """Fold the journal: materialise the best, restart from ``assignment``."""
+        self._materialise()
+        self.base.copy_from(assignment)
+        self.n_folded += len(self.flips)
+        self.flips.clear()
+
+    def resume(self, best: PackedAssignment, n_flips: int) -> None:
+        """Continue a saved run: ``best`` is its best assignment, ``n_flips`` its flip count."""
+        self.best.copy_from(best)
+        self.best_at = -1
+        self.n_folded = n_flips
+
+    def best_assignment(self) -> PackedAssignment:
+        self._materialise()
+        return self.best
@@ -0,0 +1,251 @@
+# Populationsbasierter Modus: W Walker im Gleichschritt als NumPy-Arrays
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from core.cnf_utils import CNF, CompiledCNF, compile_cnf
+from core.drift_semantic import semantic_drift
+from core.search_memory import SearchMemory
+from core.solve_control import SolveControl
+from core.solver_stats import SolverStats
+from core.valence_resonance import valence_resonance
+from core.valence_trace import ValenceTrace
+from core.valenz_solver import ValenzDriftSolver
+
+Assignment = List[bool]
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    """``np.unique`` for the small key arrays of one step, without its per-call overhead."""
+    a = np.sort(a)
+    keep = np.empty(len(a), dtype=bool)
+    keep[:1] = True
+    np.not_equal(a[1:], a[:-1], out=keep[1:])
+    return a[keep]
+
+class PopulationSolver:
+    """Advance ``n_walkers`` independent Valenz-Drift walkers in lock-step.
+
+    State is held as (walkers × variables) assignments and (walkers × clauses)
+    true-literal counts.  Each step, every walker either flips a random
+    literal of one of its unsat clauses (probability ``p_local``) or applies
+    semantic drift (``k = max(1, int(n * (1 - val) * 0.1))`` random flips);
+    all flips of all walkers are applied with one scatter-add over their
+    occurrence lists.  The unsat clauses of all walkers are kept as one
+    sorted array of keys ``walker * n_clauses + clause``, updated from the
+    status changes of each scatter, so picking an unsat clause costs
+    O(log U) per walker instead of a scan of its clauses.  Every
+    ``restart_every`` steps the worst ``restart_frac`` of the walkers are
+    replaced by copies of the best ones.
+
+    ``solve`` returns the same tuple as :meth:`ValenzDriftSolver.solve` and
+    takes its trace, progress, stats, time-limit and callback arguments, but
+    not ``init``/``resume``/``checkpoint``; one step advances all walkers.
+    Flips and ``stats`` counters are summed over the walkers; the phase
+    timers stay empty.
+    """
+
+    def __init__(self,
+                 cnf: CNF | CompiledCNF,
+                 n_walkers: int = 32,
+                 p_local: float = 0.5,
+                 max_iter: int = 100_000,
+                 seed: int = None,
+                 restart_every: int = 1000,
+                 restart_frac: float = 0.25):
+        self.cnf = cnf
+        self.compiled = compile_cnf(cnf)
+        self.n_walkers = max(1, int(n_walkers))
+        self.p_local = p_local
+        self.max_iter = max_iter
+        self.restart_every = restart_every
+        self.restart_frac = restart_frac
+        self.rng = np.random.default_rng(seed)
+        self.n_vars = self.compiled.n_vars
+        self.n_clauses = self.compiled.n_clauses
+        self.n_flips = 0
+        self.stop_reason = None
+        # Vorkommen beider Polaritäten in einer CSR-Liste je Variable, Vorzeichen = Polarität
+        c = self.compiled
+        order = np.argsort(c.lit_var, kind="stable")
+        clause_of_lit = np.repeat(np.arange(self.n_clauses, dtype=np.int64), np.diff(c.clause_ptr))
+        self._occ_ptr = np.zeros(self.n_vars + 1, dtype=np.int64)
+        np.cumsum(np.bincount(c.lit_var, minlength=self.n_vars), out=self._occ_ptr[1:])
+        self._occ_clause = clause_of_lit[order]
+        self._occ_sign = np.where(c.lit_pos[order], 1, -1).astype(np.int32)
+
+    def _init_state(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        c = self.compiled
+        assign = self.rng.random((self.n_walkers, self.n_vars)) < 0.5
+        lit_true = assign[:, c.lit_var] == c.lit_pos
+        true_count = np.add.reduceat(lit_true.astype(np.int32), c.clause_ptr[:-1], axis=1)
+        n_unsat = (true_count == 0).sum(axis=1)
+        self._index_unsat(true_count)
+        return assign, true_count, n_unsat
+
+    def _index_unsat(self, true_count: np.ndarray) -> None:
+        # Zeilenweise flach: die Schlüssel walker * m + klausel kommen bereits sortiert heraus
+        self.unsat_keys = np.flatnonzero(true_count.ravel() == 0)
+
+    def _pick_unsat(self, true_count: np.ndarray, walkers: np.ndarray) -> np.ndarray:
+        """One uniformly random unsat clause per given walker (each must have one)."""
+        keys, base = self.unsat_keys, walkers.astype(np.int64) * self.n_clauses
+        lo = np.searchsorted(keys, base)
+        hi = np.searchsorted(keys, base + self.n_clauses)
+        return keys[lo + (self.rng.random(len(walkers)) * (hi - lo)).astype(np.int64)] - base
+
+    def _flip(self, assign, true_count, n_unsat, walkers: np.ndarray, vars_: np.ndarray) -> None:
+        """Flip the distinct ``(walker, var)`` pairs and scatter the count deltas."""
+        assign[walkers, vars_] ^= True
+        lo = self._occ_ptr[vars_]
+        lens = self._occ_ptr[vars_ + 1] - lo
+        ends = np.cumsum(lens)
+        total = int(ends[-1]) if len(ends) else 0
+        if not total:
+            return
+        # Vorkommenslisten aller geflippten Variablen flach aneinanderhängen
+        offsets = np.repeat(lo - (ends - lens), lens) + np.arange(total)
+        keys = np.repeat(walkers.astype(np.int64) * self.n_clauses, lens) + self._occ_clause[offsets]
+        # Literal wird wahr, wenn neuer Wert == Polarität
+        new_sign = np.where(assign[walkers, vars_], 1, -1).astype(np.int32)
+        delta = np.repeat(new_sign, lens) * self._occ_sign[offsets]
+        flat = true_count.reshape(-1)
+        uniq = _sorted_unique(keys)
+        before = flat[uniq] == 0
+        np.add.at(flat, keys, delta)
+        after = flat[uniq] == 0
+        n_unsat += np.bincount(uniq // self.n_clauses, weights=after.astype(np.int64) - before,
+                               minlength=self.n_walkers).astype(n_unsat.dtype)
+        # Sortierten Schlüssel-Index nachführen (uniq ist sortiert, also auch beide Teilmengen)
+        now_sat, now_unsat = uniq[before & ~after], uniq[after & ~before]
+        if len(now_sat) or len(now_unsat):
+            keys = self.unsat_keys
+            keep = np.ones(len(keys), dtype=bool)
+            keep[np.searchsorted(keys, now_sat)] = False
+            keys = np.concatenate((keys[keep], now_unsat))
+            keys.sort()
+            self.unsat_keys = keys
+
+    _trace_recorder = ValenzDriftSolver._trace_recorder
+    _trace_result = staticmethod(ValenzDriftSolver._trace_result)
+
+    def _restart(self, assign, true_count, n_unsat) -> bool:
+        """Replace the worst walkers by copies of the best; False if too few walkers to swap."""
+        n_swap = int(self.n_walkers * self.restart_frac)
+        if n_swap < 1 or n_swap * 2 > self.n_walkers:
+            return False
+        order = np.argsort(n_unsat, kind="stable")
+        best, worst = order[:n_swap], order[-n_swap:]
+        assign[worst] = assign[best]
+        true_count[worst] = true_count[best]
+        n_unsat[worst] = n_unsat[best]
+        self._index_unsat(true_count)
+        return True
+
+    def solve(self, valence_trace: list | ValenceTrace = None, progress: bool = False,
+              stats: SolverStats = None, time_limit: float = None, callback: Callable[[dict], bool] = None,
+              callback_every: int = None,
+              callback_interval: float = 0.1) -> Tuple[Assignment, float, int, list | ValenceTrace]:
+        c = self.compiled
+        self.n_flips = 0
+        self.stop_reason = None
+        control = SolveControl.create(self.max_iter, time_limit, callback, callback_every,
+                                      callback_interval, progress)
+        if stats is not None:
+            stats.start()
+            occ_len = np.diff(c.pos_ptr) + np.diff(c.neg_ptr)
+        m = self.n_clauses
+        assign, true_count, n_unsat = self._init_state()
+        leader = int(n_unsat.argmin())
+        best_val = float(m - n_unsat[leader]) / m if m else 0.0
+        best_assign = assign[leader].copy()
+        rec = self._trace_recorder(valence_trace)
+        if rec is not None:
+            rec.record(0, best_val)
+
+        walkers_all = np.arange(self.n_walkers)
+        next_check = control.next_check if control is not None else self.max_iter
+        steps_done = self.max_iter
+        for step in range(self.max_iter):
+            solved = np.flatnonzero(n_unsat == 0)
+            if len(solved):
+                if rec is not None:
+                    rec.finish(step + 1, 1.0)
+                self._finish(stats, control, step)
+                return assign[solved[0]].tolist(), 1.0, step, self._trace_result(valence_trace, rec)
+            leader = int(n_unsat.argmin())
+            val = float(m - n_unsat[leader]) / m
+            if val > best_val:
+                best_val = val
+                best_assign = assign[leader].copy()
+                if stats is not None:
+                    stats.n_improvements += 1
+            if rec is not None:
+                rec.record(step + 1, best_val)
+            if step >= next_check:
+                if control.checkpoint(step, best_val, self.n_flips, stats) is not None:
+                    steps_done = step
+                    break
+                next_check = control.next_check
+
+            local = self.rng.random(self.n_walkers) < self.p_local
+            w_loc = walkers_all[local]
+            ci = self._pick_unsat(true_count, w_loc)
+            lo = c.clause_ptr[ci]
+            width = c.clause_ptr[ci + 1] - lo
+            v_loc = c.lit_var[lo + (self.rng.random(len(ci)) * width).astype(np.int64)]
+
+            # Semantische Drift: k ~ (1 - val) Flips je driftendem Walker
+            w_drift = walkers_all[~local]
+            walkers, vars_ = w_loc, v_loc
+            if len(w_drift):
+                vals = (m - n_unsat[w_drift]) / m
+                k = np.maximum(1, (self.n_vars * (1.0 - vals) * 0.1).astype(np.int64))
+                w_rep = np.repeat(w_drift, k)
+                v_rep = self.rng.integers(0, self.n_vars, size=len(w_rep))
+                # Doppelte Ziehungen je Walker verwerfen, damit jedes Paar genau einmal flippt
+                pair = _sorted_unique(w_rep.astype(np.int64) * self.n_vars + v_rep)
+                walkers = np.concatenate([w_loc, pair // self.n_vars])
+                vars_ = np.concatenate([v_loc, pair % self.n_vars])
+            self._flip(assign, true_count, n_unsat, walkers, vars_)
+            self.n_flips += len(vars_)
+            if stats is not None:
+                stats.n_local += len(w_loc)
+                stats.n_drift += len(w_drift)
+                stats.n_flips = self.n_flips
+                stats.n_clause_updates += int(occ_len[vars_].sum())
+
+            if self.restart_every and (step + 1) % self.restart_every == 0:
+                if self._restart(assign, true_count, n_unsat) and stats is not None:
+                    stats.n_restarts += 1
+
+        if rec is not None:
+            rec.finish(steps_done + 1, best_val)
+        self._finish(stats, control, steps_done)
+        return best_assign.tolist(), best_val, steps_done, self._trace_result(valence_trace, rec)
+
+    def _finish(self, stats: SolverStats, control: SolveControl, step: int) -> None:
+        if stats is not None:
+            stats.stop()
+        if control is not None:
+            control.close(step)
+            self.stop_reason = control.stop_reason
+
+def make_solver(cnf: CNF | CompiledCNF, population: int = 0, max_iter: int = 100_000,
+                seed: int = None, backend: str = "python", p_local: float = 0.5,
+                search_memory: SearchMemory = None, local_move: str = "random"):
+    """Runner entry point: ``population`` walkers in lock-step, else the single-walker solver.
+
+    The population mode only runs random-literal local moves in NumPy;
+    another ``backend``, ``local_move`` or a ``search_memory`` raises
+    ``ValueError`` instead of being ignored.
+    """
+    if population:
+        unsupported = [name for name, given in (("backend", backend != "python"),
+                                                ("local_move", local_move != "random"),
+                                                ("search_memory", search_memory is not None)) if given]
+        if unsupported:
+            raise ValueError(f"population mode does not support {', '.join(unsupported)}")
+        return PopulationSolver(cnf, n_walkers=population, p_local=p_local, max_iter=max_iter, seed=seed)
+    return ValenzDriftSolver(cnf, valence_resonance, semantic_drift, p_local=p_local,
+                             max_iter=max_iter, seed=seed, backend=backend, search_memory=search_memory,
+                             local_move=local_move)
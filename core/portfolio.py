@@ -0,0 +1,136 @@
+# Portfolio-Modus: mehrere Solver-Konfigurationen parallel auf derselben Instanz
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+from time import perf_counter
+from typing import List, Sequence
+
+import numpy as np
+
+from core.cnf_utils import CompiledCNF
+from core.drift_semantic import semantic_drift
+from core.search_memory import SearchMemory
+from core.solver_stats import SolverStats
+from core.valence_resonance import valence_resonance
+from core.valence_trace import ValenceTrace
+from core.valenz_solver import ValenzDriftSolver
+
+def portfolio_configs(n_workers: int, seed: int = None, p_locals: Sequence[float] = None) -> List[dict]:
+    """One ``{"worker", "seed", "p_local"}`` dict per worker.
+
+    Seeds are spawned from ``seed`` via ``SeedSequence``; ``p_local`` is spread
+    evenly over [0.3, 0.9] unless given explicitly (cycled if shorter).
+    """
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_workers)]
+    if not p_locals:
+        p_locals = np.linspace(0.3, 0.9, n_workers).tolist() if n_workers > 1 else [0.5]
+    return [{"worker": i, "seed": seeds[i], "p_local": round(float(p_locals[i % len(p_locals)]), 4)}
+            for i in range(n_workers)]
+
+def _share(cnf: CompiledCNF):
+    """Copy the compiled arrays into shared memory blocks; returns (blocks, spec)."""
+    blocks, spec = [], {}
+    for name in CompiledCNF.ARRAYS:
+        arr = getattr(cnf, name)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+def _attach(spec: dict):
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
+
+def _run_config(cnf: CompiledCNF, config: dict, max_iter: int, backend: str, trace_args: tuple,
+                solver_opts: dict) -> dict:
+    memory = solver_opts.get("search_memory")
+    # Such-Gedächtnis ist zustandsbehaftet: jeder Worker baut sein eigenes
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift,
+                               p_local=config["p_local"], max_iter=max_iter,
+                               seed=config["seed"], backend=backend,
+                               local_move=solver_opts.get("local_move", "random"),
+                               search_memory=SearchMemory(cnf.n_vars, **memory) if memory is not None else None)
+    trace = ValenceTrace(*trace_args) if trace_args is not None else None
+    stats = SolverStats() if solver_opts.get("stats") else None
+    t0 = perf_counter()
+    assignment, best_val, steps, trace = solver.solve(valence_trace=trace, stats=stats,
+                                                      time_limit=solver_opts.get("time_limit"))
+    result = dict(config, best_valence=best_val, steps=steps, runtime_sec=perf_counter() - t0,
+                  assignment=assignment, trace=trace if trace_args is not None else None)
+    if stats is not None:
+        result["stats"] = stats.as_dict()
+    if memory is not None:
+        result["plateaus"] = len(solver.memory["plateaus"])
+    if solver.stop_reason is not None:
+        result["stopped"] = solver.stop_reason
+    return result
+
+def _worker(spec, n_vars, config, max_iter, backend, trace_args, solver_opts, results):
+    blocks, arrays = _attach(spec)
+    try:
+        results.put(_run_config(CompiledCNF.from_arrays(n_vars, arrays), config, max_iter, backend, trace_args,
+                                solver_opts))
+    finally:
+        # Views freigeben, bevor die Blöcke geschlossen werden
+        del arrays
+        for shm in blocks:
+            shm.close()
+
+def solve_portfolio(cnf: CompiledCNF, n_workers: int, max_iter: int = 100_000, seed: int = None,
+                    p_locals: Sequence[float] = None, backend: str = "python", trace_args: tuple = None,
+                    local_move: str = "random", search_memory: dict = None, time_limit: float = None,
+                    stats: bool = False) -> dict:
+    """Run ``n_workers`` solvers with different seeds/``p_local`` on the same instance.
+
+    ``local_move``, ``time_limit`` and ``search_memory`` (keyword arguments
+    of :class:`SearchMemory` without ``n_vars``) apply to every worker;
+    with ``stats`` each result carries its :class:`SolverStats` dict.
+
+    The compiled CNF is placed in shared memory once instead of being pickled
+    per worker.  As soon as one worker reports valence 1.0 all others are
+    terminated.  Returns the winning worker's result (``worker``, ``seed``,
+    ``p_local``, ``best_valence``, ``steps``, ``runtime_sec``, ``assignment``,
+    ``trace``) plus ``configs`` and the results of all workers that finished.
+    """
+    configs = portfolio_configs(n_workers, seed, p_locals)
+    solver_opts = dict(local_move=local_move, search_memory=search_memory, time_limit=time_limit, stats=stats)
+    blocks, spec = _share(cnf)
+    results = mp.Queue()
+    procs = [mp.Process(target=_worker, args=(spec, cnf.n_vars, cfg, max_iter, backend, trace_args, solver_opts,
+                                              results),
+                        daemon=True)
+             for cfg in configs]
+    finished: List[dict] = []
+    try:
+        for p in procs:
+            p.start()
+        while len(finished) < len(procs):
+            try:
+                res = results.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs) and results.empty():
+                    break  # Worker abgestürzt, ohne ein Ergebnis zu liefern
+                continue
+            finished.append(res)
+            if res["best_valence"] == 1.0:
+                break
+    finally:
+        # Erste Lösung gefunden (oder alle fertig): restliche Worker abbrechen
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    if not finished:
+        raise RuntimeError("no portfolio worker returned a result")
+    winner = max(finished, key=lambda r: (r["best_valence"], -r["steps"]))
+    return dict(winner, configs=configs,
+                finished=[{k: v for k, v in r.items() if k not in ("assignment", "trace")} for r in finished])
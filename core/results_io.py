@@ -0,0 +1,177 @@
+# Ergebnis-Ausgabe der Runner: zeilenweise gestreamt als CSV oder JSONL, optional in einen spaltenorientierten Store
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Set
+
+import pandas as pd
+
+from core.solver_stats import COUNTERS, SolverStats
+
+try:
+    import pyarrow  # noqa: F401  (Parquet-Engine für pandas)
+    PART_FORMAT = "parquet"
+except ImportError:
+    PART_FORMAT = "csv"
+
+# Einheitliches Schema aller Runner (Spalte -> pandas-dtype); was ein Runner nicht kennt, bleibt leer
+SCHEMA = {
+    "run_id": "string", "source": "string", "instance": "string",
+    "n": "Int64", "m": "Int64", "ratio": "float64", "k": "Int64", "run": "Int64",
+    "seed": "Int64", "solver_seed": "Int64",
+    "backend": "string", "local_move": "string", "population": "Int64",
+    "p_local": "float64", "max_iter": "Int64", "time_limit": "float64",
+    "solved": "boolean", "best_valence": "float64", "steps": "Int64",
+    "runtime_sec": "float64", "timed_out": "boolean",
+    **{c: "Int64" if c in COUNTERS else "float64" for c in SolverStats.COLUMNS},
+}
+# Spaltennamen der DIMACS-Runner und der GUI-CSV -> Schema
+ALIASES = {"filename": "instance", "Datei": "instance", "Testlauf": "run_id", "Variablen": "n",
+           "Klauseln": "m", "Valenz": "best_valence", "Schritte": "steps",
+           "Laufzeit [s]": "runtime_sec", "Gelöst": "solved"}
+
+class ResultWriter:
+    """Append result rows to a CSV or JSONL file (by suffix) as they arrive.
+
+    Every row is flushed immediately, so a crashed batch keeps all finished
+    instances.  With ``resume=True`` an existing file is appended to instead
+    of overwritten.  Rows are also passed on to ``store`` (a
+    :class:`ResultStore`) if given.
+    """
+
+    def __init__(self, path, columns: Iterable[str], resume: bool = False, store=None):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.store = store
+        self.jsonl = self.path.suffix == ".jsonl"
+        append = resume and self.path.exists() and self.path.stat().st_size > 0
+        self._file = open(self.path, "a" if append else "w", newline="")
+        self._csv = None
+        if not self.jsonl:
+            self._csv = csv.writer(self._file)
+            if not append:
+                self._csv.writerow(self.columns)
+                self._file.flush()
+
+    def write(self, row: dict) -> None:
+        if self.jsonl:
+            self._file.write(json.dumps({c: row.get(c) for c in self.columns}) + "\n")
+        else:
+            self._csv.writerow([row.get(c) for c in self.columns])
+        self._file.flush()
+        if self.store is not None:
+            self.store.write(row)
+
+    def close(self) -> None:
+        self._file.close()
+        if self.store is not None:
+            self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_done(path, key: str) -> Set[str]:
+    """Values of column ``key`` already present in a result file (for resuming)."""
+    path = Path(path)
+    if not path.exists():
+        return set()
+    with open(path, newline="") as f:
+        if path.suffix == ".jsonl":
+            return {str(json.loads(line)[key]) for line in f if line.strip()}
+        return {row[key] for row in csv.DictReader(f) if row.get(key)}
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+def conform(df: pd.DataFrame, columns: Iterable[str] = None) -> pd.DataFrame:
+    """``df`` renamed and cast to :data:`SCHEMA` (missing columns empty, unknown ones dropped)."""
+    df = df.rename(columns=ALIASES)
+    if {"n", "m"} <= set(df.columns):
+        derived = df["m"] / df["n"]
+        df["ratio"] = df["ratio"].fillna(derived) if "ratio" in df.columns else derived
+    columns = list(SCHEMA) if columns is None else [c for c in columns if c in SCHEMA]
+    return pd.DataFrame({c: df[c].astype(SCHEMA[c]) if c in df.columns
+                         else pd.Series(None, index=df.index, dtype=SCHEMA[c]) for c in columns})
+
+class ResultStore:
+    """Columnar result store, one partition directory per run.
+
+    Rows are buffered and written as ``<root>/run_id=<id>/part-NNNNN.parquet``
+    every ``flush_every`` rows and on close, conformed to :data:`SCHEMA`;
+    ``meta`` (backend, max_iter, ...) is added to every row.  Without
+    pyarrow the parts are CSV files in the same layout.  Reopening a run id
+    appends new parts.
+    """
+
+    def __init__(self, root, run_id: str = None, meta: dict = None, flush_every: int = 256):
+        self.run_id = run_id or new_run_id()
+        self.dir = Path(root) / f"run_id={self.run_id}"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.meta = dict(meta or {}, run_id=self.run_id)
+        self.flush_every = flush_every
+        self._rows: List[dict] = []
+        self._part = len(list(self.dir.glob("part-*")))
+
+    def write(self, row: dict) -> None:
+        self._rows.append({**self.meta, **row})
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        df = conform(pd.DataFrame(self._rows))
+        path = self.dir / f"part-{self._part:05d}.{PART_FORMAT}"
+        if PART_FORMAT == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        self._part += 1
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read(path: Path, columns: List[str]) -> pd.DataFrame:
+    name = path.name
+    if name.endswith(".parquet"):
+        return pd.read_parquet(path, columns=[c for c in columns if c in SCHEMA])
+    if name.endswith(".jsonl"):
+        return pd.read_json(path, lines=True)
+    # Nur die benötigten Spalten parsen (auch unter ihrem Alias)
+    return pd.read_csv(path, usecols=lambda c: ALIASES.get(c, c) in columns)
+
+def scan_results(paths: Iterable, columns: Iterable[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield result tables conformed to :data:`SCHEMA`, one per part file.
+
+    ``paths`` may mix store roots, run directories and single CSV/JSONL/Parquet
+    result files of any runner; only ``columns`` (default: all) are read.
+    Files without a ``run_id`` column get their file stem as run id.
+    """
+    columns = list(SCHEMA) if columns is None else [c for c in columns if c in SCHEMA]
+    wanted = list(dict.fromkeys(["run_id"] + columns + (["n", "m"] if "ratio" in columns else [])))
+    for path in map(Path, paths):
+        parts = sorted(path.rglob("part-*")) if path.is_dir() else [path]
+        for part in parts:
+            df = conform(_read(part, wanted), wanted)
+            if df["run_id"].isna().all():
+                run_id = part.parent.name.split("=", 1)[-1] if path.is_dir() else part.name.split(".")[0]
+                df["run_id"] = pd.Series(run_id, index=df.index, dtype="string")
+            yield df[columns]
+
+def load_results(paths: Iterable, columns: Iterable[str] = None) -> pd.DataFrame:
+    """All rows of :func:`scan_results` in one table."""
+    frames = list(scan_results(paths, columns))
+    if not frames:
+        return conform(pd.DataFrame(), columns)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,49 @@
+# Zufallsquelle pro Solver statt des globalen random-Moduls
+import inspect
+import random
+from functools import partial
+from typing import Callable, List
+
+import numpy as np
+
+class SolverRNG(random.Random):
+    """Per-solver random source, reproducible from one seed.
+
+    Scalar draws in the hot loop use the inherited C Mersenne Twister
+    (``random()``, ``getrandbits``, ``sample``): a NumPy ``Generator`` costs
+    ~0.6 µs per scalar call and even a pre-drawn block consumed from Python
+    is slower than ``Random.random()``.  Bulk draws (large index sets,
+    uniform blocks) go to ``gen``, a ``numpy.random.Generator`` seeded from
+    the same ``SeedSequence``.  Two solvers with different instances never
+    share state, so they can run side by side in threads or one process.
+    """
+
+    # Ab dieser Größe ist eine Ziehung über NumPy schneller als random.sample
+    BULK = 64
+
+    def __init__(self, seed=None):
+        seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        super().__init__(int(seq.generate_state(2, np.uint64)[0]))
+        self.gen = np.random.default_rng(seq)
+
+    def getstate(self):
+        return super().getstate(), self.gen.bit_generator.state
+
+    def setstate(self, state) -> None:
+        py_state, np_state = state
+        super().setstate(py_state)
+        self.gen.bit_generator.state = np_state
+
+    def sample_indices(self, n: int, k: int) -> List[int]:
+        """``k`` distinct indices from ``range(n)``."""
+        if k < self.BULK:
+            return self.sample(range(n), k)
+        return self.gen.choice(n, k, replace=False, shuffle=False).tolist()
+
+def bind_rng(fn: Callable, rng: random.Random) -> Callable:
+    """``fn`` with ``rng=rng`` bound if it takes an ``rng`` parameter, else ``fn`` itself."""
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return fn
+    return partial(fn, rng=rng) if "rng" in params else fn
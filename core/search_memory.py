@@ -0,0 +1,67 @@
+# Such-Gedächtnis für den ValenzDriftSolver: Tabu-Liste, Plateau-Erkennung, Eskalation
+import numpy as np
+
+ESCALATE = "escalate"
+RESTART = "restart"
+
+class SearchMemory:
+    """Tabu tenure, plateau detection and adaptive escalation, all O(1) per step.
+
+    * Tabu: a flipped variable is not chosen by a local move for the next
+      ``tenure`` steps (``tabu_until`` is a NumPy array indexed by variable).
+    * Plateau: the best valence has not improved for ``window`` steps.
+    * Adaptive noise: ``noise`` is the probability of a drift move instead
+      of a local one, starting at the solver's ``1 - p_local``.  Every
+      plateau raises it by ``(1 - noise) * phi`` (up to ``max_noise``), every
+      improvement lowers it by ``(noise - min_noise) * phi / 2``, as in
+      adaptive WalkSAT.  By default the noise stays between the starting
+      value and 0.2 above it, so the local/drift ratio follows the user's
+      ``p_local`` and plateaus add at most 20 points of drift.
+    * Restart: after ``restart_after`` plateaus in a row the solver restarts
+      from a fresh random assignment (0 = never).
+    """
+
+    def __init__(self, n_vars: int, tenure: int = 10, window: int = 10_000,
+                 phi: float = 0.2, max_noise: float = None, min_noise: float = None,
+                 restart_after: int = 5):
+        self.tenure = tenure
+        self.window = window
+        self.phi = phi
+        self.max_noise = max_noise
+        self.min_noise = min_noise
+        self.restart_after = restart_after
+        self.tabu_until = np.zeros(n_vars, dtype=np.int64)
+        self.reset()
+
+    def reset(self, noise: float = 0.0) -> None:
+        self.tabu_until[:] = 0
+        self.noise = noise
+        # Grenzen relativ zum Start-Rauschen (1 - p_local), sofern nicht explizit gesetzt
+        self.floor = noise if self.min_noise is None else min(self.min_noise, noise)
+        self.ceiling = min(1.0, noise + 0.2) if self.max_noise is None else max(self.max_noise, noise)
+        self.streak = 0
+        self.last_improvement = 0
+
+    def is_tabu(self, var: int, step: int) -> bool:
+        return self.tabu_until[var] > step
+
+    def flipped(self, var: int, step: int) -> None:
+        self.tabu_until[var] = step + self.tenure
+
+    def improved(self, step: int) -> None:
+        self.last_improvement = step
+        self.noise -= (self.noise - self.floor) * self.phi / 2
+        self.streak = 0
+
+    def check(self, step: int) -> str | None:
+        """``None``, ``ESCALATE`` or ``RESTART`` once ``window`` steps passed without improvement."""
+        if step - self.last_improvement < self.window:
+            return None
+        # Fenster neu starten, damit die nächste Eskalation wieder ``window`` Schritte wartet
+        self.last_improvement = step
+        self.streak += 1
+        if self.restart_after and self.streak >= self.restart_after:
+            self.streak = 0
+            return RESTART
+        self.noise = min(self.ceiling, self.noise + (1.0 - self.noise) * self.phi)
+        return ESCALATE
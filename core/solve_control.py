@@ -0,0 +1,90 @@
+# Zeitbudget, periodische Callbacks, Checkpoint-Takt und grober Fortschrittsbalken für solve()
+from time import perf_counter
+from typing import Callable
+
+TIME_LIMIT = "time_limit"
+CALLBACK = "callback"
+
+class SolveControl:
+    """Checkpoints of a ``solve()`` run: time limit, callback and progress bar.
+
+    The solver loop only compares ``step >= control.next_check``; everything
+    else happens in :meth:`checkpoint`.  With ``every`` set, checkpoints are
+    every ``every`` steps; otherwise the step distance adapts so that
+    checkpoints are about ``interval`` seconds apart, whatever the speed of
+    the loop.  At each checkpoint the time limit is checked, the progress bar
+    advanced and ``callback(info)`` called; ``info`` is a dict with ``step``,
+    ``best_valence``, ``elapsed``, ``n_flips`` and ``stats``.  A truthy
+    return value stops the search.  With ``save_interval`` set, ``save_due``
+    tells the solver to write its state file at this checkpoint (at most
+    once per ``save_interval`` seconds).
+    """
+
+    FIRST_CHECK = 64
+
+    def __init__(self, max_iter: int, time_limit: float = None, callback: Callable[[dict], bool] = None,
+                 every: int = None, interval: float = 0.1, progress: bool = False,
+                 save_interval: float = None):
+        self.max_iter = max_iter
+        self.time_limit = time_limit
+        self.callback = callback
+        self.every = every
+        self.interval = interval
+        self.bar = None
+        if progress:
+            try:
+                from tqdm import tqdm
+                self.bar = tqdm(total=max_iter, desc="Solving", unit="step")
+            except ImportError:
+                pass
+        self.stop_reason = None
+        self.save_interval = save_interval
+        self.save_due = False
+        self.t0 = perf_counter()
+        self._t_last = self.t0
+        self._t_save = self.t0
+        self._step_last = 0
+        self._stride = every or self.FIRST_CHECK
+        self.next_check = min(self._stride, max_iter)
+
+    @classmethod
+    def create(cls, max_iter: int, time_limit: float = None, callback: Callable = None,
+               every: int = None, interval: float = 0.1, progress: bool = False,
+               save_interval: float = None) -> "SolveControl | None":
+        """``None`` when nothing needs checkpoints, so the loop runs unchanged."""
+        if time_limit is None and callback is None and not progress and save_interval is None:
+            return None
+        return cls(max_iter, time_limit, callback, every, interval, progress, save_interval)
+
+    def checkpoint(self, step: int, best_val: float, n_flips: int = 0, stats=None) -> str | None:
+        """Run the checks for ``step``; returns a stop reason or ``None``."""
+        now = perf_counter()
+        if self.bar is not None:
+            self.bar.update(step - self._step_last)
+        elapsed = now - self.t0
+        if self.every is None:
+            # Schrittabstand so nachführen, dass Checkpoints etwa ``interval`` auseinander liegen
+            # (vor Ablauf des Zeitbudgets entsprechend früher)
+            target = self.interval
+            if self.time_limit is not None:
+                target = max(min(target, self.time_limit - elapsed), 1e-3)
+            dt = now - self._t_last
+            rate = (step - self._step_last) / dt if dt > 0 else self._stride * 4 / target
+            self._stride = max(1, min(self._stride * 4, int(rate * target)))
+        self._t_last, self._step_last = now, step
+        self.save_due = self.save_interval is not None and now - self._t_save >= self.save_interval
+        if self.save_due:
+            self._t_save = now
+        self.next_check = min(step + self._stride, self.max_iter)
+        if self.time_limit is not None and elapsed >= self.time_limit:
+            self.stop_reason = TIME_LIMIT
+        elif self.callback is not None and self.callback({"step": step, "best_valence": best_val,
+                                                          "elapsed": elapsed, "n_flips": n_flips,
+                                                          "stats": stats}):
+            self.stop_reason = CALLBACK
+        return self.stop_reason
+
+    def close(self, step: int) -> None:
+        if self.bar is not None:
+            self.bar.update(step - self._step_last)
+            self.bar.close()
@@ -0,0 +1,68 @@
+# Opt-in Instrumentierung der Solver-Schleife: Zähler und gesampelte Phasen-Timer
+from time import perf_counter
+from typing import Callable, Dict
+
+COUNTERS = ("n_local", "n_drift", "n_flips", "n_clause_updates",
+            "n_improvements", "n_restarts", "n_plateaus")
+PHASES = ("valence", "local_move", "drift", "propagate", "memory")
+
+class SolverStats:
+    """Counters and per-phase timers filled by ``solve(..., stats=SolverStats())``.
+
+    The solver wraps its phase functions with :meth:`timed` only when a
+    stats object is passed, so an uninstrumented run executes exactly the
+    same loop as before.  Timers measure every ``sample_every``-th call
+    and are scaled up by that factor, so on short runs they are rough
+    estimates; ``t_other`` is the remainder of the wall time (loop
+    overhead, trace recording, progress bar).  ``sample_every=1`` times
+    every call.
+    """
+
+    COLUMNS = COUNTERS + tuple("t_" + p for p in PHASES) + ("t_other", "t_total")
+
+    def __init__(self, sample_every: int = 16):
+        self.sample_every = max(1, sample_every)
+        self.reset()
+
+    def reset(self) -> None:
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.t_total = 0.0
+        self._t0 = None
+
+    def start(self) -> None:
+        self.reset()
+        self._t0 = perf_counter()
+
+    def stop(self) -> None:
+        self.t_total = perf_counter() - self._t0
+
+    def timed(self, phase: str, fn: Callable, on_call: Callable = None) -> Callable:
+        """Wrap ``fn``: count calls to ``phase``, time every ``sample_every``-th one.
+
+        ``on_call(*args)`` runs before each call (used for extra counters).
+        """
+        every, seconds, calls = self.sample_every, self.seconds, self.calls
+
+        def wrapper(*args):
+            if on_call is not None:
+                on_call(*args)
+            n = calls[phase] + 1
+            calls[phase] = n
+            if n % every:
+                return fn(*args)
+            t0 = perf_counter()
+            out = fn(*args)
+            seconds[phase] += (perf_counter() - t0) * every
+            return out
+        return wrapper
+
+    def as_dict(self) -> dict:
+        out = {name: getattr(self, name) for name in COUNTERS}
+        for phase in PHASES:
+            out["t_" + phase] = self.seconds[phase]
+        out["t_other"] = max(0.0, self.t_total - sum(self.seconds.values()))
+        out["t_total"] = self.t_total
+        return out
@@ -0,0 +1,47 @@
+# Indizierte Sparse-Set-Struktur für die unsat-Buchhaltung des Solvers
+import random
+from typing import Iterable, Iterator
+
+class SparseSet:
+    """Set of ints in ``[0, capacity)`` with O(1) add, discard and uniform sampling.
+
+    Members live packed in ``dense[:size]``; ``pos[x]`` is the slot of ``x`` in
+    ``dense`` or ``-1``.  Removal swaps the last member into the freed slot, so
+    the dense prefix never has holes and sampling is a single index draw.
+    """
+    __slots__ = ("dense", "pos", "size")
+
+    def __init__(self, capacity: int, items: Iterable[int] = ()):
+        self.dense = [0] * capacity
+        self.pos = [-1] * capacity
+        self.size = 0
+        for x in items:
+            self.add(x)
+
+    def add(self, x: int) -> None:
+        if self.pos[x] < 0:
+            self.dense[self.size] = x
+            self.pos[x] = self.size
+            self.size += 1
+
+    def discard(self, x: int) -> None:
+        i = self.pos[x]
+        if i >= 0:
+            self.size -= 1
+            last = self.dense[self.size]
+            self.dense[i] = last
+            self.pos[last] = i
+            self.pos[x] = -1
+
+    def sample(self, rnd=random) -> int:
+        """Uniformly random member (the set must not be empty)."""
+        return self.dense[int(rnd.random() * self.size)]
+
+    def __contains__(self, x: int) -> bool:
+        return self.pos[x] >= 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.dense[:self.size])
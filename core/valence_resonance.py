@@ -1,5 +1,9 @@
 # Resonanzbasierte Valenzfunktion für das ⦲SYSTEM-Toolkit
-from typing import List, Sequence, Tuple
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from core.cnf_utils import CompiledCNF, compile_cnf
 
 Boolean = bool
 Literal = Tuple[int, bool]
@@ -7,7 +11,75 @@ Clause = Sequence[Literal]
 CNF = List[Clause]
 Assignment = List[Boolean]
 
+def incremental(from_state: Callable[[int, int], float]):
+    """Mark a valence function as derivable from the solver's maintained state.
+
+    ``from_state(n_unsat, n_clauses)`` must return the same value as the full
+    evaluation; the solver then skips the O(m) rescan per step.
+    """
+    def wrap(fn):
+        fn.from_state = from_state
+        return fn
+    return wrap
+
+def _resonance_from_state(n_unsat: int, n_clauses: int) -> float:
+    return (n_clauses - n_unsat) / n_clauses if n_clauses else 0.0
+
+@incremental(_resonance_from_state)
 def valence_resonance(cnf: CNF, assignment: Assignment) -> float:
     """Fraction of clauses satisfied (resonanzbasierte Valenz)."""
     sat = sum(any(assignment[v] if pol else not assignment[v] for v, pol in cl) for cl in cnf)
     return sat / len(cnf) if cnf else 0.0
+
+# Obergrenze für Zwischen-Arrays der Batch-Auswertung (Elemente pro Block)
+BATCH_BLOCK = 1 << 24
+
+def valence_resonance_batch(cnf: CNF | CompiledCNF, assignments, packed: bool = None) -> np.ndarray:
+    """Resonance valence of many assignments at once.
+
+    ``assignments`` is a (candidates × variables) boolean matrix.  Literal
+    values are gathered for all candidates and OR-reduced per clause with
+    ``reduceat``.  With ``packed=True`` (default from 8 candidates on) the
+    candidates are bit-packed first, so one byte carries eight of them.
+    Returns a float64 array with one valence per row.
+    """
+    cnf = compile_cnf(cnf)
+    assign = np.atleast_2d(np.asarray(assignments, dtype=bool))
+    n_cand = assign.shape[0]
+    if cnf.n_clauses == 0:
+        return np.zeros(n_cand)
+    if packed is None:
+        packed = n_cand >= 8
+    sat = _sat_counts_packed(cnf, assign) if packed else _sat_counts_dense(cnf, assign)
+    return sat / cnf.n_clauses
+
+def _sat_counts_dense(cnf: CompiledCNF, assign: np.ndarray) -> np.ndarray:
+    starts = cnf.clause_ptr[:-1]
+    rows = max(1, BATCH_BLOCK // max(len(cnf.lits), 1))
+    counts = np.empty(assign.shape[0], dtype=np.int64)
+    for r0 in range(0, assign.shape[0], rows):
+        lit_true = assign[r0:r0 + rows][:, cnf.lit_var] == cnf.lit_pos
+        counts[r0:r0 + rows] = np.logical_or.reduceat(lit_true, starts, axis=1).sum(axis=1)
+    return counts
+
+def _sat_counts_packed(cnf: CompiledCNF, assign: np.ndarray) -> np.ndarray:
+    n_cand = assign.shape[0]
+    # (Variablen × Bytes): Bit j von Byte b = Kandidat 8*b + j
+    var_bits = np.ascontiguousarray(np.packbits(assign, axis=0, bitorder="little").T)
+    n_bytes = var_bits.shape[1]
+    neg_mask = np.where(cnf.lit_pos, 0, 0xFF).astype(np.uint8)[:, None]
+    counts = np.zeros(n_bytes * 8, dtype=np.int64)
+    # Klauseln blockweise, damit (Literale × Bytes) begrenzt bleibt
+    per_block = max(1, BATCH_BLOCK // max(n_bytes, 1))
+    ptr = cnf.clause_ptr
+    c0 = 0
+    while c0 < cnf.n_clauses:
+        c1 = min(cnf.n_clauses, int(np.searchsorted(ptr, ptr[c0] + per_block, side="right")) - 1)
+        c1 = max(c1, c0 + 1)
+        lo, hi = ptr[c0], ptr[c1]
+        lit_bits = var_bits[cnf.lit_var[lo:hi]] ^ neg_mask[lo:hi]
+        sat = np.bitwise_or.reduceat(lit_bits, ptr[c0:c1] - lo, axis=0)
+        for bit in range(8):
+            counts[bit::8] += ((sat >> bit) & 1).sum(axis=0, dtype=np.int64)
+        c0 = c1
+    return counts[:n_cand]
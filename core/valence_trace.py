@@ -0,0 +1,133 @@
+# Sparsame Aufzeichnung des Valenzverlaufs für das ⦲SYSTEM-Toolkit
+import json
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+MODES = ("full", "changes", "stride", "ring")
+
+class ValenceTrace:
+    """Best-valence recorder with preallocated buffers and bounded memory.
+
+    Points are ``(index, value)`` pairs where index ``0`` is the initial state
+    and ``step + 1`` the best valence after solver step ``step`` – the same
+    positions the legacy list trace used.  Modes:
+
+    - ``full``: every step (legacy behaviour)
+    - ``changes``: only when the best valence changes (plus the final point)
+    - ``stride``: every ``stride``-th index (plus the final point)
+    - ``ring``: the last ``capacity`` steps
+
+    Pass an instance as ``solve(valence_trace=...)``; a plain list still
+    receives the full per-step trace.
+    """
+
+    def __init__(self, mode: str = "changes", stride: int = 1000, capacity: int = 10_000):
+        if mode not in MODES:
+            raise ValueError(f"unknown trace mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.mode_code = MODES.index(mode)
+        self.stride = max(1, int(stride))
+        self.capacity = max(1, int(capacity))
+        self.steps = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros(0, dtype=np.float64)
+        # meta[0]: Anzahl geschriebener Punkte (im Ring-Modus auch die überschriebenen)
+        self.meta = np.zeros(1, dtype=np.int64)
+
+    def reset(self, max_iter: int, n_clauses: int) -> None:
+        """Preallocate buffers for a run of ``max_iter`` steps."""
+        if self.mode == "full":
+            size = max_iter + 2
+        elif self.mode == "changes":
+            # Die beste Valenz steigt streng, also höchstens n_clauses + 1 Werte
+            size = min(max_iter, n_clauses) + 3
+        elif self.mode == "stride":
+            size = max_iter // self.stride + 3
+        else:
+            size = self.capacity
+        self.steps = np.empty(size, dtype=np.int64)
+        self.values = np.empty(size, dtype=np.float64)
+        self.meta[0] = 0
+
+    def _write(self, index: int, value: float) -> None:
+        slot = self.meta[0] % len(self.steps) if self.mode == "ring" else self.meta[0]
+        self.steps[slot] = index
+        self.values[slot] = value
+        self.meta[0] += 1
+
+    def record(self, index: int, value: float) -> None:
+        count = self.meta[0]
+        if self.mode == "changes":
+            if count and self.values[count - 1] == value:
+                return
+        elif self.mode == "stride":
+            if index % self.stride:
+                return
+        self._write(index, value)
+
+    def finish(self, index: int, value: float) -> None:
+        """Record the final point unless it is already the last one."""
+        count = self.meta[0]
+        if not count or self.steps[(count - 1) % len(self.steps)] != index:
+            self._write(index, value)
+
+    def __len__(self) -> int:
+        return int(min(self.meta[0], len(self.steps)))
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Recorded ``(indices, values)`` in chronological order."""
+        count = int(self.meta[0])
+        if self.mode == "ring" and count > len(self.steps):
+            head = count % len(self.steps)
+            order = np.r_[head:len(self.steps), 0:head]
+            return self.steps[order], self.values[order]
+        return self.steps[:count].copy(), self.values[:count].copy()
+
+    def dense(self) -> np.ndarray:
+        """Reconstruct the per-step curve from the recorded points (step function)."""
+        steps, values = self.points()
+        if len(steps) == 0:
+            return values
+        return np.repeat(values, np.diff(np.r_[steps, steps[-1] + 1]))
+
+    def runs(self) -> list:
+        """Run-length form ``[[value, length], ...]`` of the step curve."""
+        steps, values = self.points()
+        lengths = np.diff(np.r_[steps, steps[-1] + 1]) if len(steps) else steps
+        out: list = []
+        for v, n in zip(values.tolist(), lengths.tolist()):
+            if out and out[-1][0] == v:
+                out[-1][1] += n
+            else:
+                out.append([v, n])
+        return out
+
+    def save(self, path) -> None:
+        """Write ``.npy`` (k×2 float64 array of index, value) or run-length JSON."""
+        path = Path(path)
+        steps, values = self.points()
+        if path.suffix == ".npy":
+            np.save(path, np.column_stack([steps.astype(np.float64), values]))
+        else:
+            start = int(steps[0]) if len(steps) else 0
+            path.write_text(json.dumps({"mode": self.mode, "start": start, "runs": self.runs()}))
+
+def load_trace(path) -> Tuple[np.ndarray, np.ndarray]:
+    """Read a trace written by :meth:`ValenceTrace.save` as ``(indices, values)`` change-points."""
+    path = Path(path)
+    if path.suffix == ".npy":
+        data = np.load(path)
+        return data[:, 0].astype(np.int64), data[:, 1]
+    data = json.loads(path.read_text())
+    if isinstance(data, list):  # Legacy: eine volle Liste pro Schritt
+        return np.arange(len(data), dtype=np.int64), np.asarray(data, dtype=np.float64)
+    values = np.array([v for v, _ in data["runs"]], dtype=np.float64)
+    lengths = np.array([n for _, n in data["runs"]], dtype=np.int64)
+    if not len(lengths):
+        return lengths, values
+    steps = data["start"] + np.r_[0, np.cumsum(lengths)[:-1]]
+    if lengths[-1] > 1:  # Endpunkt der letzten Phase wiederherstellen
+        steps = np.r_[steps, steps[-1] + lengths[-1] - 1]
+        values = np.r_[values, values[-1]]
+    return steps.astype(np.int64), values
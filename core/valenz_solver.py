@@ -1,5 +1,22 @@
-import random
-from typing import Callable, List, Sequence, Tuple, Set
+import warnings
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from core.checkpoint import SolverCheckpoint, cnf_fingerprint, load_checkpoint
+from core.cnf_utils import CompiledCNF, compile_cnf
+from core.drift_semantic import as_delta_drift, semantic_drift
+from core.heuristics import resolve_local_move
+from core.packed_assignment import FlipJournal, PackedAssignment
+from core.rng import SolverRNG, bind_rng
+from core.search_memory import RESTART, SearchMemory
+from core.solve_control import SolveControl
+from core.solver_stats import SolverStats
+from core.sparse_set import SparseSet
+from core.valence_resonance import valence_resonance
+from core.valence_trace import ValenceTrace
+
+BACKENDS = ("python", "numba")
 
 Boolean = bool
 Literal = Tuple[int, bool]  # (var_idx, polarity)
@@ -19,88 +36,472 @@ def build_var_map(cnf: CNF) -> List[List[int]]:
 def clause_is_sat(clause: Clause, assignment: Assignment) -> bool:
     return any(assignment[v] if pol else not assignment[v] for v, pol in clause)
 
+def no_memory(mem: dict, assignment: Assignment, val: float) -> None:
+    """Default memory function (keeps nothing)."""
+    return None
+
 class ValenzDriftSolver:
-    """Valenz + Drift heuristic with incremental clause evaluation."""
+    """Valenz + Drift heuristic with incremental clause evaluation.
+
+    ``cnf`` may be the list-of-tuples form or a :class:`CompiledCNF`; it is
+    compiled once and every flip only walks the occurrence lists of the flipped
+    variable, keeping per-clause true-literal counts and per-variable
+    break/make scores up to date.
+
+    ``backend="numba"`` runs the whole loop in a JIT kernel
+    (:mod:`core.numba_kernel`).  The kernel hard-codes ``valence_resonance``,
+    ``semantic_drift`` and the no-op memory function; with other functions,
+    a ``search_memory``, or without numba installed, the solver falls back to
+    the Python loop.
+
+    ``local_move`` picks the variable to flip from a random unsat clause:
+    ``"random"`` (default), ``"walksat"``, ``"probsat"``, ``"probsat-exp"``
+    (see :mod:`core.heuristics`) or a callable ``(candidates, break_count)
+    -> var``.  Scored moves read the maintained break counts, so a move
+    costs O(clause length).
+
+    All randomness comes from ``self.rng``, a :class:`SolverRNG` seeded
+    with ``seed``; drift functions and local moves that take an ``rng``
+    parameter get it bound, so several solvers in one process stay
+    independent and reproducible.
+
+    ``solve`` stops after ``max_iter`` steps, at a solution, or early via
+    its ``time_limit``/``callback`` (see :class:`SolveControl`);
+    ``stop_reason`` records the early stops.  It can start from a given
+    assignment (``init``), write a :class:`SolverCheckpoint` periodically
+    (``checkpoint``) and continue from one (``resume``).
+
+    ``search_memory`` (a :class:`SearchMemory`) adds tabu tenure for local
+    moves, plateau detection, noise escalation and restarts.  Local moves
+    skip variables in ``memory["blacklist"]``; detected plateaus are logged
+    to ``memory["plateaus"]`` as ``(step, best_valence, action)``.
+
+    The Python loop reads the CSR arrays and keeps its counters through
+    memoryviews on NumPy storage (no Python object per entry; the CSR arrays
+    are not copied).  ``list_mirrors=True`` uses Python lists instead: 1.2-1.6x
+    as fast per flip, but about 8x the memory of the compiled CNF, so
+    only worth it for small instances.
+    """
     def __init__(self,
-                 cnf: CNF,
+                 cnf: CNF | CompiledCNF,
                  valence_fn: Callable[[CNF, Assignment], float],
-                 drift_fn: Callable[[Assignment, CNF, float], Assignment],
-                 memory_fn: Callable[[dict, Assignment, float], None] = lambda mem, assign, v: None,
+                 drift_fn: Callable[[Assignment, CNF, float], Iterable[int]],
+                 memory_fn: Callable[[dict, Assignment, float], None] = no_memory,
                  p_local: float = 0.5,
                  max_iter: int = 100_000,
-                 seed: int = None):
-        if seed is not None:
-            random.seed(seed)
+                 seed: int = None,
+                 backend: str = "python",
+                 search_memory: SearchMemory = None,
+                 local_move: str | Callable[[Sequence[int], Sequence[int]], int] = "random",
+                 list_mirrors: bool = False):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.seed = seed
+        # Eigene Zufallsquelle statt random.seed() auf dem globalen Modul
+        self.rng = SolverRNG(seed)
         self.cnf = cnf
+        self.compiled = compile_cnf(cnf)
         self.valence_fn = valence_fn
+        # Inkrementelle Valenz: aus unsat-Zählung ableitbar, sonst voller Scan
+        self.valence_from_state = getattr(valence_fn, "from_state", None)
         self.drift_fn = drift_fn
+        # Drift liefert die geflippten Indizes; Legacy-Drifts über Copy-and-Diff-Adapter
+        self._drift = bind_rng(as_delta_drift(drift_fn), self.rng)
         self.memory_fn = memory_fn
         self.p_local = p_local
         self.max_iter = max_iter
-        self.var_map = build_var_map(cnf)
-        self.n_vars = len(self.var_map)
+        self.n_vars = self.compiled.n_vars
+        self.n_clauses = self.compiled.n_clauses
         self.memory: dict = {"plateaus": [], "blacklist": set()}
+        # Anzahl Flips des letzten solve()-Laufs (lokal + Drift)
+        self.n_flips = 0
+        # None, "time_limit" oder "callback" nach einem vorzeitig beendeten solve()
+        self.stop_reason = None
+        self.search_memory = search_memory
+        # Lokaler Zug: Variable der gezogenen unsat-Klausel wählen (per Name oder Callable)
+        self.local_move = resolve_local_move(local_move)
+        self._local_move = bind_rng(self.local_move, self.rng)
+        self.backend = self._resolve_backend(backend)
+        # Skalarsichten der Hot-Loop: memoryviews ohne Kopie, oder Listen (schneller, ~8x Speicher der CSR)
+        self.list_mirrors = list_mirrors
+        c = self.compiled
+        self._pos_ptr, self._pos_occ = self._mirror(c.pos_ptr), self._mirror(c.pos_occ)
+        self._neg_ptr, self._neg_occ = self._mirror(c.neg_ptr), self._mirror(c.neg_occ)
+        self._lit_var = self._mirror(c.lit_var)
+        self._clause_ptr = self._mirror(c.clause_ptr)
+
+    def _mirror(self, arr: np.ndarray) -> Sequence[int]:
+        """Scalar view of ``arr`` for the Python loop (see ``list_mirrors``)."""
+        return arr.tolist() if self.list_mirrors else memoryview(arr)
+
+    def _resolve_backend(self, backend: str) -> str:
+        if backend != "numba":
+            return backend
+        from core.numba_kernel import NUMBA_AVAILABLE
+        if not NUMBA_AVAILABLE:
+            reason = "numba is not installed"
+        elif self.valence_fn is not valence_resonance or self.drift_fn is not semantic_drift:
+            reason = "the kernel only implements valence_resonance and semantic_drift"
+        elif not hasattr(self.local_move, "kernel"):
+            reason = "custom local moves cannot run inside the kernel"
+        elif self.memory_fn is not no_memory or self.search_memory is not None:
+            reason = "memory functions and search memory cannot run inside the kernel"
+        elif self.n_clauses == 0:
+            reason = "empty formula"
+        else:
+            return backend
+        warnings.warn(f"backend 'numba' unavailable ({reason}), using Python loop", RuntimeWarning, stacklevel=3)
+        return "python"
+
+    def _init_state(self, init: PackedAssignment = None,
+                    unsat_order: Sequence[int] = None) -> tuple[PackedAssignment, SparseSet]:
+        """Working assignment (random, or a copy of ``init``) and its counters.
+
+        ``unsat_order`` restores the unsat clauses in the slot order of a
+        checkpoint, so sampling continues exactly as in the saved run.
+        """
+        if init is None:
+            assignment = PackedAssignment.random(self.n_vars, self.rng)
+        elif len(init) != self.n_vars:
+            raise ValueError(f"initial assignment has {len(init)} variables, formula has {self.n_vars}")
+        else:
+            assignment = init.copy()
+        true_count, true_sum, brk, make = self.compiled.counters(assignment)
+        self.true_count = self._mirror(true_count)
+        self.true_sum = self._mirror(true_sum)
+        self.break_count = self._mirror(brk)
+        self.make_count = self._mirror(make)
+        unsat_now = np.flatnonzero(true_count == 0)
+        if unsat_order is None:
+            unsat_order = unsat_now.tolist()
+        elif not np.array_equal(np.sort(unsat_order), unsat_now):
+            raise ValueError("checkpoint unsat set does not match its assignment")
+        return assignment, SparseSet(self.n_clauses, unsat_order)
+
+    def _propagate(self, var: int, assignment: PackedAssignment, unsat: SparseSet) -> None:
+        """Update counters after ``assignment[var]`` was flipped (touches only its occurrences)."""
+        pos_ptr, neg_ptr = self._pos_ptr, self._neg_ptr
+        occ_pos = self._pos_occ[pos_ptr[var]:pos_ptr[var + 1]]
+        occ_neg = self._neg_occ[neg_ptr[var]:neg_ptr[var + 1]]
+        if assignment[var]:
+            now_true, now_false = occ_pos, occ_neg
+        else:
+            now_true, now_false = occ_neg, occ_pos
+        true_count, true_sum = self.true_count, self.true_sum
+        brk, make = self.break_count, self.make_count
+        lit_var, ptr = self._lit_var, self._clause_ptr
+        for ci in now_true:
+            tc = true_count[ci] + 1
+            true_count[ci] = tc
+            true_sum[ci] += var
+            if tc == 1:
+                unsat.discard(ci)
+                brk[var] += 1
+                for u in lit_var[ptr[ci]:ptr[ci + 1]]:
+                    make[u] -= 1
+            elif tc == 2:
+                brk[true_sum[ci] - var] -= 1
+        for ci in now_false:
+            tc = true_count[ci] - 1
+            true_count[ci] = tc
+            true_sum[ci] -= var
+            if tc == 0:
+                unsat.add(ci)
+                brk[var] -= 1
+                for u in lit_var[ptr[ci]:ptr[ci + 1]]:
+                    make[u] += 1
+            elif tc == 1:
+                brk[true_sum[ci]] += 1
+
+    def _allowed(self, candidates: List[int], step: int) -> List[int]:
+        """Clause variables that are neither blacklisted nor tabu at ``step``."""
+        mem, blacklist = self.search_memory, self.memory["blacklist"]
+        return [u for u in candidates
+                if u not in blacklist and (mem is None or not mem.is_tabu(u, step))]
 
-    def _init_state(self) -> tuple[Assignment, Set[int]]:
-        assignment = [random.choice([False, True]) for _ in range(self.n_vars)]
-        unsat: Set[int] = {
-            idx for idx, clause in enumerate(self.cnf) if not clause_is_sat(clause, assignment)
-        }
-        return assignment, unsat
-
-    def solve(self, valence_trace: list = None, progress: bool = False) -> Tuple[Assignment, float, int, list]:
-        assignment, unsat = self._init_state()
-        best_val = self.valence_fn(self.cnf, assignment)
-        best_assign = assignment.copy()
-        trace = valence_trace if valence_trace is not None else None
-        if trace is not None:
-            trace.clear()
-            trace.append(best_val)
-
-        rng = range(self.max_iter)
-        if progress:
-            try:
-                from tqdm import tqdm
-                rng = tqdm(rng, desc="Solving", unit="step")
-            except ImportError:
-                pass
-
-        for step in rng:
+    def _valence(self, assignment: Assignment, unsat: SparseSet) -> float:
+        if self.valence_from_state is not None:
+            return self.valence_from_state(len(unsat), self.n_clauses)
+        return self.valence_fn(self.cnf, assignment)
+
+    def _trace_recorder(self, valence_trace) -> ValenceTrace | None:
+        """Recorder for ``valence_trace``: used as is, or a full recorder behind a plain list."""
+        if valence_trace is None:
+            return None
+        rec = valence_trace if isinstance(valence_trace, ValenceTrace) else ValenceTrace("full")
+        rec.reset(self.max_iter, self.n_clauses)
+        return rec
+
+    @staticmethod
+    def _trace_result(valence_trace, rec: ValenceTrace | None):
+        if rec is None:
+            return []
+        if rec is valence_trace:
+            return rec
+        valence_trace.clear()
+        valence_trace.extend(rec.points()[1].tolist())
+        return valence_trace
+
+    def _instrument(self, stats: SolverStats):
+        """Phase functions for the loop, wrapped by ``stats`` if given (else the plain ones)."""
+        valence, drift, propagate, memory_fn = self._valence, self._drift, self._propagate, self.memory_fn
+        local_move = self._local_move
+        if stats is None:
+            return valence, local_move, drift, propagate, memory_fn
+        c = self.compiled
+        occ_len = self._mirror(np.diff(c.pos_ptr) + np.diff(c.neg_ptr))
+
+        def count_updates(var, *_):
+            stats.n_clause_updates += occ_len[var]
+        return (stats.timed("valence", valence), stats.timed("local_move", local_move),
+                stats.timed("drift", drift), stats.timed("propagate", propagate, count_updates),
+                stats.timed("memory", memory_fn))
+
+    @staticmethod
+    def _sync_stats(stats: SolverStats, n_flips: int) -> None:
+        stats.n_local, stats.n_drift = stats.calls["local_move"], stats.calls["drift"]
+        stats.n_flips = n_flips
+
+    def _finish(self, journal: FlipJournal, stats: SolverStats = None, control: SolveControl = None,
+                step: int = 0) -> None:
+        self.n_flips = len(journal)
+        if stats is not None:
+            stats.stop()
+            self._sync_stats(stats, self.n_flips)
+        if control is not None:
+            control.close(step)
+            self.stop_reason = control.stop_reason
+
+    def _save_checkpoint(self, path, fingerprint: int, step: int, best_val: float,
+                         assignment: PackedAssignment, unsat: SparseSet, journal: FlipJournal) -> None:
+        SolverCheckpoint(self.n_vars, fingerprint, step, best_val, len(journal), assignment.words,
+                         journal.best_assignment().words, list(unsat), self.rng.getstate()).save(path)
+
+    def solve(self, valence_trace: list | ValenceTrace = None, progress: bool = False,
+              stats: SolverStats = None, time_limit: float = None, callback: Callable[[dict], bool] = None,
+              callback_every: int = None,
+              callback_interval: float = 0.1, init: Sequence[bool] = None,
+              resume: "SolverCheckpoint | str" = None, checkpoint=None,
+              checkpoint_interval: float = 60.0) -> Tuple[Assignment, float, int, list | ValenceTrace]:
+        """Run the search; returns ``(assignment, best_valence, steps, trace)``.
+
+        ``valence_trace`` may be a list (filled with the best valence per step)
+        or a :class:`ValenceTrace` recording in one of its bounded modes.
+        The search works on a :class:`PackedAssignment`; the best assignment
+        is tracked by a :class:`FlipJournal` and only materialised at the
+        end.  The returned assignment is a list.
+
+        ``stats`` (a :class:`SolverStats`) is reset and filled with move,
+        flip, clause-update, improvement and restart counters plus sampled
+        per-phase timers.  Without it the loop runs uninstrumented.
+
+        ``time_limit`` (seconds) and ``callback`` are checked at checkpoints
+        every ``callback_every`` steps, or about every ``callback_interval``
+        seconds if that is ``None``; a truthy callback return stops the search.
+        An early stop returns the best assignment and the steps done so far.
+        ``progress`` shows a tqdm bar advanced at the same checkpoints.
+
+        ``init`` (bools or a :class:`PackedAssignment`) replaces the random
+        start assignment, e.g. the best result of an earlier run.  With
+        ``checkpoint`` (a path) the state is written about every
+        ``checkpoint_interval`` seconds and when the run ends; ``resume`` (a
+        path or :class:`SolverCheckpoint`) continues such a run at its saved
+        step with the same RNG stream, counting steps against the same
+        ``max_iter``.  Search-memory state (tabu, plateaus) and the trace
+        before the resumed step are not saved.  Checkpoints need the Python
+        loop; the numba backend only supports ``init``.
+        """
+        if stats is not None:
+            stats.start()
+        self.stop_reason = None
+        if init is not None and not isinstance(init, PackedAssignment):
+            init = PackedAssignment.from_bools(init)
+        if resume is not None and not isinstance(resume, SolverCheckpoint):
+            resume = load_checkpoint(resume)
+        fingerprint = None
+        if resume is not None or checkpoint is not None:
+            fingerprint = cnf_fingerprint(self.compiled)
+            if resume is not None and (resume.n_vars != self.n_vars or resume.fingerprint != fingerprint):
+                raise ValueError("checkpoint was written for a different formula")
+        control = SolveControl.create(self.max_iter, time_limit, callback, callback_every, callback_interval,
+                                      progress, checkpoint_interval if checkpoint is not None else None)
+        if self.backend == "numba":
+            if fingerprint is None:
+                return self._solve_numba(valence_trace, stats, control, init)
+            warnings.warn("checkpoints are not supported by the numba kernel, using Python loop",
+                          RuntimeWarning, stacklevel=2)
+        valence, local_move, drift, propagate, memory_fn = self._instrument(stats)
+        start = 0
+        if resume is not None:
+            self.rng.setstate(resume.rng_state)
+            assignment, unsat = self._init_state(PackedAssignment(self.n_vars, resume.assignment.copy()),
+                                                 resume.unsat.tolist())
+            start = resume.step
+        else:
+            assignment, unsat = self._init_state(init)
+        best_val = valence(assignment, unsat)
+        # Beste Belegung über das Flip-Journal statt Kopie bei jeder Verbesserung
+        journal = FlipJournal(assignment)
+        if resume is not None:
+            best_val = resume.best_valence
+            journal.resume(PackedAssignment(self.n_vars, resume.best.copy()), resume.n_flips)
+        flips = journal.flips
+        rec = self._trace_recorder(valence_trace)
+        if rec is not None:
+            rec.record(start, best_val)
+
+        lit_var, ptr = self._lit_var, self._clause_ptr
+        mem, blacklist = self.search_memory, self.memory["blacklist"]
+        brk = self.break_count
+        rng = self.rng
+        coin = rng.random
+        if mem is not None:
+            mem.reset(noise=1.0 - self.p_local)
+        # Ohne Kontrolle wird der Checkpoint nie erreicht
+        next_check = control.next_check if control is not None else self.max_iter
+        steps_done = self.max_iter
+        for step in range(start, self.max_iter):
             if not unsat:
-                if trace is not None:
-                    trace.append(1.0)
-                return assignment, 1.0, step, trace if trace is not None else []
-            val = self.valence_fn(self.cnf, assignment)
+                if rec is not None:
+                    rec.finish(step + 1, 1.0)
+                if checkpoint is not None:
+                    journal.mark_best()
+                    self._save_checkpoint(checkpoint, fingerprint, step, 1.0, assignment, unsat, journal)
+                self._finish(journal, stats, control, step)
+                return assignment.tolist(), 1.0, step, self._trace_result(valence_trace, rec)
+            val = valence(assignment, unsat)
             if val > best_val:
                 best_val = val
-                best_assign = assignment.copy()
-            if trace is not None:
-                trace.append(best_val)
+                journal.mark_best()
+                if mem is not None:
+                    mem.improved(step)
+                if stats is not None:
+                    stats.n_improvements += 1
+            if rec is not None:
+                rec.record(step + 1, best_val)
+            if step >= next_check:
+                if stats is not None:
+                    self._sync_stats(stats, len(journal))
+                if control.checkpoint(step, best_val, len(journal), stats) is not None:
+                    steps_done = step
+                    break
+                if control.save_due:
+                    self._save_checkpoint(checkpoint, fingerprint, step, best_val, assignment, unsat, journal)
+                next_check = control.next_check
+
+            p_local = self.p_local
+            if mem is not None:
+                action = mem.check(step)
+                if action is not None:
+                    self.memory["plateaus"].append((step, best_val, action))
+                    if stats is not None:
+                        stats.n_plateaus += 1
+                        stats.n_restarts += action == RESTART
+                    if action == RESTART:
+                        assignment, unsat = self._init_state()
+                        brk = self.break_count
+                        journal.rebase(assignment)
+                        continue
+                # Adaptives Rauschen ersetzt das feste p_local
+                p_local = 1.0 - mem.noise
 
             # Mutation: local drift (unsat clause) oder global/semantic drift
-            if random.random() < self.p_local:
-                clause_idx = random.choice(list(unsat))
-                clause = self.cnf[clause_idx]
-                var, _ = random.choice(clause)
+            if coin() < p_local:
+                clause_idx = unsat.sample(rng)
+                candidates = lit_var[ptr[clause_idx]:ptr[clause_idx + 1]]
+                if mem is not None or blacklist:
+                    candidates = self._allowed(candidates, step) or candidates
+                var = local_move(candidates, brk)
+                assignment.flip(var)
                 flip_idxs = [var]
             else:
-                old_assign = assignment.copy()
-                assignment = self.drift_fn(assignment, self.cnf, val)
-                flip_idxs = [i for i, (a, b) in enumerate(zip(old_assign, assignment)) if a != b]
+                flip_idxs = drift(assignment, self.cnf, val)
 
-            # Inkrementelles Update der unsat-Klauseln
+            # Inkrementelles Update über die Vorkommenslisten der geflippten Variablen
             for var in flip_idxs:
-                for ci in self.var_map[var]:
-                    was_sat = ci not in unsat
-                    now_sat = clause_is_sat(self.cnf[ci], assignment)
-                    if was_sat and not now_sat:
-                        unsat.add(ci)
-                    elif not was_sat and now_sat:
-                        unsat.discard(ci)
+                propagate(var, assignment, unsat)
+                flips.append(var)
+                if mem is not None:
+                    mem.flipped(var, step)
+            if len(flips) > journal.capacity:
+                journal.rebase(assignment)
+
+            memory_fn(self.memory, assignment, val)
+
+        if rec is not None:
+            rec.finish(steps_done + 1, best_val)
+        if checkpoint is not None:
+            self._save_checkpoint(checkpoint, fingerprint, steps_done, best_val, assignment, unsat, journal)
+        self._finish(journal, stats, control, steps_done)
+        return journal.best_assignment().tolist(), best_val, steps_done, self._trace_result(valence_trace, rec)
+
+    @staticmethod
+    def _kernel_stats(stats: SolverStats, scalars: np.ndarray, step: int) -> None:
+        # Der Kernel zählt nur; Phasen-Timer gibt es dort nicht (alles in t_other)
+        stats.n_flips = int(scalars[2])
+        stats.n_local, stats.n_improvements, stats.n_clause_updates = (int(x) for x in scalars[3:6])
+        stats.n_drift = step - stats.n_local
 
-            self.memory_fn(self.memory, assignment, val)
+    def _solve_numba(self, valence_trace: list | ValenceTrace = None, stats: SolverStats = None,
+                     control: SolveControl = None,
+                     init: PackedAssignment = None) -> Tuple[Assignment, float, int, list | ValenceTrace]:
+        from core import numba_kernel as nk
+        c = self.compiled
+        # Eigener Seed für numbas Generator, reproduzierbar über den Solver-Seed
+        nk.seed_rng(self.rng.getrandbits(31))
+        if init is None:
+            assign = nk.random_assignment(self.n_vars)
+        elif len(init) != self.n_vars:
+            raise ValueError(f"initial assignment has {len(init)} variables, formula has {self.n_vars}")
+        else:
+            assign = init.words.copy()
+        true_count = np.empty(self.n_clauses, dtype=np.int32)
+        true_sum = np.empty(self.n_clauses, dtype=np.int64)
+        brk = np.empty(self.n_vars, dtype=np.int32)
+        unsat_dense = np.empty(self.n_clauses, dtype=np.int32)
+        unsat_pos = np.empty(self.n_clauses, dtype=np.int32)
+        n_unsat = nk.init_state(c.lit_var, c.lit_pos, c.clause_ptr, assign,
+                                true_count, true_sum, brk, unsat_dense, unsat_pos)
+        move, move_p1, move_p2 = self.local_move.kernel
+        best_val = (self.n_clauses - n_unsat) / self.n_clauses
+        scalars = np.array([n_unsat, best_val, 0, 0, 0, 0], dtype=np.float64)
+        best_assign = assign.copy()
+        mark = np.zeros(self.n_vars, dtype=np.int64)
+        rec = self._trace_recorder(valence_trace)
+        if rec is not None:
+            rec.record(0, best_val)
+            t_buffers = (rec.steps, rec.values, rec.meta, rec.mode_code, rec.stride)
+        else:
+            t_buffers = (np.zeros(0, np.int64), np.zeros(0, np.float64), np.zeros(1, np.int64), -1, 1)
 
-        if trace is not None:
-            trace.append(best_val)
-        return best_assign, best_val, self.max_iter, trace if trace is not None else []
+        # Mit Kontrolle in Blöcken bis zum nächsten Checkpoint laufen lassen, sonst in einem Aufruf
+        step = 0
+        solved = False
+        while step < self.max_iter:
+            n = (control.next_check if control is not None else self.max_iter) - step
+            done = nk.run_steps(c.lit_var, c.clause_ptr, c.pos_ptr, c.pos_occ, c.neg_ptr, c.neg_occ,
+                                assign, true_count, true_sum, brk, unsat_dense, unsat_pos, scalars,
+                                best_assign, mark, self.p_local, move, move_p1, move_p2, step, n, *t_buffers)
+            step += done
+            if done < n:
+                solved = True
+                break
+            if control is not None and step < self.max_iter:
+                if stats is not None:
+                    self._kernel_stats(stats, scalars, step)
+                if control.checkpoint(step, float(scalars[1]), int(scalars[2]), stats) is not None:
+                    break
 
+        if rec is not None and not solved:
+            rec.finish(step + 1, scalars[1])
+        out_trace = self._trace_result(valence_trace, rec)
+        self.n_flips = int(scalars[2])
+        if stats is not None:
+            stats.stop()
+            self._kernel_stats(stats, scalars, step)
+        if control is not None:
+            control.close(step)
+            self.stop_reason = control.stop_reason
+        if solved:
+            return PackedAssignment(self.n_vars, assign).tolist(), 1.0, step, out_trace
+        return PackedAssignment(self.n_vars, best_assign).tolist(), float(scalars[1]), step, out_trace
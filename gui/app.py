@@ -1,119 +1,161 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import tempfile
+import atexit
 import os
+import time
 try:
-    from core.cnf_utils import parse_dimacs
-    from core.valenz_solver import ValenzDriftSolver
-    from core.valence_resonance import valence_resonance
-    from core.drift_semantic import semantic_drift
+    from core.cnf_utils import dimacs_from_bytes
+    from core.heuristics import LOCAL_MOVES
+    from core.results_io import ResultStore
+    from core.valenz_solver import BACKENDS
+    from gui.jobs import JobRunner
 except ModuleNotFoundError:
     import sys
-    import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from core.cnf_utils import parse_dimacs
-    from core.valenz_solver import ValenzDriftSolver
-    from core.valence_resonance import valence_resonance
-    from core.drift_semantic import semantic_drift
+    from core.cnf_utils import dimacs_from_bytes
+    from core.heuristics import LOCAL_MOVES
+    from core.results_io import ResultStore
+    from core.valenz_solver import BACKENDS
+    from gui.jobs import JobRunner
+
+# Wie oft die Seite neu gerendert wird, solange Läufe im Hintergrund rechnen
+REFRESH_SEC = 0.5
 
 st.title("Z-System SAT Simulation Tool")
 
-uploaded_file = st.file_uploader("CNF-Datei hochladen (.cnf)", type=["cnf"])
-batch_files = st.file_uploader("Batch: Mehrere CNF-Dateien hochladen", type=["cnf"], accept_multiple_files=True)
+@st.cache_resource
+def job_runner() -> JobRunner:
+    # Ein Prozess-Pool pro Server statt pro Sitzung (sonst bleiben Manager und Worker jeder
+    # Sitzung liegen); beim Beenden des Servers laufende Jobs abbrechen und aufräumen
+    runner = JobRunner(n_workers=os.cpu_count())
+    atexit.register(runner.shutdown)
+    return runner
+
+runner = job_runner()
+runner.poll()
+
+uploaded_file = st.file_uploader("CNF-Datei hochladen (.cnf)", type=["cnf", "gz", "xz"])
+batch_files = st.file_uploader("Batch: Mehrere CNF-Dateien hochladen", type=["cnf", "gz", "xz"],
+                               accept_multiple_files=True)
 max_iter = st.number_input("Max Iterationen", 1000, 10000000, 100000)
 p_local = st.slider("Lokale Mutationsrate (p_local)", 0.0, 1.0, 0.5)
 seed = st.number_input("Seed (optional)", value=42)
+time_limit = st.number_input("Zeitlimit pro Lauf in Sekunden (0 = keins)", 0.0, 86400.0, 0.0)
+backend = st.selectbox("Solver-Kern", BACKENDS)
+local_move = st.selectbox("Lokaler Zug", tuple(LOCAL_MOVES))
+opts = dict(max_iter=int(max_iter), p_local=p_local, seed=int(seed), time_limit=time_limit or None,
+            backend=backend, local_move=local_move)
+
+def plot_trace(steps, values):
+    fig, ax = plt.subplots()
+    ax.step(steps, values, where="post")
+    ax.set_xlabel("Iteration")
+    ax.set_ylabel("Valenz")
+    ax.set_title("Valenzverlauf")
+    st.pyplot(fig)
+    plt.close(fig)
 
 # Einzeldatei-Modus
 if uploaded_file is not None:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".cnf") as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        tmp_path = tmp_file.name
-    n_vars, n_clauses, clauses = parse_dimacs(tmp_path)
-    os.unlink(tmp_path)
+    # Nur beim Hochladen einer neuen Datei parsen, nicht bei jedem Rerun (alle 0,5 s während eines Laufs)
+    key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, "file_id", None))
+    if st.session_state.get("instance_key") != key:
+        cnf = dimacs_from_bytes(uploaded_file.getvalue(), uploaded_file.name)
+        st.session_state.instance_key = key
+        st.session_state.instance_size = (cnf.n_vars, cnf.n_clauses)
+    n_vars, n_clauses = st.session_state.instance_size
     st.write(f"Instanz geladen: **{n_vars} Variablen**, **{n_clauses} Klauseln**")
 
     if st.button("Simulation starten"):
-        solver = ValenzDriftSolver(
-            cnf=clauses,
-            valence_fn=valence_resonance,
-            drift_fn=semantic_drift,
-            max_iter=max_iter,
-            p_local=p_local,
-            seed=seed
-        )
-        valence_trace = []
-        import time
-        t0 = time.perf_counter()
-        assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace)
-        runtime = time.perf_counter() - t0
+        st.session_state.single_job = runner.submit(uploaded_file.name, uploaded_file.getvalue(), **opts)
 
-        st.success(f"Fertig! Beste Valenz: {best_val:.4f}, Laufzeit: {runtime:.3f}s, Schritte: {steps}")
-        st.write("Assignment (gekürzt):", assignment[:min(20, len(assignment))], "...")
+job = st.session_state.get("single_job")
+if job is not None:
+    steps, values = runner.series[job]
+    if runner.running([job]):
+        if st.button("Simulation abbrechen"):
+            runner.cancel([job])
+        st.progress(min(1.0, steps[-1] / max_iter) if steps else 0.0)
+        if steps:
+            st.text(f"Schritt {steps[-1]}: beste Valenz {values[-1]:.4f}")
+            # Live-Updates kommen zeitgesteuert: gegen den Schritt auftragen, nicht gegen den Index
+            st.line_chart({"Schritt": steps, "Valenz": values}, x="Schritt", y="Valenz")
+    else:
+        result = runner.result(job)
+        if "error" in result:
+            st.error(f"{result['name']}: {result['error']}")
+        else:
+            stopped = f" (vorzeitig beendet: {result['stopped']})" if result["stopped"] else ""
+            st.success(f"Fertig! Beste Valenz: {result['best_valence']:.4f}, Laufzeit: {result['runtime_sec']:.3f}s, "
+                       f"Schritte: {result['steps']}{stopped}")
+            assignment = result["assignment"]
+            st.write("Assignment (gekürzt):", assignment[:min(20, len(assignment))], "...")
+            plot_trace(*result["trace"])
 
-        # Plot Valenzverlauf
-        fig, ax = plt.subplots()
-        ax.plot(valence_trace)
-        ax.set_xlabel("Iteration")
-        ax.set_ylabel("Valenz")
-        ax.set_title("Valenzverlauf")
-        st.pyplot(fig)
-
-# Batch-Modus
+# Batch-Modus: alle Dateien parallel im Pool
 if batch_files:
     st.info(f"{len(batch_files)} Dateien für Batch ausgewählt.")
     batch_name = st.text_input("Testlauf-Name (optional, für Dateinamen und Tabelle)", value="")
     if st.button("Batch-Run starten"):
-        import time
-        import pandas as pd
         from datetime import datetime
-        results = []
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_name = batch_name.strip().replace(" ", "_") or "batch"
-        result_file = f"results/{safe_name}_{batch_id}.csv"
-        for idx, file in enumerate(batch_files):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".cnf") as tmp_file:
-                tmp_file.write(file.read())
-                tmp_path = tmp_file.name
-            try:
-                n_vars, n_clauses, clauses = parse_dimacs(tmp_path)
-            finally:
-                os.unlink(tmp_path)
-            solver = ValenzDriftSolver(
-                cnf=clauses,
-                valence_fn=valence_resonance,
-                drift_fn=semantic_drift,
-                max_iter=max_iter,
-                p_local=p_local,
-                seed=seed
-            )
-            valence_trace = []
-            t0 = time.perf_counter()
-            assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace)
-            runtime = time.perf_counter() - t0
-            solved = best_val == 1.0
-            results.append({
-                "Testlauf": batch_name if batch_name else safe_name,
-                "Datei": file.name,
-                "Variablen": n_vars,
-                "Klauseln": n_clauses,
-                "Valenz": best_val,
-                "Schritte": steps,
-                "Laufzeit [s]": runtime,
-                "Gelöst": solved
-            })
-            progress_bar.progress((idx + 1) / len(batch_files))
-            status_text.text(f"{idx+1}/{len(batch_files)} Instanzen abgeschlossen...")
-        progress_bar.empty()
-        status_text.text(f"Batch abgeschlossen! Ergebnisse gespeichert unter: {result_file}")
-        df = pd.DataFrame(results)
+        run_id = f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        st.session_state.batch = {
+            "jobs": [runner.submit(f.name, f.getvalue(), **opts) for f in batch_files],
+            "name": batch_name or safe_name,
+            "run_id": run_id,
+            "opts": opts,
+            "file": f"results/{run_id}.csv",
+            "saved": False,
+        }
+
+batch = st.session_state.get("batch")
+if batch is not None:
+    import pandas as pd
+    jobs = batch["jobs"]
+    finished = [j for j in jobs if runner.done(j)]
+    rows = []
+    for j in finished:
+        r = runner.result(j)
+        rows.append({
+            "Testlauf": batch["name"],
+            "Datei": r["name"],
+            "Variablen": r.get("n"),
+            "Klauseln": r.get("m"),
+            "Valenz": r.get("best_valence"),
+            "Schritte": r.get("steps"),
+            "Laufzeit [s]": r.get("runtime_sec"),
+            "Gelöst": r.get("solved", False),
+            "Abbruch": r.get("stopped") or r.get("error"),
+        })
+    df = pd.DataFrame(rows)
+    if runner.running(jobs):
+        if st.button("Batch abbrechen"):
+            runner.cancel(jobs)
+        st.progress(len(finished) / len(jobs))
+        st.text(f"{len(finished)}/{len(jobs)} Instanzen abgeschlossen...")
+        st.dataframe(df)
+    else:
         st.dataframe(df)
         csv = df.to_csv(index=False).encode('utf-8')
-        # Automatisches Speichern im Backend
-        os.makedirs("results", exist_ok=True)
-        with open(result_file, "wb") as f:
-            f.write(csv)
-        st.success(f"Batch-Ergebnisse wurden automatisch gespeichert: {result_file}")
+        if not batch["saved"]:
+            # Automatisches Speichern im Backend
+            os.makedirs("results", exist_ok=True)
+            with open(batch["file"], "wb") as f:
+                f.write(csv)
+            # Zusätzlich in den gemeinsamen Store, damit analyse_batch GUI- und Runner-Läufe zusammen auswertet
+            meta = {k: batch["opts"][k] for k in ("max_iter", "p_local", "time_limit", "backend", "local_move")}
+            with ResultStore("results/store", batch["run_id"], meta=dict(meta, source="gui")) as store:
+                for j in jobs:
+                    r = runner.result(j)
+                    if "error" not in r:
+                        store.write(dict(r, instance=r["name"], timed_out=r["stopped"] == "time_limit"))
+            batch["saved"] = True
+        st.success(f"Batch-Ergebnisse wurden automatisch gespeichert: {batch['file']}")
         st.download_button("Ergebnisse als CSV herunterladen", csv, "batch_results.csv", "text/csv")
+
+# Solange eigene Läufe rechnen, periodisch neu rendern (Live-Updates, Abbruch-Buttons bleiben bedienbar)
+own_jobs = ([job] if job is not None else []) + (batch["jobs"] if batch is not None else [])
+if own_jobs and runner.running(own_jobs):
+    time.sleep(REFRESH_SEC)
+    st.rerun()
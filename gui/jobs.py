@@ -0,0 +1,104 @@
+# Hintergrund-Solves für die GUI: Prozess-Pool, Live-Valenz über eine Queue, Abbruch
+import multiprocessing as mp
+import queue
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from time import perf_counter
+
+from core.cnf_utils import dimacs_from_bytes
+from core.population import make_solver
+from core.valence_trace import ValenceTrace
+
+def run_job(job_id: int, name: str, data: bytes, opts: dict, updates, cancelled) -> dict:
+    """Solve one uploaded instance in a worker process.
+
+    Every checkpoint of the solver puts ``(job_id, step, best_valence)`` on
+    ``updates``; the run stops early once ``job_id`` is in ``cancelled``.
+    """
+    cnf = dimacs_from_bytes(data, name)
+    solver = make_solver(cnf, max_iter=opts["max_iter"], seed=opts.get("seed"),
+                         backend=opts.get("backend", "python"), p_local=opts.get("p_local", 0.5),
+                         local_move=opts.get("local_move", "random"))
+
+    def report(info):
+        updates.put((job_id, info["step"], info["best_valence"]))
+        return job_id in cancelled
+
+    t0 = perf_counter()
+    assignment, best_val, steps, trace = solver.solve(
+        valence_trace=ValenceTrace("changes"), time_limit=opts.get("time_limit"),
+        callback=report, callback_interval=opts.get("interval", 0.25))
+    trace_steps, trace_vals = trace.points()
+    return {"name": name, "n": cnf.n_vars, "m": cnf.n_clauses, "best_valence": best_val,
+            "steps": steps, "runtime_sec": perf_counter() - t0, "solved": best_val == 1.0,
+            "stopped": solver.stop_reason, "assignment": assignment,
+            "trace": (trace_steps.tolist(), trace_vals.tolist())}
+
+class JobRunner:
+    """Process pool for GUI solves with live valence series and cancellation.
+
+    ``submit`` returns a job id immediately; ``poll`` drains the worker
+    updates into ``series[job_id]`` (steps, best valences) without blocking.
+    The Streamlit server shares one runner between all sessions
+    (``st.cache_resource``); job ids stay unique across them, and each
+    session re-renders while its own jobs are ``running``.
+    """
+
+    def __init__(self, n_workers: int = None):
+        self._manager = mp.Manager()
+        self.updates = self._manager.Queue()
+        self.cancelled = self._manager.dict()
+        self.pool = ProcessPoolExecutor(max_workers=n_workers)
+        self.futures = {}
+        self.names = {}
+        self.series = {}
+        # Sitzungen rufen submit aus eigenen Threads auf
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, data: bytes, **opts) -> int:
+        with self._lock:
+            job_id = len(self.futures)
+            self.names[job_id] = name
+            self.series[job_id] = ([], [])
+            self.futures[job_id] = self.pool.submit(run_job, job_id, name, data, opts,
+                                                    self.updates, self.cancelled)
+        return job_id
+
+    def poll(self) -> None:
+        while True:
+            try:
+                job_id, step, val = self.updates.get_nowait()
+            except queue.Empty:
+                return
+            steps, vals = self.series[job_id]
+            steps.append(step)
+            vals.append(val)
+
+    def cancel(self, job_ids=None) -> None:
+        """Cancel the given jobs (default: all); queued jobs never start, running ones stop at their next checkpoint."""
+        for job_id in self.futures if job_ids is None else job_ids:
+            if not self.futures[job_id].cancel():
+                self.cancelled[job_id] = True
+
+    def done(self, job_id: int) -> bool:
+        return self.futures[job_id].done()
+
+    def running(self, job_ids=None) -> bool:
+        return not all(self.done(j) for j in (self.futures if job_ids is None else job_ids))
+
+    def result(self, job_id: int) -> dict | None:
+        """Result dict of a finished job (``error`` set if it failed or was cancelled before starting)."""
+        fut = self.futures[job_id]
+        if not fut.done():
+            return None
+        try:
+            return fut.result()
+        except CancelledError:
+            return {"name": self.names[job_id], "error": "abgebrochen"}
+        except Exception as exc:
+            return {"name": self.names[job_id], "error": repr(exc)}
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self.pool.shutdown(wait=True)
+        self._manager.shutdown()
@@ -0,0 +1,51 @@
+"""
+gen_dimacs.py – Zufallsinstanzen als DIMACS-Dateien erzeugen
+============================================================
+Schreibt geplante (garantiert erfüllbare) oder uniforme k-SAT-Instanzen blockweise auf die
+Platte, ohne die Formel als Python-Objekte aufzubauen; auch für n im Bereich 10^6.
+
+Usage:
+  python -m runners.gen_dimacs --n 100000 --count 10 --outdir data/generated
+  python -m runners.gen_dimacs --n 1000000 --ratio 4.2 --gzip --outdir data/big
+
+Optionen:
+  --n N         : Variablenzahl
+  --ratio R     : Klausel/Variablen-Verhältnis (default: 4.26)
+  --k K         : Literale pro Klausel (default: 3)
+  --count C     : Anzahl Instanzen (default: 1)
+  --seed S      : Basis-Seed; Instanz i bekommt den i-ten abgeleiteten Seed (default: 0)
+  --uniform     : uniformes statt geplantes k-SAT
+  --gzip        : .cnf.gz statt .cnf schreiben
+  --outdir DIR  : Zielordner
+"""
+import argparse
+from pathlib import Path
+from time import perf_counter
+import numpy as np
+from core.generators import write_dimacs
+
+def main():
+    p = argparse.ArgumentParser(description="Zufällige k-SAT-Instanzen als DIMACS schreiben")
+    p.add_argument('--n', type=int, required=True, help='Variablenzahl')
+    p.add_argument('--ratio', type=float, default=4.26, help='Klausel/Variablen-Verhältnis')
+    p.add_argument('--k', type=int, default=3, help='Literale pro Klausel')
+    p.add_argument('--count', type=int, default=1, help='Anzahl Instanzen')
+    p.add_argument('--seed', type=int, default=0, help='Basis-Seed')
+    p.add_argument('--uniform', action='store_true', help='uniformes statt geplantes k-SAT')
+    p.add_argument('--gzip', action='store_true', help='gzip-komprimiert schreiben')
+    p.add_argument('--outdir', type=str, required=True, help='Zielordner')
+    args = p.parse_args()
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    m = int(round(args.ratio * args.n))
+    kind = "uf" if not args.uniform else "rnd"
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(args.seed).spawn(args.count)]
+    for i, seed in enumerate(seeds):
+        path = outdir / f"{kind}{args.n}-{m}-k{args.k}-{i:03d}.cnf{'.gz' if args.gzip else ''}"
+        t0 = perf_counter()
+        write_dimacs(path, args.n, m, k=args.k, seed=seed, planted=not args.uniform)
+        print(f"{path} ({perf_counter() - t0:.1f}s)")
+
+if __name__ == "__main__":
+    main()
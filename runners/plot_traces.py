@@ -0,0 +1,75 @@
+"""
+plot_traces.py – Plot-Stufe für gespeicherte Valenzverläufe
+===========================================================
+Rendert alle Traces (.npy/.json aus --trace-out bzw. den Batch-Runnern) eines Ordners
+gesammelt als PNG, plus eine Übersichtsgrafik mit allen Instanzen.
+Die Batch-Runner rufen diese Stufe nach dem Lösen selbst auf; sie kann auch
+nachträglich separat gestartet werden.
+
+Beispielaufruf:
+  python -m runners.plot_traces --tracedir plots/traces --plotdir plots/
+
+Optionen:
+  --tracedir DIR    : Ordner mit Trace-Dateien (.npy oder .json)
+  --plotdir DIR     : Zielordner für die PNG-Plots
+  --aggregate NAME  : Dateiname der Übersichtsgrafik (default: aggregate.png, leer = keine)
+"""
+import argparse
+from pathlib import Path
+from core.valence_trace import load_trace
+
+TRACE_SUFFIXES = (".npy", ".json")
+
+def list_traces(tracedir):
+    return sorted(p for p in Path(tracedir).iterdir() if p.suffix in TRACE_SUFFIXES)
+
+def render(trace_paths, plotdir, aggregate="aggregate.png"):
+    """Render one step plot per trace and an overlay of all traces; returns the number of plots."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plotdir = Path(plotdir)
+    plotdir.mkdir(parents=True, exist_ok=True)
+    curves = []
+    # Eine Figure für alle Einzelplots wiederverwenden
+    fig, ax = plt.subplots(figsize=(8,4))
+    for path in trace_paths:
+        steps, values = load_trace(path)
+        curves.append((path.stem, steps, values))
+        ax.clear()
+        ax.step(steps, values, where='post')
+        ax.set_xlabel('Step')
+        ax.set_ylabel('Best Valence')
+        ax.set_title(path.stem)
+        fig.tight_layout()
+        fig.savefig(plotdir / (path.stem + '.png'))
+    plt.close(fig)
+
+    if aggregate and curves:
+        fig, ax = plt.subplots(figsize=(10,5))
+        for name, steps, values in curves:
+            ax.step(steps, values, where='post', linewidth=0.8, alpha=0.6)
+        ax.set_xlabel('Step')
+        ax.set_ylabel('Best Valence')
+        ax.set_title(f'Valenzverlauf aller Instanzen (n={len(curves)})')
+        fig.tight_layout()
+        fig.savefig(plotdir / aggregate)
+        plt.close(fig)
+    return len(curves)
+
+def main():
+    parser = argparse.ArgumentParser(description="Plots aus gespeicherten Valenzverläufen erzeugen")
+    parser.add_argument('--tracedir', type=str, required=True, help='Ordner mit Trace-Dateien')
+    parser.add_argument('--plotdir', type=str, required=True, help='Zielordner für PNG-Plots')
+    parser.add_argument('--aggregate', type=str, default='aggregate.png', help='Übersichtsgrafik (leer = keine)')
+    args = parser.parse_args()
+    try:
+        n = render(list_traces(args.tracedir), args.plotdir, args.aggregate)
+    except ImportError:
+        print("matplotlib nicht installiert: keine Plots erzeugt")
+        return
+    print(f"{n} Plots gespeichert in {args.plotdir}")
+
+if __name__ == "__main__":
+    main()
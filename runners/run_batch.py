@@ -1,80 +1,127 @@
 """
 run_batch.py – Systematische Experimente mit dem ValenzDriftSolver
 ==================================================================
-Starte viele Instanzen mit unterschiedlichen Parametern (n, m, Seed) und speichere die Ergebnisse als CSV.
+Parameter-Sweep über ein Raster aus n, Klausel/Variablen-Verhältnis und p_local mit mehreren
+Läufen pro Punkt, parallel über einen Prozess-Pool. Jede Aufgabe bekommt eigene Seeds aus einer
+``SeedSequence`` (Basis-Seed + Rasterkoordinaten), die Ergebnisse hängen daher nicht von der
+Anzahl der Worker ab; Instanz und Solver-Seed sind für alle p_local-Werte eines Laufs gleich.
+Die Zeilen werden in Rasterreihenfolge gestreamt (CSV oder JSONL).
 
 Usage:
   python -m runners.run_batch --n-range 50 100 10 --runs 5 --max-iter 50000 --outfile results.csv
+  python -m runners.run_batch --n-range 200 201 1 --clauses-per-var 3.8 4.0 4.2 4.26 4.4 4.6 --runs 20 --seed 1 --outfile phase.csv
 
 Optionen:
   --n-range START STOP STEP : Variablenzahl von START bis STOP (exkl.) in STEP-Schritten
   --runs N                 : Anzahl Wiederholungen pro Setting (verschiedene Seeds)
   --max-iter K             : Iterationsbudget pro Lauf
-  --outfile PATH           : Ergebnis-CSV
-  --clauses-per-var R      : Klausel/Variablen-Verhältnis (default: 4.3)
+  --outfile PATH           : Ergebnisdatei (.csv oder .jsonl), wird pro fertigem Lauf geschrieben
+  --clauses-per-var R [R ...] : Klausel/Variablen-Verhältnisse (default: 4.3)
+  --k K                    : Literale pro Klausel (default: 3)
+  --uniform                : uniformes statt geplantes (garantiert erfüllbares) k-SAT
+  --backend {python,numba} : Solver-Kern (numba: JIT-Kernel, fällt ohne numba auf Python zurück)
+  --population W           : W Walker vektorisiert im Gleichschritt statt eines einzelnen Solvers
+  --local-move NAME        : Variablenwahl im lokalen Schritt: random, walksat, probsat, probsat-exp
+  --p-local P [P ...]      : Wahrscheinlichkeiten eines lokalen Schritts statt Drift (default: 0.5)
+  --stats                  : Solver-Instrumentierung (Zähler, Phasen-Timer) als zusätzliche Spalten
+  --seed S                 : Basis-Seed des Sweeps (default: zufällig, wird ausgegeben)
+  --n-jobs N               : Anzahl paralleler Prozesse (default: alle Kerne, 1 = ohne Pool)
+  --chunksize K            : Aufgaben pro Dispatch an einen Worker (default: 1)
+  --store DIR              : zusätzlich in den spaltenorientierten Ergebnis-Store schreiben (Parquet, ohne pyarrow CSV)
+  --run-id ID              : Partition im Store (default: Zeitstempel)
 """
 import argparse
-import csv
-import random
-from pathlib import Path
+import multiprocessing as mp
+import os
+from contextlib import nullcontext
+from itertools import product
 from time import perf_counter
-from core.valenz_solver import ValenzDriftSolver
-from core.valence_resonance import valence_resonance
-from core.drift_semantic import semantic_drift
+import numpy as np
+from core.generators import random_ksat
+from core.heuristics import LOCAL_MOVES
+from core.population import make_solver
+from core.results_io import ResultStore, ResultWriter
+from core.solver_stats import SolverStats
+from core.valenz_solver import BACKENDS
 
-def gen_random_cnf(n_vars, m_clauses, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    hidden = [random.choice([False, True]) for _ in range(n_vars)]
-    cnf = []
-    for _ in range(m_clauses):
-        triple = random.sample(range(n_vars), 3)
-        clause = []
-        satisfied = False
-        for v in triple:
-            pol = random.choice([False, True])
-            clause.append((v, pol))
-            satisfied |= (hidden[v] and pol) or (not hidden[v] and not pol)
-        if not satisfied:
-            v0, pol0 = clause[0]
-            clause[0] = (v0, not pol0)
-        cnf.append(clause)
-    return cnf
+COLUMNS = ['n', 'm', 'ratio', 'p_local', 'run', 'seed', 'solver_seed',
+           'solved', 'best_valence', 'steps', 'runtime_sec']
+
+def task_seeds(base_seed: int, n: int, ratio: float, run: int) -> tuple[int, int]:
+    """(instance seed, solver seed) of one grid cell; depends only on its coordinates."""
+    seq = np.random.SeedSequence(base_seed, spawn_key=(n, int(round(ratio * 1000)), run))
+    inst, solver = seq.generate_state(2)
+    return int(inst >> 1), int(solver >> 1)
+
+def sweep_tasks(args, base_seed: int):
+    """Grid tasks in output order: n, ratio, run, p_local (p_local innermost, same instance)."""
+    n_start, n_stop, n_step = args.n_range
+    for n, ratio, run, p_local in product(range(n_start, n_stop, n_step), args.clauses_per_var,
+                                          range(args.runs), args.p_local):
+        seed, solver_seed = task_seeds(base_seed, n, ratio, run)
+        yield dict(n=n, m=int(ratio * n), ratio=ratio, p_local=p_local, run=run,
+                   seed=seed, solver_seed=solver_seed)
+
+def run_task(task_opts):
+    task, opts = task_opts
+    cnf = random_ksat(task['n'], task['m'], k=opts['k'], seed=task['seed'], planted=not opts['uniform'])
+    solver = make_solver(cnf, population=opts['population'], max_iter=opts['max_iter'],
+                         seed=task['solver_seed'], backend=opts['backend'], p_local=task['p_local'],
+                         local_move=opts['local_move'])
+    stats = SolverStats() if opts['stats'] else None
+    t0 = perf_counter()
+    assignment, best_val, steps, _ = solver.solve(stats=stats)
+    runtime = perf_counter() - t0
+    row = dict(task, solved=best_val == 1.0, best_valence=best_val, steps=steps, runtime_sec=runtime)
+    if stats is not None:
+        row.update(stats.as_dict())
+    return row
 
 def parse_args():
     p = argparse.ArgumentParser(description="Batch-Experimente mit dem ValenzDriftSolver")
     p.add_argument('--n-range', nargs=3, type=int, metavar=('START','STOP','STEP'), required=True)
     p.add_argument('--runs', type=int, default=3, help='Wiederholungen pro Setting (verschiedene Seeds)')
     p.add_argument('--max-iter', type=int, default=50000, help='Iterationsbudget pro Lauf')
-    p.add_argument('--outfile', type=str, required=True, help='Pfad für Ergebnis-CSV')
-    p.add_argument('--clauses-per-var', type=float, default=4.3, help='Klausel/Variablen-Verhältnis')
-    return p.parse_args()
+    p.add_argument('--outfile', type=str, required=True, help='Ergebnisdatei (.csv oder .jsonl)')
+    p.add_argument('--clauses-per-var', nargs='+', type=float, default=[4.3], help='Klausel/Variablen-Verhältnisse')
+    p.add_argument('--k', type=int, default=3, help='Literale pro Klausel')
+    p.add_argument('--uniform', action='store_true', help='uniformes statt geplantes k-SAT')
+    p.add_argument('--backend', choices=BACKENDS, default='python', help='Solver-Kern')
+    p.add_argument('--population', type=int, default=0, help='Anzahl Walker im Populationsmodus (0 = aus)')
+    p.add_argument('--local-move', choices=tuple(LOCAL_MOVES), default='random', help='Variablenwahl im lokalen Schritt')
+    p.add_argument('--p-local', nargs='+', type=float, default=[0.5], help='Wahrscheinlichkeiten lokaler Schritte statt Drift')
+    p.add_argument('--stats', action='store_true', help='Zähler und Phasen-Timer des Solvers mitschreiben')
+    p.add_argument('--seed', type=int, default=None, help='Basis-Seed des Sweeps')
+    p.add_argument('--n-jobs', type=int, default=os.cpu_count(), help='Anzahl paralleler Prozesse')
+    p.add_argument('--chunksize', type=int, default=1, help='Aufgaben pro Dispatch')
+    p.add_argument('--store', type=str, default=None, help='Ordner des spaltenorientierten Ergebnis-Stores')
+    p.add_argument('--run-id', type=str, default=None, help='Partition im Store (default: Zeitstempel)')
+    args = p.parse_args()
+    if args.population and (args.backend != 'python' or args.local_move != 'random'):
+        p.error("--population läuft nur mit zufälligen lokalen Zügen in NumPy (kein --backend numba, kein --local-move)")
+    return args
 
 def main():
     args = parse_args()
-    n_start, n_stop, n_step = args.n_range
-    with open(args.outfile, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['n','m','seed','solved','best_valence','steps','runtime_sec'])
-        for n in range(n_start, n_stop, n_step):
-            m = int(args.clauses_per_var * n)
-            for run in range(args.runs):
-                seed = random.randint(1, 1_000_000_000)
-                cnf = gen_random_cnf(n, m, seed=seed)
-                solver = ValenzDriftSolver(
-                    cnf=cnf,
-                    valence_fn=valence_resonance,
-                    drift_fn=semantic_drift,
-                    max_iter=args.max_iter,
-                    seed=seed
-                )
-                t0 = perf_counter()
-                assignment, best_val, steps, _ = solver.solve()
-                runtime = perf_counter() - t0
-                solved = best_val == 1.0
-                writer.writerow([n, m, seed, solved, best_val, steps, runtime])
-                f.flush()
-                print(f"n={n} m={m} seed={seed} solved={solved} valence={best_val:.3f} steps={steps} time={runtime:.2f}s")
+    base_seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**63)
+    print(f"Basis-Seed: {base_seed}")
+    opts = dict(k=args.k, uniform=args.uniform, population=args.population, max_iter=args.max_iter,
+                backend=args.backend, local_move=args.local_move, stats=args.stats)
+    tasks = [(task, opts) for task in sweep_tasks(args, base_seed)]
+    columns = COLUMNS + (list(SolverStats.COLUMNS) if args.stats else [])
+    store = ResultStore(args.store, args.run_id, meta=dict(
+        source='sweep', k=args.k, backend=args.backend, local_move=args.local_move,
+        population=args.population, max_iter=args.max_iter)) if args.store else None
+    # Pool.__exit__ beendet die Worker sofort, auch bei Ctrl-C oder Fehlern im Schreiber
+    with mp.Pool(processes=args.n_jobs) if args.n_jobs > 1 else nullcontext() as pool, \
+            ResultWriter(args.outfile, columns, store=store) as writer:
+        # imap hält die Rasterreihenfolge ein und liefert trotzdem, sobald der nächste Lauf fertig ist
+        rows = pool.imap(run_task, tasks, chunksize=args.chunksize) if pool else map(run_task, tasks)
+        for row in rows:
+            writer.write(row)
+            print(f"n={row['n']} m={row['m']} p_local={row['p_local']} seed={row['seed']} "
+                  f"solved={row['solved']} valence={row['best_valence']:.3f} steps={row['steps']} "
+                  f"time={row['runtime_sec']:.2f}s")
 
 if __name__ == "__main__":
     main()
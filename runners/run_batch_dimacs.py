@@ -5,41 +5,32 @@ Beispielaufruf:
   python -m runners.run_batch_dimacs --indir data/ai/hoos/Shortcuts/UF250.1065.100 --max-iter 500000 --outfile results_dimacs.csv --plotdir plots/
 
 Optionen:
-  --indir DIR       : Verzeichnis mit .cnf-Dateien
+  --indir DIR       : Verzeichnis mit .cnf-Dateien (auch .cnf.gz/.cnf.xz; Parse-Cache als <datei>.npz)
   --max-iter K      : Iterationsbudget pro Instanz
   --outfile PATH    : Ergebnis-CSV
-  --plotdir DIR     : (optional) speichert für jede Instanz einen Plot (PNG)
+  --plotdir DIR     : (optional) speichert für jede Instanz einen Plot (PNG) plus aggregate.png,
+                      gerendert gesammelt nach dem Lösen (runners.plot_traces)
+  --tracedir DIR    : (optional) Ordner für kompakte Traces (.npy), default bei --plotdir: <plotdir>/traces
+  --backend NAME    : Solver-Kern (python oder numba)
+  --population W    : W Walker vektorisiert im Gleichschritt statt eines einzelnen Solvers
+  --local-move NAME : Variablenwahl im lokalen Schritt: random, walksat, probsat, probsat-exp
+  --p-local P       : Wahrscheinlichkeit eines lokalen Schritts statt Drift (default: 0.5)
+  --stats           : Solver-Instrumentierung (Zähler, Phasen-Timer) als zusätzliche Spalten
+  --store DIR       : zusätzlich in den spaltenorientierten Ergebnis-Store schreiben (Parquet, ohne pyarrow CSV)
+  --run-id ID       : Partition im Store (default: Zeitstempel)
 """
 import argparse
-import csv
 import os
 from pathlib import Path
 from time import perf_counter
-from core.valenz_solver import ValenzDriftSolver
-from core.valence_resonance import valence_resonance
-from core.drift_semantic import semantic_drift
-
-def read_dimacs(path: Path):
-    cnf = []
-    with path.open() as f:
-        for line in f:
-            line = line.strip()
-            if not line or not any(ch.isdigit() or ch == '-' for ch in line):
-                continue
-            if line[0] in ("c", "p", "%"):
-                continue
-            try:
-                lits = [int(x) for x in line.split() if x != "0"]
-            except ValueError:
-                continue
-            clause = []
-            for lit in lits:
-                var_idx = abs(lit) - 1
-                polarity = lit > 0
-                clause.append((var_idx, polarity))
-            if clause:
-                cnf.append(clause)
-    return cnf
+from core.cnf_utils import dimacs_stem, list_dimacs, load_dimacs
+from core.heuristics import LOCAL_MOVES
+from core.population import make_solver
+from core.results_io import ResultStore, ResultWriter
+from core.solver_stats import SolverStats
+from core.valenz_solver import BACKENDS
+from core.valence_trace import ValenceTrace
+from runners.plot_traces import list_traces, render
 
 def main():
     parser = argparse.ArgumentParser(description="Batch-Run für alle .cnf-Dateien in einem Ordner")
@@ -47,50 +38,58 @@ def main():
     parser.add_argument('--max-iter', type=int, default=500_000, help='Iterationsbudget pro Instanz')
     parser.add_argument('--outfile', type=str, required=True, help='Pfad für Ergebnis-CSV')
     parser.add_argument('--plotdir', type=str, default=None, help='Ordner für PNG-Plots')
+    parser.add_argument('--tracedir', type=str, default=None, help='Ordner für kompakte Traces (.npy)')
+    parser.add_argument('--backend', choices=BACKENDS, default='python', help='Solver-Kern')
+    parser.add_argument('--population', type=int, default=0, help='Anzahl Walker im Populationsmodus (0 = aus)')
+    parser.add_argument('--local-move', choices=tuple(LOCAL_MOVES), default='random', help='Variablenwahl im lokalen Schritt')
+    parser.add_argument('--p-local', type=float, default=0.5, help='Wahrscheinlichkeit lokaler Schritte statt Drift')
+    parser.add_argument('--stats', action='store_true', help='Zähler und Phasen-Timer des Solvers mitschreiben')
+    parser.add_argument('--store', type=str, default=None, help='Ordner des spaltenorientierten Ergebnis-Stores')
+    parser.add_argument('--run-id', type=str, default=None, help='Partition im Store (default: Zeitstempel)')
     args = parser.parse_args()
+    if args.population and (args.backend != 'python' or args.local_move != 'random'):
+        parser.error("--population läuft nur mit zufälligen lokalen Zügen in NumPy (kein --backend numba, kein --local-move)")
 
     indir = Path(args.indir)
-    cnf_files = sorted([p for p in indir.glob('*.cnf')])
-    if args.plotdir:
-        plotdir = Path(args.plotdir)
-        plotdir.mkdir(parents=True, exist_ok=True)
-    else:
-        plotdir = None
+    cnf_files = list_dimacs(indir)
+    plotdir = Path(args.plotdir) if args.plotdir else None
+    tracedir = Path(args.tracedir) if args.tracedir else (plotdir / 'traces' if plotdir else None)
+    if tracedir is not None:
+        tracedir.mkdir(parents=True, exist_ok=True)
 
-    with open(args.outfile, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['filename','n','m','solved','best_valence','steps','runtime_sec'])
+    store = ResultStore(args.store, args.run_id, meta=dict(
+        source='dimacs', max_iter=args.max_iter, backend=args.backend, population=args.population,
+        local_move=args.local_move, p_local=args.p_local)) if args.store else None
+    columns = ['filename','n','m','solved','best_valence','steps','runtime_sec']
+    if args.stats:
+        columns += list(SolverStats.COLUMNS)
+    with ResultWriter(args.outfile, columns, store=store) as writer:
         for cnf_path in cnf_files:
-            cnf = read_dimacs(cnf_path)
-            n = max((v for cl in cnf for v,_ in cl), default=-1) + 1
-            m = len(cnf)
-            solver = ValenzDriftSolver(
-                cnf=cnf,
-                valence_fn=valence_resonance,
-                drift_fn=semantic_drift,
-                max_iter=args.max_iter
-            )
-            valence_trace = []
+            cnf = load_dimacs(cnf_path)
+            n, m = cnf.n_vars, cnf.n_clauses
+            solver = make_solver(cnf, population=args.population, max_iter=args.max_iter,
+                                 backend=args.backend, p_local=args.p_local, local_move=args.local_move)
+            # Nur Change-Points aufzeichnen, und nur wenn Traces gespeichert werden
+            valence_trace = ValenceTrace("changes") if tracedir is not None else None
+            stats = SolverStats() if args.stats else None
             t0 = perf_counter()
-            assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace)
+            assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace, stats=stats)
             runtime = perf_counter() - t0
             solved = best_val == 1.0
-            writer.writerow([cnf_path.name, n, m, solved, best_val, steps, runtime])
-            f.flush()
+            row = dict(zip(columns, (cnf_path.name, n, m, solved, best_val, steps, runtime)))
+            if stats is not None:
+                row.update(stats.as_dict())
+            writer.write(row)
             print(f"{cnf_path.name}: solved={solved} valence={best_val:.3f} steps={steps} time={runtime:.2f}s")
-            if plotdir is not None:
-                try:
-                    import matplotlib.pyplot as plt
-                    plt.figure(figsize=(8,4))
-                    plt.plot(trace)
-                    plt.xlabel('Step')
-                    plt.ylabel('Best Valence')
-                    plt.title(f'{cnf_path.name}')
-                    plt.tight_layout()
-                    plt.savefig(plotdir / (cnf_path.stem + '.png'))
-                    plt.close()
-                except ImportError:
-                    print("matplotlib nicht installiert: kein Plot für", cnf_path.name)
+            if tracedir is not None:
+                trace.save(tracedir / (dimacs_stem(cnf_path) + '.npy'))
+
+    if plotdir is not None:
+        try:
+            n_plots = render(list_traces(tracedir), plotdir)
+            print(f"{n_plots} Plots gespeichert in {plotdir}")
+        except ImportError:
+            print("matplotlib nicht installiert: keine Plots erzeugt")
 
 if __name__ == "__main__":
     main()
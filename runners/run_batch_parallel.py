@@ -5,113 +5,126 @@ Beispielaufruf:
   python -m runners.run_batch_parallel --indir data/ai/hoos/Shortcuts/UF250.1065.100 --max-iter 1000000 --outfile results_parallel.csv --plotdir plots/ --n-jobs 8
 
 Optionen:
-  --indir DIR       : Verzeichnis mit .cnf-Dateien
+  --indir DIR       : Verzeichnis mit .cnf-Dateien (auch .cnf.gz/.cnf.xz; Parse-Cache als <datei>.npz)
   --max-iter K      : Iterationsbudget pro Instanz
-  --outfile PATH    : Ergebnis-CSV
-  --plotdir DIR     : (optional) speichert für jede Instanz einen Plot (PNG)
-  --n-jobs N        : Anzahl paralleler Prozesse
+  --outfile PATH    : Ergebnisdatei (.csv oder .jsonl), wird pro fertiger Instanz geschrieben
+  --plotdir DIR     : (optional) speichert für jede Instanz einen Plot (PNG) plus aggregate.png;
+                      gerendert erst nach dem Lösen (runners.plot_traces), nicht in den Workern
+  --tracedir DIR    : (optional) Ordner für kompakte Traces (.npy), default bei --plotdir: <plotdir>/traces
+  --n-jobs N        : Anzahl paralleler Prozesse (default: alle Kerne)
+  --resume          : bereits in --outfile vorhandene Instanzen überspringen und anhängen
+  --chunksize K     : Instanzen pro Dispatch an einen Worker (default: 1)
+  --backend NAME    : Solver-Kern (python oder numba)
+  --population W    : W Walker vektorisiert im Gleichschritt statt eines einzelnen Solvers
+  --local-move NAME : Variablenwahl im lokalen Schritt: random, walksat, probsat, probsat-exp
+  --p-local P       : Wahrscheinlichkeit eines lokalen Schritts statt Drift (default: 0.5)
+  --stats           : Solver-Instrumentierung (Zähler, Phasen-Timer) als zusätzliche Spalten
+  --timeout SEK     : Zeitbudget pro Instanz in Sekunden; abgebrochene Läufe mit timed_out=True
+  --store DIR       : zusätzlich in den spaltenorientierten Ergebnis-Store schreiben (Parquet, ohne pyarrow CSV)
+  --run-id ID       : Partition im Store (default: Zeitstempel)
 """
 import argparse
-import csv
 import os
 from pathlib import Path
 from time import perf_counter
-from core.valenz_solver import ValenzDriftSolver
-from core.valence_resonance import valence_resonance
-from core.drift_semantic import semantic_drift
+from core.cnf_utils import dimacs_stem, list_dimacs, load_dimacs
+from core.results_io import ResultStore, ResultWriter, read_done
+from core.heuristics import LOCAL_MOVES
+from core.population import make_solver
+from core.solver_stats import SolverStats
+from core.valenz_solver import BACKENDS
+from core.valence_trace import ValenceTrace
+from runners.plot_traces import list_traces, render
 import multiprocessing as mp
 
-def read_dimacs(path: Path):
-    cnf = []
-    with path.open() as f:
-        for line in f:
-            line = line.strip()
-            if not line or not any(ch.isdigit() or ch == '-' for ch in line):
-                continue
-            if line[0] in ("c", "p", "%"):
-                continue
-            try:
-                lits = [int(x) for x in line.split() if x != "0"]
-            except ValueError:
-                continue
-            clause = []
-            for lit in lits:
-                var_idx = abs(lit) - 1
-                polarity = lit > 0
-                clause.append((var_idx, polarity))
-            if clause:
-                cnf.append(clause)
-    return cnf
+COLUMNS = ['filename','n','m','solved','best_valence','steps','runtime_sec']
 
 def run_instance(args):
-    cnf_path, max_iter, plotdir = args
-    cnf = read_dimacs(cnf_path)
-    n = max((v for cl in cnf for v,_ in cl), default=-1) + 1
-    m = len(cnf)
-    solver = ValenzDriftSolver(
-        cnf=cnf,
-        valence_fn=valence_resonance,
-        drift_fn=semantic_drift,
-        max_iter=max_iter
-    )
+    cnf_path, max_iter, tracedir, solver_opts, with_stats, timeout = args
+    cnf = load_dimacs(cnf_path)
+    n, m = cnf.n_vars, cnf.n_clauses
+    solver = make_solver(cnf, max_iter=max_iter, **solver_opts)
     t0 = perf_counter()
-    assignment, best_val, steps, trace = solver.solve(valence_trace=[])
+    # Nur Change-Points aufzeichnen, und nur wenn Traces gespeichert werden
+    valence_trace = ValenceTrace("changes") if tracedir is not None else None
+    stats = SolverStats() if with_stats else None
+    assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace, stats=stats,
+                                                      time_limit=timeout)
     runtime = perf_counter() - t0
     solved = best_val == 1.0
-    # Plot speichern
-    if plotdir is not None:
-        try:
-            import matplotlib.pyplot as plt
-            import matplotlib
-            matplotlib.use('Agg')
-            plt.figure(figsize=(8,4))
-            plt.plot(trace)
-            plt.xlabel('Step')
-            plt.ylabel('Best Valence')
-            plt.title(f'{cnf_path.name}')
-            plt.tight_layout()
-            plot_path = Path(plotdir) / (cnf_path.stem + '.png')
-            plt.savefig(plot_path)
-            plt.close()
-        except ImportError:
-            pass
-    return (cnf_path.name, n, m, solved, best_val, steps, runtime)
+    # Nur den kompakten Trace persistieren; geplottet wird gesammelt nach dem Batch
+    if tracedir is not None:
+        trace.save(Path(tracedir) / (dimacs_stem(cnf_path) + '.npy'))
+    row = dict(zip(COLUMNS, (cnf_path.name, n, m, solved, best_val, steps, runtime)))
+    if timeout is not None:
+        row['timed_out'] = solver.stop_reason is not None
+    if stats is not None:
+        row.update(stats.as_dict())
+    return row
 
 def main():
     parser = argparse.ArgumentParser(description="Batch-Run mit Parallelisierung für .cnf-Dateien")
     parser.add_argument('--indir', type=str, required=True, help='Ordner mit .cnf-Dateien')
     parser.add_argument('--max-iter', type=int, default=500_000, help='Iterationsbudget pro Instanz')
-    parser.add_argument('--outfile', type=str, required=True, help='Pfad für Ergebnis-CSV')
+    parser.add_argument('--outfile', type=str, required=True, help='Ergebnisdatei (.csv oder .jsonl)')
     parser.add_argument('--plotdir', type=str, default=None, help='Ordner für PNG-Plots')
-    parser.add_argument('--n-jobs', type=int, default=4, help='Anzahl paralleler Prozesse')
+    parser.add_argument('--tracedir', type=str, default=None, help='Ordner für kompakte Traces (.npy)')
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count(), help='Anzahl paralleler Prozesse (default: alle Kerne)')
+    parser.add_argument('--resume', action='store_true', help='Bereits vorhandene Ergebnisse überspringen')
+    parser.add_argument('--chunksize', type=int, default=1, help='Instanzen pro Dispatch')
+    parser.add_argument('--backend', choices=BACKENDS, default='python', help='Solver-Kern')
+    parser.add_argument('--population', type=int, default=0, help='Anzahl Walker im Populationsmodus (0 = aus)')
+    parser.add_argument('--local-move', choices=tuple(LOCAL_MOVES), default='random', help='Variablenwahl im lokalen Schritt')
+    parser.add_argument('--p-local', type=float, default=0.5, help='Wahrscheinlichkeit lokaler Schritte statt Drift')
+    parser.add_argument('--stats', action='store_true', help='Zähler und Phasen-Timer des Solvers mitschreiben')
+    parser.add_argument('--timeout', type=float, default=None, help='Zeitbudget pro Instanz in Sekunden')
+    parser.add_argument('--store', type=str, default=None, help='Ordner des spaltenorientierten Ergebnis-Stores')
+    parser.add_argument('--run-id', type=str, default=None, help='Partition im Store (default: Zeitstempel)')
     args = parser.parse_args()
+    if args.population and (args.backend != 'python' or args.local_move != 'random'):
+        parser.error("--population läuft nur mit zufälligen lokalen Zügen in NumPy (kein --backend numba, kein --local-move)")
 
     indir = Path(args.indir)
-    cnf_files = sorted([p for p in indir.glob('*.cnf')])
-    if args.plotdir:
-        plotdir = Path(args.plotdir)
-        plotdir.mkdir(parents=True, exist_ok=True)
-    else:
-        plotdir = None
+    cnf_files = list_dimacs(indir)
+    plotdir = Path(args.plotdir) if args.plotdir else None
+    tracedir = Path(args.tracedir) if args.tracedir else (plotdir / 'traces' if plotdir else None)
+    if tracedir is not None:
+        tracedir.mkdir(parents=True, exist_ok=True)
+
+    if args.resume:
+        done = read_done(args.outfile, 'filename')
+        cnf_files = [p for p in cnf_files if p.name not in done]
+        print(f"Resume: {len(done)} Instanzen bereits erledigt, {len(cnf_files)} verbleibend")
+    # Größte Instanzen zuerst, damit keine langen Nachzügler am Ende allein laufen
+    cnf_files.sort(key=lambda p: p.stat().st_size, reverse=True)
 
-    pool_args = [(p, args.max_iter, plotdir) for p in cnf_files]
+    solver_opts = dict(backend=args.backend, population=args.population,
+                       p_local=args.p_local, local_move=args.local_move)
+    pool_args = [(p, args.max_iter, tracedir, solver_opts, args.stats, args.timeout) for p in cnf_files]
+    columns = COLUMNS + (['timed_out'] if args.timeout is not None else [])
+    if args.stats:
+        columns += list(SolverStats.COLUMNS)
+    store = ResultStore(args.store, args.run_id, meta=dict(
+        source='dimacs', max_iter=args.max_iter, time_limit=args.timeout, **solver_opts)) if args.store else None
     try:
         from tqdm import tqdm
     except ImportError:
         tqdm = None
 
-    with mp.Pool(processes=args.n_jobs) as pool:
+    with ResultWriter(args.outfile, columns, resume=args.resume, store=store) as writer, \
+            mp.Pool(processes=args.n_jobs) as pool:
+        results = pool.imap_unordered(run_instance, pool_args, chunksize=args.chunksize)
         if tqdm is not None:
-            results = list(tqdm(pool.imap_unordered(run_instance, pool_args), total=len(pool_args), desc="Batch Progress"))
-        else:
-            results = list(pool.imap_unordered(run_instance, pool_args))
-
-    with open(args.outfile, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['filename','n','m','solved','best_valence','steps','runtime_sec'])
+            results = tqdm(results, total=len(pool_args), desc="Batch Progress")
         for row in results:
-            writer.writerow(row)
+            writer.write(row)
     print(f"Batch abgeschlossen. Ergebnisse in {args.outfile}")
+    if plotdir is not None:
+        try:
+            n_plots = render(list_traces(tracedir), plotdir)
+            print(f"{n_plots} Plots gespeichert in {plotdir}")
+        except ImportError:
+            print("matplotlib nicht installiert: keine Plots erzeugt")
 
 if __name__ == "__main__":
     main()
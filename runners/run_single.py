@@ -1,97 +1,121 @@
 import argparse
 import json
-import random
 import sys
 from pathlib import Path
 from time import perf_counter
-from core.valenz_solver import ValenzDriftSolver
-from core.valence_resonance import valence_resonance
-from core.drift_semantic import semantic_drift
+import numpy as np
+from core.checkpoint import load_assignment
+from core.cnf_utils import load_dimacs
+from core.generators import random_ksat
+from core.valenz_solver import BACKENDS, ValenzDriftSolver
+from core.valence_trace import MODES as TRACE_MODES, ValenceTrace
+from core.portfolio import solve_portfolio
+from core.heuristics import LOCAL_MOVES
+from core.population import make_solver
+from core.search_memory import SearchMemory
+from core.solver_stats import SolverStats
 
-Boolean = bool
-Literal = tuple[int, bool]
-Clause = list[Literal]
-CNF = list[Clause]
-Assignment = list[Boolean]
-
-def read_dimacs(path: Path) -> CNF:
-    cnf: CNF = []
-    with path.open() as f:
-        for line in f:
-            line = line.strip()
-            # Ignore comments and non-clause lines (c, p, %, etc.)
-            if not line or not any(ch.isdigit() or ch == '-' for ch in line):
-                continue
-            if line[0] in ("c", "p", "%"):
-                continue
-            try:
-                lits = [int(x) for x in line.split() if x != "0"]
-            except ValueError:
-                continue  # skip any malformed line
-            clause: Clause = []
-            for lit in lits:
-                var_idx = abs(lit) - 1
-                polarity = lit > 0
-                clause.append((var_idx, polarity))
-            if clause:
-                cnf.append(clause)
-    return cnf
-
-def gen_random_cnf(n_vars: int, m_clauses: int | None = None) -> CNF:
-    if m_clauses is None:
-        m_clauses = int(4.3 * n_vars)
-    hidden = [random.choice([False, True]) for _ in range(n_vars)]
-    cnf: CNF = []
-    for _ in range(m_clauses):
-        triple = random.sample(range(n_vars), 3)
-        clause: Clause = []
-        satisfied = False
-        for v in triple:
-            pol = random.choice([False, True])
-            clause.append((v, pol))
-            satisfied |= (hidden[v] and pol) or (not hidden[v] and not pol)
-        if not satisfied:
-            v0, pol0 = clause[0]
-            clause[0] = (v0, not pol0)
-        cnf.append(clause)
-    return cnf
+def split_seed(seed: int | None) -> tuple[int | None, int | None]:
+    """Independent (instance seed, solver seed) derived from ``--seed``."""
+    # Mit demselben Seed zögen Generator und Solver dieselben n Münzwürfe:
+    # der Solver startete auf der versteckten Lösung
+    if seed is None:
+        return None, None
+    inst, solver = np.random.SeedSequence(seed).generate_state(2)
+    return int(inst >> 1), int(solver >> 1)
 
 def parse_args(argv: list[str]):
     p = argparse.ArgumentParser(description="Solve CNF with Valenz‑Drift heuristic")
-    p.add_argument("file", nargs="?", help="DIMACS CNF file")
+    p.add_argument("file", nargs="?", help="DIMACS CNF file (.cnf, .cnf.gz, .cnf.xz)")
     p.add_argument("--random", type=int, dest="rnd_n", metavar="N", help="generate random satisfiable 3‑SAT with N variables")
     p.add_argument("--clauses", type=int, metavar="M", help="override clause count when using --random")
     p.add_argument("--max-iter", type=int, default=100_000, help="max iterations (default: 100k)")
     p.add_argument("--json-out", metavar="PATH", help="write JSON result file")
-    p.add_argument("--trace-out", metavar="PATH", help="write valence trace as JSON")
+    p.add_argument("--trace-out", metavar="PATH", help="write valence trace (.npy binary, otherwise run-length JSON)")
+    p.add_argument("--trace-mode", choices=TRACE_MODES, default="changes", help="trace recording mode (default: changes)")
+    p.add_argument("--trace-stride", type=int, default=1000, metavar="K", help="record every K-th step in stride mode")
+    p.add_argument("--trace-capacity", type=int, default=10_000, metavar="N", help="ring buffer size in ring mode")
     p.add_argument("--plot", metavar="PATH", help="save valence trace plot as PNG")
     p.add_argument("--progress", action='store_true', help='Show progress bar during solving')
-    return p.parse_args(argv)
+    p.add_argument("--backend", choices=BACKENDS, default="python", help="solver loop implementation (default: python)")
+    p.add_argument("--seed", type=int, help="random seed (with --random: split into instance and solver seed; portfolio: base seed for the worker seeds)")
+    p.add_argument("--portfolio", type=int, metavar="N", help="run N workers with different seeds/p_local, stop at the first solution")
+    p.add_argument("--local-move", choices=tuple(LOCAL_MOVES), default="random", help="variable choice in local steps (default: random)")
+    p.add_argument("--p-local", type=float, metavar="P", help="probability of a local step instead of drift (default: 0.5; portfolio: same P for all workers instead of 0.3-0.9)")
+    p.add_argument("--memory", action="store_true", help="enable tabu tenure, plateau detection and adaptive noise/restarts")
+    p.add_argument("--tabu-tenure", type=int, default=10, metavar="N", help="steps a flipped variable stays tabu (with --memory)")
+    p.add_argument("--plateau-window", type=int, default=10_000, metavar="K", help="steps without improvement that count as plateau (with --memory)")
+    p.add_argument("--restart-after", type=int, default=5, metavar="N", help="restart after N plateaus in a row, 0 = never (with --memory)")
+    p.add_argument("--population", type=int, default=0, metavar="W", help="advance W walkers in lock-step (vectorised; random local moves, no --memory/--backend numba)")
+    p.add_argument("--time-limit", type=float, metavar="SEC", help="stop after SEC seconds with the best assignment so far")
+    p.add_argument("--stats", action="store_true", help="collect move/flip counters and sampled phase timers into the result")
+    p.add_argument("--checkpoint", metavar="PATH", help="write the solver state to PATH (.npz) periodically and at the end")
+    p.add_argument("--checkpoint-interval", type=float, default=60.0, metavar="SEC", help="seconds between checkpoints (default: 60)")
+    p.add_argument("--resume", metavar="PATH", help="continue the run saved in checkpoint PATH (same instance and --max-iter budget)")
+    p.add_argument("--init-from", metavar="PATH", help="warm start from a checkpoint's best assignment or a model file of DIMACS literals")
+    args = p.parse_args(argv)
+    if (args.checkpoint or args.resume or args.init_from) and (args.portfolio or args.population):
+        p.error("--checkpoint/--resume/--init-from need the single solver (no --portfolio/--population)")
+    if args.population and (args.backend != "python" or args.local_move != "random" or args.memory):
+        p.error("--population only runs random local moves in NumPy (no --backend numba, --local-move or --memory)")
+    if args.resume and args.init_from:
+        p.error("--resume and --init-from are mutually exclusive")
+    return args
 
 def main(argv: list[str] | None = None):
     args = parse_args(argv or sys.argv[1:])
+    solver_seed = args.seed
     if args.rnd_n:
-        cnf = gen_random_cnf(args.rnd_n, args.clauses)
-        instance_info = {"type": "random", "n": args.rnd_n, "m": len(cnf)}
+        m = args.clauses if args.clauses is not None else int(4.3 * args.rnd_n)
+        instance_seed, solver_seed = split_seed(args.seed)
+        cnf = random_ksat(args.rnd_n, m, seed=instance_seed)
+        instance_info = {"type": "random", "n": args.rnd_n, "m": cnf.n_clauses, "seed": instance_seed}
     elif args.file:
         path = Path(args.file)
         if not path.exists():
             print(f"Error: file {path} not found", file=sys.stderr)
             sys.exit(1)
-        cnf = read_dimacs(path)
-        instance_info = {"type": "dimacs", "path": str(path), "m": len(cnf)}
+        cnf = load_dimacs(path)
+        instance_info = {"type": "dimacs", "path": str(path), "n": cnf.n_vars, "m": cnf.n_clauses}
     else:
         print("Error: must supply --random N or CNF FILE", file=sys.stderr)
         sys.exit(1)
-    solver = ValenzDriftSolver(
-        cnf=cnf,
-        valence_fn=valence_resonance,
-        drift_fn=semantic_drift,
-        max_iter=args.max_iter,
-    )
-    valence_trace = []
+    trace_args = None
+    if args.trace_out or args.plot:
+        trace_args = (args.trace_mode, args.trace_stride, args.trace_capacity)
+    portfolio_info = None
+    stats = None
+    memory_opts = None
+    if args.memory:
+        memory_opts = dict(tenure=args.tabu_tenure, window=args.plateau_window, restart_after=args.restart_after)
     t0 = perf_counter()
-    assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace, progress=args.progress)
+    if args.portfolio:
+        won = solve_portfolio(cnf, args.portfolio, max_iter=args.max_iter, seed=solver_seed,
+                              p_locals=[args.p_local] if args.p_local is not None else None,
+                              backend=args.backend, trace_args=trace_args, local_move=args.local_move,
+                              search_memory=memory_opts, time_limit=args.time_limit, stats=args.stats)
+        best_val, steps, trace = won["best_valence"], won["steps"], won["trace"]
+        portfolio_info = {
+            "workers": args.portfolio,
+            "winner": {k: won[k] for k in ("worker", "seed", "p_local", "runtime_sec")},
+            "configs": won["configs"],
+        }
+    else:
+        memory = SearchMemory(cnf.n_vars, **memory_opts) if memory_opts is not None else None
+        solver = make_solver(cnf, population=args.population, max_iter=args.max_iter,
+                             seed=solver_seed, backend=args.backend,
+                             p_local=args.p_local if args.p_local is not None else 0.5,
+                             search_memory=memory, local_move=args.local_move)
+        valence_trace = ValenceTrace(*trace_args) if trace_args else None
+        stats = SolverStats() if args.stats else None
+        resume_opts = {}
+        if isinstance(solver, ValenzDriftSolver):
+            # Checkpoints und Warmstart gibt es nur beim Einzel-Solver
+            resume_opts = dict(resume=args.resume, checkpoint=args.checkpoint,
+                               checkpoint_interval=args.checkpoint_interval,
+                               init=load_assignment(args.init_from, cnf.n_vars) if args.init_from else None)
+        assignment, best_val, steps, trace = solver.solve(valence_trace=valence_trace, progress=args.progress,
+                                                          stats=stats, time_limit=args.time_limit, **resume_opts)
     runtime = perf_counter() - t0
     result = {
         "instance": instance_info,
@@ -100,18 +124,34 @@ def main(argv: list[str] | None = None):
         "runtime_sec": runtime,
         "solved": best_val == 1.0,
     }
+    if portfolio_info is not None:
+        result["portfolio"] = portfolio_info
+        # Gewinner-Worker: Plateaus, Abbruchgrund und Statistik wie beim Einzel-Solver
+        result.update({k: won[k] for k in ("plateaus", "stopped", "stats") if k in won})
+    else:
+        if args.population:
+            result["population"] = args.population
+        elif args.memory:
+            result["plateaus"] = len(solver.memory["plateaus"])
+        if solver.stop_reason is not None:
+            result["stopped"] = solver.stop_reason
+        if stats is not None:
+            result["stats"] = stats.as_dict()
+    if args.checkpoint:
+        result["checkpoint"] = args.checkpoint
     out_json = json.dumps(result, indent=2)
     if args.json_out:
         Path(args.json_out).write_text(out_json)
     else:
         print(out_json)
     if args.trace_out:
-        Path(args.trace_out).write_text(json.dumps(trace))
+        trace.save(args.trace_out)
     if args.plot:
         try:
             import matplotlib.pyplot as plt
+            steps_idx, values = trace.points()
             plt.figure(figsize=(8,4))
-            plt.plot(trace)
+            plt.step(steps_idx, values, where='post')
             plt.xlabel('Step')
             plt.ylabel('Best Valence')
             plt.title('Valence Trace')
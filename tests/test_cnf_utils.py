@@ -0,0 +1,83 @@
+import gzip
+
+import numpy as np
+
+from core.cnf_utils import cache_path, compile_cnf, dimacs_from_bytes, dimacs_stem, load_dimacs
+from core.generators import planted_solution, random_ksat, write_dimacs
+
+DIMACS = b"""c Beispiel
+p cnf 4 3
+1 -2 3 0
+-1 2
+4 0
+2 2 -3 0
+%
+0
+"""
+
+
+def load_dimacs_plain(tmp_path):
+    path = tmp_path / "plain.cnf"
+    path.write_bytes(DIMACS)
+    return load_dimacs(path, cache=False)
+
+
+def path_clauses(tmp_path):
+    return load_dimacs_plain(tmp_path).to_clauses()
+
+
+def test_load_dimacs_bulk_parse_and_cache(tmp_path):
+    path = tmp_path / "toy.cnf"
+    path.write_bytes(DIMACS)
+    cnf = load_dimacs(path)
+    assert cnf.n_vars == 4 and cnf.n_clauses == 3
+    assert cnf.to_clauses() == [[(0, True), (1, False), (2, True)],
+                                [(0, False), (1, True), (3, True)],
+                                [(1, True), (2, False)]]
+    assert cache_path(path).exists()
+    cached = load_dimacs(path)
+    for name in cnf.ARRAYS:
+        assert (getattr(cached, name) == getattr(cnf, name)).all()
+
+
+def test_load_dimacs_ignores_truncated_cache(tmp_path):
+    path = tmp_path / "toy.cnf"
+    path.write_bytes(DIMACS)
+    cnf = load_dimacs(path)
+    sidecar = cache_path(path)
+    sidecar.write_bytes(sidecar.read_bytes()[:len(sidecar.read_bytes()) // 2])
+    assert load_dimacs(path).to_clauses() == cnf.to_clauses()
+    # der Cache wurde neu geschrieben und ist wieder lesbar, ohne Temp-Datei daneben
+    with np.load(sidecar) as npz:
+        assert (npz["lits"] == cnf.lits).all()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["toy.cnf", "toy.cnf.npz"]
+
+
+def test_load_dimacs_compressed(tmp_path):
+    path = tmp_path / "toy.cnf.gz"
+    path.write_bytes(gzip.compress(DIMACS))
+    assert load_dimacs(path, cache=False).to_clauses() == load_dimacs_plain(tmp_path).to_clauses()
+    assert dimacs_stem(path) == "toy"
+    # Uploads: Dekompression über den Dateinamen, ohne Umweg über eine Datei
+    assert dimacs_from_bytes(gzip.compress(DIMACS), "toy.cnf.gz").to_clauses() == path_clauses(tmp_path)
+
+
+def test_compile_cnf_occurrences_split_by_polarity():
+    cnf = compile_cnf([[(0, True), (1, False)], [(1, True), (0, True)]])
+    assert cnf.pos_occ[cnf.pos_ptr[0]:cnf.pos_ptr[1]].tolist() == [0, 1]
+    assert cnf.neg_occ[cnf.neg_ptr[1]:cnf.neg_ptr[2]].tolist() == [0]
+    assert cnf.pos_occ[cnf.pos_ptr[1]:cnf.pos_ptr[2]].tolist() == [1]
+
+
+def test_random_ksat_planted_is_satisfied_and_streams_identically(tmp_path):
+    cnf = random_ksat(500, 2130, k=4, seed=7)
+    assert cnf.n_clauses == 2130 and (np.diff(cnf.clause_ptr) == 4).all()
+    # keine Variable doppelt in einer Klausel
+    rows = np.sort(cnf.lit_var.reshape(-1, 4), axis=1)
+    assert (rows[:, 1:] != rows[:, :-1]).all()
+    true_count = cnf.counters(planted_solution(500, seed=7))[0]
+    assert (true_count > 0).all()
+    path = tmp_path / "gen.cnf.gz"
+    write_dimacs(path, 500, 2130, k=4, seed=7)
+    assert (load_dimacs(path, cache=False).lits == cnf.lits).all()
+    assert (random_ksat(500, 2130, k=4, seed=8, planted=False).lits != cnf.lits).any()
@@ -1,6 +1,441 @@
-from core.valenz_solver import ValenzDriftSolver
+import random
+
+import pytest
+
+from core.cnf_utils import compile_cnf
+from core.generators import random_ksat
+from core.packed_assignment import FlipJournal, PackedAssignment
+from core.population import PopulationSolver
+from core.search_memory import ESCALATE, RESTART, SearchMemory
+from core.solver_stats import SolverStats
+from core.portfolio import solve_portfolio
+from core.valenz_solver import ValenzDriftSolver, clause_is_sat
+from core.valence_resonance import valence_resonance, valence_resonance_batch
+from core.drift_semantic import semantic_drift
+from core.heuristics import random_flip
+from core.valence_trace import ValenceTrace, load_trace
+
+
+def _planted_3sat(n_vars, m_clauses, seed):
+    rnd = random.Random(seed)
+    hidden = [rnd.choice([False, True]) for _ in range(n_vars)]
+    cnf = []
+    for _ in range(m_clauses):
+        clause = [(v, rnd.choice([False, True])) for v in rnd.sample(range(n_vars), 3)]
+        if not clause_is_sat(clause, hidden):
+            v0, pol0 = clause[0]
+            clause[0] = (v0, not pol0)
+        cnf.append(clause)
+    return cnf
+
 
 def test_solver_runs():
-    solver = ValenzDriftSolver(n_vars=10, n_clauses=5, max_iter=100)
-    result = solver.run()
-    assert isinstance(result, dict)
+    cnf = _planted_3sat(20, 60, seed=1)
+    solver = ValenzDriftSolver(cnf=cnf, valence_fn=valence_resonance,
+                               drift_fn=semantic_drift, max_iter=2000, seed=1)
+    assignment, best_val, steps, trace = solver.solve(valence_trace=[])
+    assert len(assignment) == 20
+    assert 0.0 <= best_val <= 1.0
+    assert best_val == valence_resonance(cnf, assignment)
+    assert trace[-1] == best_val
+
+
+def test_incremental_valence_matches_full_scan():
+    cnf = _planted_3sat(30, 120, seed=2)
+    opaque = lambda c, a: valence_resonance(c, a)
+    trace_fast, trace_slow = [], []
+    fast = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=300, seed=3)
+    assert fast.valence_from_state is not None
+    fast.solve(valence_trace=trace_fast)
+    slow = ValenzDriftSolver(cnf, opaque, semantic_drift, max_iter=300, seed=3)
+    assert slow.valence_from_state is None
+    slow.solve(valence_trace=trace_slow)
+    assert trace_fast == trace_slow
+
+
+@pytest.mark.parametrize("list_mirrors", [False, True])
+def test_counters_follow_flips(list_mirrors):
+    cnf = _planted_3sat(40, 170, seed=4)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, seed=5, list_mirrors=list_mirrors)
+    assignment, unsat = solver._init_state()
+    rnd = random.Random(6)
+    for _ in range(200):
+        var = rnd.randrange(solver.n_vars)
+        assignment[var] = not assignment[var]
+        solver._propagate(var, assignment, unsat)
+    true_count, true_sum, brk, make = solver.compiled.counters(assignment)
+    assert list(solver.true_count) == true_count.tolist()
+    assert list(solver.true_sum) == true_sum.tolist()
+    assert list(solver.break_count) == brk.tolist()
+    assert list(solver.make_count) == make.tolist()
+    assert set(unsat) == {ci for ci, cl in enumerate(cnf) if not clause_is_sat(cl, assignment)}
+
+
+def test_numba_backend_solves_planted_instance():
+    pytest.importorskip("numba")
+    cnf = _planted_3sat(30, 120, seed=7)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift,
+                               max_iter=200_000, seed=8, backend="numba")
+    assert solver.backend == "numba"
+    assignment, best_val, steps, trace = solver.solve(valence_trace=[])
+    assert best_val == valence_resonance(cnf, assignment) == 1.0
+    assert len(trace) == steps + 2 and trace[-1] == 1.0
+
+
+def test_numba_backend_falls_back_for_opaque_functions():
+    cnf = _planted_3sat(10, 30, seed=9)
+    with pytest.warns(RuntimeWarning):
+        solver = ValenzDriftSolver(cnf, lambda c, a: valence_resonance(c, a), semantic_drift,
+                                   max_iter=10, backend="numba")
+    assert solver.backend == "python"
+
+
+def test_legacy_full_assignment_drift_is_adapted():
+    def legacy_drift(assignment, cnf, val):
+        new = assignment.copy()
+        new[0] = not new[0]
+        new[3] = not new[3]
+        return new
+
+    cnf = _planted_3sat(12, 40, seed=10)
+    solver = ValenzDriftSolver(cnf, valence_resonance, legacy_drift, p_local=0.0, max_iter=50, seed=11)
+    assignment, unsat = solver._init_state()
+    flips = solver._drift(assignment, cnf, 0.5)
+    assert flips == [0, 3]
+    for var in flips:
+        solver._propagate(var, assignment, unsat)
+    assert list(solver.true_count) == solver.compiled.counters(assignment)[0].tolist()
+    solver.solve()
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_change_point_trace_reconstructs_full_trace(backend, tmp_path):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    cnf = _planted_3sat(40, 170, seed=12)
+    full = []
+    ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=3000,
+                      seed=13, backend=backend).solve(valence_trace=full)
+    rec = ValenceTrace("changes")
+    ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=3000,
+                      seed=13, backend=backend).solve(valence_trace=rec)
+    assert len(rec) < len(full)
+    assert rec.dense().tolist() == full
+    for name in ("trace.npy", "trace.json"):
+        rec.save(tmp_path / name)
+        steps, values = load_trace(tmp_path / name)
+        assert steps[-1] == len(full) - 1 and values[-1] == full[-1]
+
+
+def test_portfolio_reports_winning_configuration():
+    cnf = compile_cnf(_planted_3sat(30, 120, seed=14))
+    won = solve_portfolio(cnf, 2, max_iter=200_000, seed=15)
+    assert won["best_valence"] == 1.0
+    assert won["worker"] in (0, 1)
+    assert {c["p_local"] for c in won["configs"]} == {0.3, 0.9}
+    assert valence_resonance(cnf.to_clauses(), won["assignment"]) == 1.0
+
+
+def test_portfolio_forwards_solver_options():
+    # Uniform bei Verhältnis 5: praktisch sicher unerfüllbar, also endet jeder Worker am Zeitlimit
+    cnf = random_ksat(100, 500, seed=14, planted=False)
+    won = solve_portfolio(cnf, 2, max_iter=10_000_000, seed=15, p_locals=[0.7], local_move="walksat",
+                          search_memory=dict(tenure=5, window=500), time_limit=0.3, stats=True)
+    assert {c["p_local"] for c in won["configs"]} == {0.7}
+    assert won["stopped"] == "time_limit" and won["steps"] < 10_000_000
+    assert won["plateaus"] > 0 and won["stats"]["n_local"] > 0
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_batch_valence_matches_scalar(packed):
+    cnf = _planted_3sat(25, 100, seed=16)
+    rnd = random.Random(17)
+    rows = [[rnd.random() < 0.5 for _ in range(25)] for _ in range(19)]
+    batch = valence_resonance_batch(cnf, rows, packed=packed)
+    assert batch.tolist() == [valence_resonance(cnf, row) for row in rows]
+
+
+def test_population_counts_follow_vectorised_flips():
+    import numpy as np
+    cnf = compile_cnf(_planted_3sat(30, 130, seed=18))
+    solver = PopulationSolver(cnf, n_walkers=8, seed=19)
+    assign, true_count, n_unsat = solver._init_state()
+    rng = np.random.default_rng(20)
+    for _ in range(50):
+        walkers = np.repeat(np.arange(8), 3)
+        vars_ = np.concatenate([rng.choice(30, 3, replace=False) for _ in range(8)])
+        solver._flip(assign, true_count, n_unsat, walkers, vars_)
+    for w in range(8):
+        assert true_count[w].tolist() == cnf.counters(assign[w])[0].tolist()
+        assert n_unsat[w] == (true_count[w] == 0).sum()
+    assert solver.unsat_keys.tolist() == np.flatnonzero(true_count.ravel() == 0).tolist()
+    best, val, _, trace = PopulationSolver(cnf, n_walkers=16, p_local=0.7, max_iter=20_000,
+                                        seed=21).solve(valence_trace=[])
+    assert val == 1.0 and valence_resonance(cnf, best) == 1.0
+    assert trace[-1] == 1.0
+
+
+@pytest.mark.parametrize("n_walkers, restarts", [(3, 0), (8, 10)])
+def test_population_counts_only_real_restarts(n_walkers, restarts):
+    cnf = random_ksat(60, 300, seed=23, planted=False)
+    stats = SolverStats()
+    PopulationSolver(cnf, n_walkers=n_walkers, max_iter=100, seed=24, restart_every=10).solve(stats=stats)
+    assert stats.n_restarts == restarts
+
+
+def test_population_rejects_unsupported_options():
+    from core.population import make_solver
+    from runners.run_single import parse_args
+    cnf = compile_cnf(_planted_3sat(10, 30, seed=25))
+    with pytest.raises(ValueError, match="local_move, search_memory"):
+        make_solver(cnf, population=4, local_move="walksat", search_memory=SearchMemory(10))
+    for extra in (["--local-move", "walksat"], ["--memory"], ["--backend", "numba"]):
+        with pytest.raises(SystemExit):
+            parse_args(["--random", "10", "--population", "4"] + extra)
+
+
+def test_packed_assignment_behaves_like_bool_list():
+    rnd = random.Random(22)
+    bools = [rnd.random() < 0.5 for _ in range(700)]
+    packed = PackedAssignment.from_bools(bools)
+    assert packed.nbytes == 88 and list(packed) == bools
+    snapshot = packed.copy()
+    # k = 70 Flips: vektorisierter Pfad über flip_many
+    flips = semantic_drift(packed, None, 0.0) + random_flip(packed)
+    for i in flips:
+        bools[i] = not bools[i]
+    packed.flip(699)
+    bools[699] = not bools[699]
+    assert packed.tolist() == bools
+    assert packed.diff(snapshot) == sorted(i for i in range(700) if bools[i] != snapshot[i])
+    snapshot.copy_from(packed)
+    assert snapshot == packed == bools
+
+
+def test_flip_journal_reproduces_best_snapshot():
+    rnd = random.Random(23)
+    current = PackedAssignment.random(50, rnd)
+    journal = FlipJournal(current, capacity=16)
+    expected = current.copy()
+    for step in range(400):
+        if rnd.random() < 0.1:
+            journal.mark_best()
+            expected = current.copy()
+        for var in rnd.sample(range(50), rnd.randint(1, 5)):
+            current.flip(var)
+            journal.flips.append(var)
+        if len(journal.flips) > journal.capacity:
+            journal.rebase(current)
+    assert journal.best_assignment() == expected
+
+
+def test_search_memory_escalates_and_restarts_on_plateaus():
+    mem = SearchMemory(5, tenure=3, window=10, phi=0.5, max_noise=0.9, restart_after=2)
+    mem.reset(noise=0.2)
+    mem.flipped(1, step=0)
+    assert mem.is_tabu(1, 2) and not mem.is_tabu(1, 3)
+    assert mem.check(9) is None
+    assert mem.check(10) == ESCALATE and mem.noise == pytest.approx(0.6)
+    mem.improved(12)
+    assert mem.noise == pytest.approx(0.5) and mem.check(21) is None
+    assert mem.check(22) == ESCALATE
+    assert mem.check(32) == RESTART
+
+    cnf = _planted_3sat(40, 170, seed=24)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, p_local=0.9, max_iter=50_000, seed=25,
+                               search_memory=SearchMemory(40, window=200))
+    solver.memory["blacklist"].add(0)
+    assert solver._allowed([0, 1, 2], step=0) == [1, 2]
+    assignment, best_val, steps, _ = solver.solve()
+    assert best_val == valence_resonance(cnf, assignment) == 1.0
+
+
+
+@pytest.mark.parametrize("p_local", [0.1, 0.5, 0.9])
+def test_search_memory_keeps_p_local_ratio(p_local):
+    cnf = _planted_3sat(300, 1350, seed=28)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, p_local=p_local, max_iter=4000,
+                               seed=29, search_memory=SearchMemory(300, window=100_000))
+    stats = SolverStats()
+    solver.solve(stats=stats)
+    assert stats.n_local / (stats.n_local + stats.n_drift) == pytest.approx(p_local, abs=0.05)
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+@pytest.mark.parametrize("move", ["walksat", "probsat", "probsat-exp"])
+def test_scored_local_moves_solve_planted_instance(backend, move):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    cnf = _planted_3sat(60, 255, seed=26)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, p_local=1.0, max_iter=50_000,
+                               seed=27, backend=backend, local_move=move)
+    assert solver.backend == backend
+    assignment, best_val, steps, _ = solver.solve()
+    assert best_val == valence_resonance(cnf, assignment) == 1.0
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_solver_stats_count_moves_and_flips(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    cnf = _planted_3sat(80, 340, seed=28)
+    stats = SolverStats(sample_every=4)
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=2000, seed=29, backend=backend)
+    _, best_val, steps, _ = solver.solve(stats=stats)
+    row = stats.as_dict()
+    assert list(row) == list(SolverStats.COLUMNS)
+    assert row["n_local"] + row["n_drift"] == steps
+    assert row["n_flips"] == solver.n_flips >= steps
+    assert row["n_clause_updates"] >= row["n_flips"]
+    assert row["n_improvements"] >= 1 and row["t_total"] > 0
+    if backend == "python":
+        assert stats.calls["propagate"] == row["n_flips"]
+        assert row["t_propagate"] > 0
+    # Ohne Stats-Objekt bleibt der Lauf identisch (gleicher Seed, gleiche Schritte)
+    again = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=2000, seed=29, backend=backend)
+    assert again.solve()[1:3] == (best_val, steps)
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_callback_and_time_limit_stop_early(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    cnf = _planted_3sat(300, 1290, seed=30)
+    seen = []
+    solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=10**6, seed=31, backend=backend)
+    assignment, best_val, steps, _ = solver.solve(callback=lambda info: seen.append(info) or len(seen) == 3,
+                                                  callback_every=500)
+    assert [info["step"] for info in seen] == [500, 1000, 1500]
+    assert steps == 1500 and solver.stop_reason == "callback"
+    assert seen[-1]["best_valence"] == best_val == valence_resonance(cnf, assignment)
+    assignment, best_val, steps, _ = solver.solve(time_limit=0.05)
+    assert solver.stop_reason == "time_limit" and 0 < steps < 10**6
+    assert best_val == valence_resonance(cnf, assignment)
+
+
+def test_gui_job_runner_streams_and_cancels():
+    from gui.jobs import JobRunner
+    cnf = compile_cnf(_planted_3sat(2000, 8520, seed=32), 2000)
+    data = ("p cnf 2000 8520\n" + "".join(
+        " ".join(str(v + 1 if pol else -(v + 1)) for v, pol in cl) + " 0\n" for cl in cnf.to_clauses())).encode()
+    runner = JobRunner(n_workers=1)
+    try:
+        job = runner.submit("big.cnf", data, max_iter=10**8, seed=33, interval=0.02)
+        assert runner.updates.get(timeout=30)[0] == job  # erstes Live-Update
+        runner.cancel([job])
+        result = runner.futures[job].result(timeout=30)
+        assert result["stopped"] == "callback" and 0 < result["steps"] < 10**8
+        assert result["best_valence"] == valence_resonance(cnf.to_clauses(), result["assignment"])
+    finally:
+        runner.shutdown()
+
+
+def test_batch_sweep_tasks_are_reproducible_per_grid_cell():
+    from runners.run_batch import run_task, task_seeds
+    assert task_seeds(3, 50, 4.26, 0) == task_seeds(3, 50, 4.26, 0)
+    assert len({task_seeds(3, 50, r, run) for r in (4.0, 4.26) for run in range(3)}) == 6
+    seed, solver_seed = task_seeds(3, 50, 4.26, 1)
+    task = dict(n=50, m=213, ratio=4.26, p_local=0.7, run=1, seed=seed, solver_seed=solver_seed)
+    opts = dict(k=3, uniform=False, population=0, max_iter=3000, backend="python",
+                local_move="walksat", stats=False)
+    first, second = run_task((task, opts)), run_task((task, opts))
+    first.pop("runtime_sec"), second.pop("runtime_sec")
+    assert first == second and first["n"] == 50
+
+
+def test_result_store_unifies_runner_outputs(tmp_path):
+    from analyse_batch import par2
+    from core.results_io import ResultStore, ResultWriter, load_results
+    store = ResultStore(tmp_path / "store", "sweep", meta=dict(source="sweep", backend="numba"), flush_every=2)
+    with ResultWriter(tmp_path / "sweep.csv", ["n", "m", "seed", "solved", "runtime_sec"], store=store) as w:
+        for i in range(3):
+            w.write(dict(n=50, m=213, seed=2**40 + i, solved=i < 2, runtime_sec=1.0 + i, n_flips=7))
+    assert len(list((tmp_path / "store" / "run_id=sweep").glob("part-*"))) == 2
+    # DIMACS-Runner (filename) und GUI (deutsche Spalten) ins selbe Schema
+    (tmp_path / "dimacs.csv").write_text("filename,n,m,solved,runtime_sec\nuf.cnf,20,91,True,0.5\n")
+    (tmp_path / "gui.csv").write_text("Testlauf,Datei,Variablen,Klauseln,Gelöst,Laufzeit [s],Abbruch\n"
+                                     "t,uf.cnf,20,91,False,0.7,\n")
+    df = load_results([tmp_path / "store", tmp_path / "dimacs.csv", tmp_path / "gui.csv"],
+                      ["run_id", "instance", "ratio", "seed", "backend", "solved", "runtime_sec"])
+    assert df["run_id"].tolist() == ["sweep"] * 3 + ["dimacs", "t"]
+    assert df["instance"].tolist()[3:] == ["uf.cnf", "uf.cnf"]
+    assert df["seed"].tolist()[:3] == [2**40, 2**40 + 1, 2**40 + 2]
+    assert df["ratio"].round(2).tolist() == [4.26] * 3 + [4.55] * 2
+    assert df["solved"].tolist() == [True, True, False, True, False]
+    assert par2(df[df["run_id"] == "sweep"], cutoff=2.5) == (1.0 + 2.0 + 5.0) / 3
+
+
+def test_solver_rng_is_per_instance():
+    cnf = _planted_3sat(200, 850, seed=34)
+    make = lambda seed: ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=3000, seed=seed)
+    alone = make(35).solve()
+    # Ein zweiter Solver und das globale random-Modul dürfen den Lauf nicht beeinflussen
+    first, other = make(35), make(36)
+    random.seed(0)
+    other.solve()
+    random.random()
+    assert first.solve() == alone
+
+
+def test_checkpoint_resume_continues_exactly(tmp_path):
+    from core.checkpoint import load_assignment, load_checkpoint
+    cnf = _planted_3sat(400, 1800, seed=40)
+    make = lambda: ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=6000, seed=41,
+                                     local_move="walksat")
+    path = tmp_path / "run.npz"
+    uninterrupted = make().solve()
+    stopped = make()
+    stopped.solve(checkpoint=path, callback=lambda info: info["step"] >= 2000, callback_every=500)
+    assert stopped.stop_reason == "callback" and load_checkpoint(path).step == 2000
+    assert make().solve(resume=path) == uninterrupted
+    # Warmstart von der besten Belegung: startet nicht schlechter als der gespeicherte Lauf
+    init = load_assignment(path, 400)
+    assert valence_resonance(cnf, init) == load_checkpoint(path).best_valence
+    with pytest.raises(ValueError):
+        ValenzDriftSolver(_planted_3sat(400, 1800, seed=42), valence_resonance, semantic_drift).solve(resume=path)
+
+
+@pytest.mark.parametrize("extra", [[], ["--population", "8"]])
+def test_run_single_cli_writes_result(extra, tmp_path):
+    import json
+    from runners.run_single import main
+    out = tmp_path / "result.json"
+    main(["--random", "60", "--seed", "3", "--max-iter", "2000", "--json-out", str(out)] + extra)
+    result = json.loads(out.read_text())
+    assert result["instance"]["n"] == 60 and 0.0 < result["best_valence"] <= 1.0
+
+
+@pytest.mark.parametrize("extra", [[], ["--population", "4"]])
+def test_run_single_random_instance_does_not_start_on_planted_solution(extra, tmp_path):
+    import json
+    from runners.run_single import main
+    out = tmp_path / "result.json"
+    for seed in ("1", "2", "3"):
+        main(["--random", "2000", "--seed", seed, "--max-iter", "3", "--json-out", str(out)] + extra)
+        result = json.loads(out.read_text())
+        assert not result["solved"] and result["steps"] == 3
+
+
+def test_load_assignment_reads_competition_model_file(tmp_path):
+    from core.checkpoint import load_assignment
+    model = tmp_path / "model.txt"
+    model.write_text("c solver output, v in a comment\ns SATISFIABLE\nv 1 -2 3\nv -4 5 0\nc done\n")
+    assert load_assignment(model, 6).tolist() == [True, False, True, False, True, False]
+    bare = tmp_path / "bare.txt"
+    bare.write_text("-1 2\n0\n3\n")
+    assert load_assignment(bare, 3).tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_early_stop_full_trace_has_no_duplicate_end_point(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    cnf = _planted_3sat(300, 1350, seed=43)
+    traces = []
+    for kw in ({}, dict(callback=lambda info: info["step"] >= 100, callback_every=100)):
+        solver = ValenzDriftSolver(cnf, valence_resonance, semantic_drift, max_iter=400, seed=44, backend=backend)
+        _, _, steps, trace = solver.solve(valence_trace=ValenceTrace("full"), **kw)
+        traces.append((steps, trace.points()[0]))
+    # Gleiche Regel für Budget-Ende und vorzeitigen Stopp: Schritte 0..steps plus ein Endpunkt
+    for steps, idx in traces:
+        assert len(idx) == steps + 2 and len(set(idx.tolist())) == len(idx)